@@ -0,0 +1,252 @@
+# api.py
+# Se define la API JSON del gestor de tareas en /api/tareas, para scripts y paneles que no necesitan las páginas HTML
+# Las consultas (GET) llevan una etiqueta ETag que cambia con cada cambio de las tareas; si el cliente la envía
+# en If-None-Match y nada cambió, se responde 304 sin volver a generar el contenido
+from datetime import datetime
+from flask import Blueprint, current_app, jsonify, request, url_for
+
+from core.consulta import Consulta, crear_filtro
+from core.tarea import Tarea
+from core.validacion import fecha_a_ordinal, validar_titulo, validar_fecha, formatear_fecha
+
+# Se definen los campos que se pueden pedir con ?campos= y los que se pueden cambiar con POST y PATCH
+CAMPOS_TAREA = ("id", "titulo", "descripcion", "estado", "fecha_creacion", "fecha_completada", "fecha_vencimiento",
+                "prioridad", "subtareas", "categoria")
+CAMPOS_EDITABLES = ("titulo", "descripcion", "fecha_vencimiento", "prioridad", "categoria", "estado")
+PRIORIDADES = ("alta", "media", "baja")
+ESTADOS = ("pendiente", "en progreso", "completada")
+
+
+# Se define la función para responder un error en formato JSON
+def error(mensaje, codigo):
+    return jsonify(error=mensaje), codigo
+
+
+# Se define la función para obtener los campos pedidos con ?campos=titulo,estado (None = todos); el id siempre se incluye
+# Si se pide un campo que no existe se lanza ValueError
+def campos_pedidos():
+    texto = request.args.get("campos")
+    if not texto:
+        return None
+    campos = [c.strip() for c in texto.split(",") if c.strip()]
+    desconocidos = [c for c in campos if c not in CAMPOS_TAREA]
+    if desconocidos:
+        raise ValueError(f"Campos desconocidos: {', '.join(desconocidos)}")
+    return ["id"] + [c for c in campos if c != "id"]
+
+
+# Se define la función para convertir una tarea a diccionario, solo con los campos pedidos
+def tarea_a_json(tarea, campos=None):
+    datos = tarea.to_dict()
+    if campos is None:
+        return datos
+    return {c: datos[c] for c in campos}
+
+
+# Se define la función para validar los datos de una tarea recibidos en JSON
+# Devuelve un diccionario con los campos ya normalizados, o lanza ValueError con el motivo
+def validar_datos(datos, requiere_titulo):
+    if not isinstance(datos, dict):
+        raise ValueError("Se esperaba un objeto JSON.")
+    desconocidos = [c for c in datos if c not in CAMPOS_EDITABLES]
+    if desconocidos:
+        raise ValueError(f"Campos no editables: {', '.join(desconocidos)}")
+
+    cambios = {}
+    for campo in ("titulo", "descripcion", "fecha_vencimiento", "categoria"):
+        if campo in datos:
+            valor = datos[campo]
+            if valor is None:
+                valor = ""
+            if not isinstance(valor, str):
+                raise ValueError(f"El campo {campo} debe ser texto.")
+            cambios[campo] = valor.strip()
+
+    if "titulo" in cambios or requiere_titulo:
+        if not validar_titulo(cambios.get("titulo", "")):
+            raise ValueError("Título inválido.")
+    if "fecha_vencimiento" in cambios:
+        if not validar_fecha(cambios["fecha_vencimiento"]):
+            raise ValueError("Fecha inválida. Debe ser formato dd-mm-aaaa.")
+        cambios["fecha_vencimiento"] = formatear_fecha(cambios["fecha_vencimiento"]) or None
+    if "prioridad" in datos:
+        if datos["prioridad"] not in PRIORIDADES:
+            raise ValueError("Prioridad inválida. Debe ser alta, media o baja.")
+        cambios["prioridad"] = datos["prioridad"]
+    if "estado" in datos:
+        if datos["estado"] not in ESTADOS:
+            raise ValueError("Estado inválido. Debe ser pendiente, en progreso o completada.")
+        cambios["estado"] = datos["estado"]
+    return cambios
+
+
+# Se define la función para crear una tarea nueva (creada hoy) a partir de datos ya validados
+# La tarea se crea directamente con su estado inicial (pendiente si no se pide otro); si se crea completada, se
+# completa hoy, igual que al marcarla
+def nueva_tarea(datos):
+    hoy = datetime.today().strftime("%d-%m-%Y")
+    estado = datos.get("estado", "pendiente")
+    return Tarea(datos["titulo"], datos.get("descripcion", ""), estado, hoy, hoy if estado == "completada" else None,
+                 datos.get("fecha_vencimiento"), datos.get("prioridad", "media"), categoria=datos.get("categoria", ""))
+
+
+# Se define la función para convertir las operaciones de un lote recibidas en JSON a las operaciones de aplicar_lote
+# Acepta "crear" (con "tarea"), "actualizar" (con "id" y "cambios"), "marcar" (con "id" y "estado") y "eliminar" (con "id")
+# Si alguna operación no es válida se lanza ValueError con su número
+def convertir_operaciones(operaciones):
+    if not isinstance(operaciones, list):
+        raise ValueError("Se esperaba una lista de operaciones.")
+    convertidas = []
+    for numero, operacion in enumerate(operaciones):
+        try:
+            if not isinstance(operacion, dict):
+                raise ValueError("Se esperaba un objeto JSON.")
+            op = operacion.get("op")
+            if op == "crear":
+                datos = validar_datos(operacion.get("tarea"), requiere_titulo=True)
+                convertidas.append({"op": "crear", "tarea": nueva_tarea(datos)})
+            elif op == "actualizar":
+                convertidas.append({"op": "actualizar", "id": operacion.get("id"),
+                                    "cambios": validar_datos(operacion.get("cambios"), requiere_titulo=False)})
+            elif op == "marcar":
+                convertidas.append({"op": "actualizar", "id": operacion.get("id"),
+                                    "cambios": validar_datos({"estado": operacion.get("estado")}, requiere_titulo=False)})
+            elif op == "eliminar":
+                convertidas.append({"op": "eliminar", "id": operacion.get("id")})
+            else:
+                raise ValueError(f"Operación desconocida {op!r}.")
+        except ValueError as e:
+            raise ValueError(f"Operación {numero}: {e}")
+    return convertidas
+
+
+# Se define la función para crear el Blueprint de la API sobre un gestor de tareas
+def crear_api(gestor):
+    api = Blueprint("api", __name__, url_prefix="/api")
+
+    # Se define la función para responder una consulta con su etiqueta ETag
+    # Si el cliente ya tiene la versión actual (If-None-Match), se responde 304 sin llamar a generar
+    def respuesta_condicional(generar):
+        # La etiqueta se obtiene antes de generar el contenido: si algo cambia mientras tanto, el cliente volverá a pedirlo
+        etiqueta = gestor.etiqueta()
+        if request.if_none_match.contains(etiqueta):
+            respuesta = current_app.response_class(status=304)
+        else:
+            respuesta = jsonify(generar())
+        respuesta.set_etag(etiqueta)
+        respuesta.headers["Cache-Control"] = "no-cache"
+        return respuesta
+
+    # Se define la ruta para listar las tareas, con paginación opcional y filtros que se combinan: texto, estado, prioridad,
+    # categoria y el rango fecha_minima / fecha_maxima; ordenar_por acepta varios criterios separados por comas
+    @api.route("/tareas", methods=["GET"])
+    def listar_tareas():
+        try:
+            campos = campos_pedidos()
+        except ValueError as e:
+            return error(str(e), 400)
+        desplazamiento = request.args.get("desplazamiento", 0, type=int)
+        limite = request.args.get("limite", type=int)
+        if desplazamiento < 0 or (limite is not None and limite < 0):
+            return error("desplazamiento y limite no pueden ser negativos", 400)
+
+        # Se define la función que genera el contenido de la respuesta
+        def generar():
+            filtro = crear_filtro(request.args.get("texto", ""), request.args.get("estado", ""),
+                                  request.args.get("prioridad", ""), request.args.get("categoria", ""),
+                                  fecha_a_ordinal(request.args.get("fecha_minima")),
+                                  fecha_a_ordinal(request.args.get("fecha_maxima")))
+            ordenar_por = request.args.get("ordenar_por", "").split(",")
+            pagina = gestor.consultar(Consulta(filtro, ordenar_por, desplazamiento, limite), "filtradas")
+            return {
+                "tareas": [tarea_a_json(t, campos) for t in pagina],
+                "total": pagina.total,
+                "desplazamiento": pagina.desplazamiento,
+                "limite": pagina.limite,
+            }
+
+        return respuesta_condicional(generar)
+
+    # Se define la ruta para obtener una tarea
+    @api.route("/tareas/<tarea_id>", methods=["GET"])
+    def obtener_tarea(tarea_id):
+        try:
+            campos = campos_pedidos()
+        except ValueError as e:
+            return error(str(e), 400)
+        tarea = gestor.obtener_tarea(tarea_id)
+        if tarea is None:
+            return error("No se encontró la tarea.", 404)
+        return respuesta_condicional(lambda: tarea_a_json(tarea, campos))
+
+    # Se define la ruta para crear una tarea; responde 201 con la tarea creada y su dirección en Location
+    @api.route("/tareas", methods=["POST"])
+    def crear_tarea():
+        try:
+            datos = validar_datos(request.get_json(silent=True), requiere_titulo=True)
+        except ValueError as e:
+            return error(str(e), 400)
+
+        # La tarea se agrega ya con su estado inicial, en un solo paso
+        tarea = nueva_tarea(datos)
+        gestor.agregar_tarea(tarea)
+
+        respuesta = jsonify(tarea_a_json(tarea))
+        respuesta.status_code = 201
+        respuesta.headers["Location"] = url_for("api.obtener_tarea", tarea_id=tarea.id)
+        return respuesta
+
+    # Se define la ruta para cambiar uno o varios campos de una tarea
+    @api.route("/tareas/<tarea_id>", methods=["PATCH"])
+    def actualizar_tarea(tarea_id):
+        try:
+            cambios = validar_datos(request.get_json(silent=True), requiere_titulo=False)
+        except ValueError as e:
+            return error(str(e), 400)
+        tarea = gestor.actualizar_tarea(tarea_id, cambios)
+        if tarea is None:
+            return error("No se encontró la tarea.", 404)
+        return jsonify(tarea_a_json(tarea))
+
+    # Se define la ruta para eliminar una tarea; responde 204 sin contenido
+    @api.route("/tareas/<tarea_id>", methods=["DELETE"])
+    def eliminar_tarea(tarea_id):
+        if not gestor.eliminar_tarea(tarea_id):
+            return error("No se encontró la tarea.", 404)
+        return "", 204
+
+    # Se define la ruta para agregar una subtarea a una tarea
+    @api.route("/tareas/<tarea_id>/subtareas", methods=["POST"])
+    def agregar_subtarea(tarea_id):
+        datos = request.get_json(silent=True)
+        nombre = datos.get("nombre") if isinstance(datos, dict) else None
+        if not isinstance(nombre, str) or not nombre.strip():
+            return error("Nombre de subtarea inválido.", 400)
+        if gestor.obtener_tarea(tarea_id) is None:
+            return error("No se encontró la tarea.", 404)
+        gestor.agregar_subtarea(tarea_id, nombre.strip())
+        respuesta = jsonify(tarea_a_json(gestor.obtener_tarea(tarea_id)))
+        respuesta.status_code = 201
+        return respuesta
+
+    # Se define la ruta para marcar o desmarcar una subtarea; responde el nuevo estado de la tarea
+    @api.route("/tareas/<tarea_id>/subtareas/<int:subtarea_idx>/alternar", methods=["POST"])
+    def alternar_subtarea(tarea_id, subtarea_idx):
+        nuevo_estado = gestor.alternar_subtarea(tarea_id, subtarea_idx)
+        if nuevo_estado is None:
+            return error("No se encontró la tarea o la subtarea.", 404)
+        return jsonify(id=tarea_id, nuevo_estado=nuevo_estado)
+
+    # Se define la ruta para aplicar varias operaciones de una vez ({"operaciones": [...]})
+    # Se aplican todas o ninguna, y se guardan juntas; responde los ids afectados en el orden de las operaciones
+    @api.route("/tareas/lote", methods=["POST"])
+    def aplicar_lote():
+        datos = request.get_json(silent=True)
+        try:
+            operaciones = convertir_operaciones(datos.get("operaciones") if isinstance(datos, dict) else None)
+            ids = gestor.aplicar_lote(operaciones)
+        except ValueError as e:
+            return error(str(e), 400)
+        return jsonify(ids=ids, cantidad=len(ids))
+
+    return api
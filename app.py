@@ -1,11 +1,22 @@
 # app.py
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify
-from datetime import datetime
+import os
+import threading
+import time
+from functools import wraps
+from flask import (Flask, Response, render_template, request, redirect, url_for, jsonify, abort, g,
+                   before_render_template, template_rendered)
+from markupsafe import Markup
+from datetime import date, datetime
 
 # Se importa las clases necesarias para el desarrollo de la aplicación
 from gestor_web import GestorTareasWeb
+from api import crear_api
+from core.almacenamiento import crear_almacenamiento
+from core.cache import CacheLRU
+from core.metricas import PerfiladorMuestreo, metricas
 from core.tarea import Tarea
+from core.intercambio import FORMATOS, MODOS_SUBTAREAS, TIPOS_CONTENIDO
 
 # Se importa las funciones de validación para asegurar que los datos ingresados sean correctos
 from core.validacion import validar_titulo, validar_fecha, formatear_fecha
@@ -13,9 +24,111 @@ from core.validacion import validar_titulo, validar_fecha, formatear_fecha
 
 # Se crea una instancia de la clase Flask y se asigna el nombre de la aplicación
 app = Flask(__name__)
-# Se crea una instancia de la clase GestorTareasWeb y se carga la lista de tareas desde un archivo JSON 
-gestor = GestorTareasWeb()
+# Se define la cantidad de tareas que se muestran por página en /tareas y /buscar
+TAREAS_POR_PAGINA = 20
+# Se define el tamaño de las cachés de HTML: páginas completas (cantidad y caracteres en total) y fragmentos de una tarea
+PAGINAS_EN_CACHE = 128
+TAMANO_CACHE_PAGINAS = 8 * 1024 * 1024
+FRAGMENTOS_EN_CACHE = 4096
+# Se crea una instancia de la clase GestorTareasWeb y se cargan las tareas guardadas
+# Con la variable de entorno TODOLIST_ALMACENAMIENTO=sqlite se usa la base de datos data/tareas.db en vez del archivo JSON,
+# con TODOLIST_ALMACENAMIENTO=binario, la instantánea binaria data/tareas.bin (se abre sin leer todas las tareas),
+# y con TODOLIST_ALMACENAMIENTO=categorias, una partición por categoría en data/categorias
+gestor = GestorTareasWeb(almacenamiento=crear_almacenamiento())
 gestor.cargar_desde_archivo()
+# Se registra la API JSON (/api/tareas) sobre el mismo gestor
+app.register_blueprint(crear_api(gestor))
+# Se crean las cachés del HTML generado: las páginas se guardan con la etiqueta del gestor (cambia con cualquier cambio en
+# las tareas) y los fragmentos de cada tarea con su versión (cambia solo cuando cambia esa tarea)
+cache_paginas = CacheLRU(PAGINAS_EN_CACHE, TAMANO_CACHE_PAGINAS)
+cache_fragmentos = CacheLRU(FRAGMENTOS_EN_CACHE)
+# Se publican como métricas la cantidad de tareas y los aciertos y fallos de las cachés
+metricas.medidor("todolist_tareas", "Tareas cargadas en memoria", lambda: len(gestor.tareas))
+metricas.medidor("todolist_cache_paginas_aciertos_total", "Páginas servidas desde la caché",
+                 lambda: cache_paginas.aciertos, "counter")
+metricas.medidor("todolist_cache_paginas_fallos_total", "Páginas que hubo que generar", lambda: cache_paginas.fallos, "counter")
+metricas.medidor("todolist_cache_fragmentos_aciertos_total", "Fragmentos de tareas servidos desde la caché",
+                 lambda: cache_fragmentos.aciertos, "counter")
+metricas.medidor("todolist_cache_fragmentos_fallos_total", "Fragmentos de tareas que hubo que generar",
+                 lambda: cache_fragmentos.fallos, "counter")
+# Con la variable de entorno TODOLIST_PERFILAR=segundos se muestrea la pila de cada solicitud y, si tarda más que esos
+# segundos, se muestran las llamadas donde pasó más tiempo
+perfilador = PerfiladorMuestreo(float(os.environ["TODOLIST_PERFILAR"])) if os.environ.get("TODOLIST_PERFILAR") else None
+# Se guarda, por hilo, el momento en que empezó cada plantilla que se está generando (una plantilla puede generar otras)
+plantillas_en_curso = threading.local()
+
+
+# Se define la función para obtener el desplazamiento de la página pedida (parámetro "pagina", empezando en 1)
+def desplazamiento_pagina():
+    pagina = request.values.get("pagina", 1, type=int)
+    return (max(pagina, 1) - 1) * TAREAS_POR_PAGINA
+
+# Se define el decorador para guardar en caché el HTML de una página
+# La clave incluye la ruta, sus parámetros (de la URL y del formulario), la etiqueta del gestor y la fecha de hoy (las
+# próximas tareas dependen de ella); la etiqueta se obtiene antes de generar la página, así que si las tareas cambian
+# mientras tanto, la página queda guardada con la etiqueta anterior y no se vuelve a usar
+def con_cache(vista):
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        clave = (request.endpoint, tuple(sorted(kwargs.items())), tuple(sorted(request.values.items(multi=True))),
+                 gestor.etiqueta(), date.today())
+        html = cache_paginas.obtener(clave)
+        if html is None:
+            html = vista(*args, **kwargs)
+            # Solo se guardan las páginas generadas, no las redirecciones ni otras respuestas
+            if isinstance(html, str):
+                cache_paginas.guardar(clave, html)
+        return html
+    return envoltura
+
+# Se define la función para obtener el HTML de una tarea en el acordeón de tareas o de búsqueda, desde la caché si la
+# tarea no cambió; se usa desde las plantillas como fragmento_tarea(t, origen)
+@app.template_global()
+def fragmento_tarea(t, origen):
+    clave = ("item", t.id, gestor.version_tarea(t.id), origen)
+    return Markup(cache_fragmentos.obtener_o_crear(clave, lambda: render_template("item_tarea.html", t=t, origen=origen)))
+
+# Al empezar cada solicitud se anota la hora, para medir su duración (y, si se pidió, se empieza a muestrear su pila)
+@app.before_request
+# Se define la función para empezar a medir la solicitud
+def iniciar_medicion():
+    g.inicio_solicitud = time.perf_counter()
+    if perfilador is not None:
+        perfilador.iniciar()
+
+# Al terminar cada solicitud se registra su duración y su código de respuesta
+@app.after_request
+# Se define la función para registrar las métricas de la solicitud
+def registrar_medicion(respuesta):
+    ruta = request.endpoint or "desconocida"
+    if "inicio_solicitud" in g:
+        metricas.observar("todolist_solicitud_segundos", time.perf_counter() - g.inicio_solicitud,
+                          ruta=ruta, metodo=request.method)
+    metricas.sumar("todolist_solicitudes_total", ruta=ruta, codigo=respuesta.status_code)
+    if perfilador is not None:
+        perfilador.terminar(f"{request.method} {request.full_path}")
+    return respuesta
+
+# Se define la función para anotar el momento en que empieza a generarse una plantilla
+def iniciar_plantilla(aplicacion, template, context, **extra):
+    if not hasattr(plantillas_en_curso, "inicios"):
+        plantillas_en_curso.inicios = []
+    plantillas_en_curso.inicios.append(time.perf_counter())
+
+# Se define la función para registrar el tiempo de generación de una plantilla
+def registrar_plantilla(aplicacion, template, context, **extra):
+    inicios = getattr(plantillas_en_curso, "inicios", None)
+    if inicios:
+        metricas.observar("todolist_plantilla_segundos", time.perf_counter() - inicios.pop(), plantilla=template.name)
+
+before_render_template.connect(iniciar_plantilla, app)
+template_rendered.connect(registrar_plantilla, app)
+
+# Antes de cada solicitud se incorporan los cambios que otro proceso (otro worker o la terminal) haya guardado
+@app.before_request
+# Se define la función para refrescar las tareas si el almacenamiento cambió
+def refrescar_tareas():
+    gestor.refrescar()
 
 # Se define la ruta de la página principal
 @app.route("/")
@@ -25,15 +138,19 @@ def menu():
 
 # Se define la ruta para mostrar las tareas
 @app.route("/tareas")
+@con_cache
 # Se define la función para mostrar las tareas
 def ver_tareas():
     filtro_estado = request.args.get("estado")
     fecha_maxima = request.args.get("fecha_maxima")
     ordenar_por = request.args.get("ordenar_por")
 
-    tareas = gestor.obtener_tareas_filtradas(filtro_estado, fecha_maxima, ordenar_por)
+    tareas = gestor.obtener_tareas_filtradas(filtro_estado, fecha_maxima, ordenar_por,
+                                             desplazamiento=desplazamiento_pagina(), limite=TAREAS_POR_PAGINA)
+    # Se conservan los filtros en los enlaces a las demás páginas
+    parametros = {k: v for k, v in request.args.items() if k != "pagina"}
     # Se muestra la página de tareas
-    return render_template("tareas.html", tareas=tareas)
+    return render_template("tareas.html", tareas=tareas, parametros=parametros)
 
 # Se define la ruta para agregar una tarea
 @app.route("/agregar", methods=["GET", "POST"])
@@ -92,66 +209,69 @@ def agregar_tarea():
 
 
 # Se define la ruta para eliminar una tarea
-@app.route("/eliminar/<int:indice>")
+@app.route("/eliminar/<tarea_id>")
 # Se define la función para eliminar una tarea
-def eliminar_tarea(indice):
-    gestor.eliminar_tarea(indice)
+def eliminar_tarea(tarea_id):
+    gestor.eliminar_tarea(tarea_id)
     return redirect(url_for("ver_tareas"))
 
 # Se define la ruta para eliminar una tarea a través de la búsqueda
-@app.route("/eliminar_tarea_buscar/<int:indice>")
+@app.route("/eliminar_tarea_buscar/<tarea_id>")
 # Se define la función para eliminar una tarea a través de la búsqueda
-def eliminar_tarea_buscar(indice):
-    gestor.eliminar_tarea(indice)
+def eliminar_tarea_buscar(tarea_id):
+    gestor.eliminar_tarea(tarea_id)
     return redirect(url_for("buscar_tareas"))
 
 # Se define la ruta para marcar una tarea como pendiente
-@app.route("/marcar_pendiente/<int:indice>")
+@app.route("/marcar_pendiente/<tarea_id>")
 # Se define la función para marcar una tarea como pendiente
-def marcar_pendiente(indice):
-    gestor.marcar_pendiente(indice)
+def marcar_pendiente(tarea_id):
+    gestor.marcar_pendiente(tarea_id)
     return redirect(url_for("ver_tareas"))
 
 # Se define la ruta para marcar una tarea como en progreso
-@app.route("/marcar_progreso/<int:indice>")
+@app.route("/marcar_progreso/<tarea_id>")
 # Se define la función para marcar una tarea como en progreso
-def marcar_progreso(indice):
-    gestor.marcar_progreso(indice)
+def marcar_progreso(tarea_id):
+    gestor.marcar_progreso(tarea_id)
     return redirect(url_for("ver_tareas"))
 
 # Se define la ruta para marcar una tarea como completada
-@app.route("/marcar_completada/<int:indice>")
+@app.route("/marcar_completada/<tarea_id>")
 # Se define la función para marcar una tarea como completada
-def marcar_completada(indice):
-    gestor.marcar_completada(indice)
+def marcar_completada(tarea_id):
+    gestor.marcar_completada(tarea_id)
     return redirect(url_for("ver_tareas"))
 
 # Se define la ruta para marcar una tarea como pendiente a través de la búsqueda
-@app.route("/marcar_pendiente_buscar/<int:indice>")
+@app.route("/marcar_pendiente_buscar/<tarea_id>")
 # Se define la función para marcar una tarea como pendiente a través de la búsqueda
-def marcar_pendiente_buscar(indice):
-    gestor.marcar_pendiente(indice)
+def marcar_pendiente_buscar(tarea_id):
+    gestor.marcar_pendiente(tarea_id)
     return redirect(url_for("buscar_tareas"))
 
 # Se define la ruta para marcar una tarea como en progreso a través de la búsqueda
-@app.route("/marcar_progreso_buscar/<int:indice>")
+@app.route("/marcar_progreso_buscar/<tarea_id>")
 # Se define la función para marcar una tarea como en progreso a través de la búsqueda
-def marcar_progreso_buscar(indice):
-    gestor.marcar_progreso(indice)
+def marcar_progreso_buscar(tarea_id):
+    gestor.marcar_progreso(tarea_id)
     return redirect(url_for("buscar_tareas"))
 
 # Se define la ruta para marcar una tarea como completada a través de la búsqueda
-@app.route("/marcar_completada_buscar/<int:indice>")
+@app.route("/marcar_completada_buscar/<tarea_id>")
 # Se define la función para marcar una tarea como completada a través de la búsqueda
-def marcar_completada_buscar(indice):
-    gestor.marcar_completada(indice)
+def marcar_completada_buscar(tarea_id):
+    gestor.marcar_completada(tarea_id)
     return redirect(url_for("buscar_tareas"))
 
 # Se define la ruta para editar una tarea
-@app.route("/editar/<int:indice>", methods=["GET", "POST"])
+@app.route("/editar/<tarea_id>", methods=["GET", "POST"])
 # Se define la función para editar una tarea
-def editar_tarea(indice):
-    tarea = gestor.lista_tareas[indice]
+def editar_tarea(tarea_id):
+    tarea = gestor.obtener_tarea(tarea_id)
+    # Si la tarea no existe (por ejemplo, fue eliminada), se redirige a la página de origen
+    if tarea is None:
+        return redirect(url_for("ver_tareas"))
     # Se verifica si se envió datos en el método POST
     if request.method == "POST":
         nuevo_titulo = request.form.get("titulo")
@@ -161,18 +281,21 @@ def editar_tarea(indice):
         nueva_categoria = request.form.get("categoria", "")
 
         # Se muestra la página de editar tarea
-        gestor.editar_tarea(indice, nuevo_titulo, nueva_desc, nueva_fecha, nueva_prioridad, nueva_categoria)
+        gestor.editar_tarea(tarea_id, nuevo_titulo, nueva_desc, nueva_fecha, nueva_prioridad, nueva_categoria)
         # Se redirige a la página de tareas después de editar
         return redirect(url_for("ver_tareas"))
     
     # Se muestra la página de editar tarea
-    return render_template("editar.html", tarea=tarea, indice=indice, origen="tareas")
+    return render_template("editar.html", tarea=tarea, origen="tareas")
 
 # Se define la ruta para editar una tarea a través de la búsqueda
-@app.route("/editar_tarea_buscar/<int:indice>", methods=["GET", "POST"])
+@app.route("/editar_tarea_buscar/<tarea_id>", methods=["GET", "POST"])
 # Se define la función para editar una tarea a través de la búsqueda
-def editar_tarea_buscar(indice):
-    tarea = gestor.lista_tareas[indice]
+def editar_tarea_buscar(tarea_id):
+    tarea = gestor.obtener_tarea(tarea_id)
+    # Si la tarea no existe (por ejemplo, fue eliminada), se redirige a la página de origen
+    if tarea is None:
+        return redirect(url_for("buscar_tareas"))
     # Se verifica si se envió datos en el método POST
     if request.method == "POST":
         nuevo_titulo = request.form.get("titulo")
@@ -182,15 +305,16 @@ def editar_tarea_buscar(indice):
         nueva_categoria = request.form.get("categoria", "")
 
         # Se muestra la página de editar tarea a través de la búsqueda
-        gestor.editar_tarea(indice, nuevo_titulo, nueva_desc, nueva_fecha, nueva_prioridad, nueva_categoria)
+        gestor.editar_tarea(tarea_id, nuevo_titulo, nueva_desc, nueva_fecha, nueva_prioridad, nueva_categoria)
         # Se redirige a la página de búsqueda después de editar
         return redirect(url_for("buscar_tareas"))
 
     # Se muestra la página de editar tarea a través de la búsqueda
-    return render_template("editar.html", tarea=tarea, indice=indice, origen="buscar")
+    return render_template("editar.html", tarea=tarea, origen="buscar")
 
 # Se define la ruta para buscar las tareas
 @app.route("/buscar", methods=["GET", "POST"])
+@con_cache
 # Se define la función para buscar las tareas
 def buscar_tareas():
     # Se obtiene los datos de la búsqueda
@@ -198,66 +322,88 @@ def buscar_tareas():
     estado_seleccionado = ""
     prioridad_seleccionada = ""
 
-    if request.method == "POST":
-        texto = request.form.get("texto", "")
-        estado_seleccionado = request.form.get("estado", "")
-        prioridad_seleccionada = request.form.get("prioridad", "")
-
-        # Se verifica si se ingresó un texto para buscar
-        resultados = gestor.buscar_tareas_avanzada(texto, estado_seleccionado, prioridad_seleccionada)
-
-    else:  # Si es GET → mostrar todas las tareas
-        resultados = gestor.lista_tareas
+    # Los datos llegan por el formulario (POST) o por los enlaces de las páginas (GET); sin datos se muestran todas las tareas
+    texto = request.values.get("texto", "")
+    estado_seleccionado = request.values.get("estado", "")
+    prioridad_seleccionada = request.values.get("prioridad", "")
+    categoria = request.values.get("categoria", "")
+    fecha_minima = request.values.get("fecha_minima", "")
+    fecha_maxima = request.values.get("fecha_maxima", "")
+
+    # Se obtiene la página pedida de los resultados de la búsqueda, con todos los filtros combinados
+    resultados = gestor.buscar_tareas_avanzada(texto, estado_seleccionado, prioridad_seleccionada,
+                                               desplazamiento=desplazamiento_pagina(), limite=TAREAS_POR_PAGINA,
+                                               categoria=categoria, fecha_minima=fecha_minima, fecha_maxima=fecha_maxima)
+    parametros = {"texto": texto, "estado": estado_seleccionado, "prioridad": prioridad_seleccionada,
+                  "categoria": categoria, "fecha_minima": fecha_minima, "fecha_maxima": fecha_maxima}
 
     # Se muestra la página de búsqueda con los resultados obtenidos
     return render_template("buscar.html", 
         resultados=resultados, 
         texto=texto, 
         estado_seleccionado=estado_seleccionado, 
-        prioridad_seleccionada=prioridad_seleccionada
+        prioridad_seleccionada=prioridad_seleccionada,
+        categoria=categoria,
+        fecha_minima=fecha_minima,
+        fecha_maxima=fecha_maxima,
+        parametros=parametros
     )
 
+# Se define la ruta para obtener el detalle de una tarea (subtareas y acciones) al abrir su acordeón
+@app.route("/detalle/<tarea_id>")
+# Se define la función para mostrar el detalle de una tarea como fragmento HTML
+def detalle_tarea(tarea_id):
+    tarea = gestor.obtener_tarea(tarea_id)
+    if tarea is None:
+        abort(404)
+    origen = "buscar" if request.args.get("origen") == "buscar" else "tareas"
+    # El detalle se guarda en caché junto con los fragmentos, hasta que la tarea cambie
+    clave = ("detalle", tarea_id, gestor.version_tarea(tarea_id), origen)
+    return cache_fragmentos.obtener_o_crear(
+        clave, lambda: render_template("detalle_tarea.html", t=tarea, tarea_id=tarea_id, origen=origen))
+
 # Se define la ruta para agregar una subtarea a una tarea existente
-@app.route("/agregar_subtarea/<int:indice>", methods=["GET", "POST"])
+@app.route("/agregar_subtarea/<tarea_id>", methods=["GET", "POST"])
 # Se define la función para agregar una subtarea a una tarea existente
-def agregar_subtarea(indice):
-    if 0 <= indice < len(gestor.lista_tareas):
-        tarea = gestor.lista_tareas[indice]
+def agregar_subtarea(tarea_id):
+    tarea = gestor.obtener_tarea(tarea_id)
+    if tarea is not None:
 
         if request.method == "POST":
             subtarea_texto = request.form.get("subtarea")
-            gestor.agregar_subtarea(indice, subtarea_texto)
+            gestor.agregar_subtarea(tarea_id, subtarea_texto)
             # Se redirige a la página de tareas después de agregar la subtarea
             return redirect(url_for("ver_tareas"))
 
         # Se muestra la página de agregar subtarea
         return render_template("agregar_subtarea.html", tarea=tarea, origen="tareas")
 
-    # Si el índice es inválido, se redirige a la página de tareas
+    # Si la tarea no existe, se redirige a la página de tareas
     return redirect(url_for("ver_tareas"))
 
 # Se define la ruta para agregar una subtarea a una tarea existente a través de la búsqueda
-@app.route("/agregar_subtarea_buscar/<int:indice>", methods=["GET", "POST"])
+@app.route("/agregar_subtarea_buscar/<tarea_id>", methods=["GET", "POST"])
 # Se define la función para agregar una subtarea a una tarea existente a través de la búsqueda
-def agregar_subtarea_buscar(indice):
-    if 0 <= indice < len(gestor.lista_tareas):
-        tarea = gestor.lista_tareas[indice]
+def agregar_subtarea_buscar(tarea_id):
+    tarea = gestor.obtener_tarea(tarea_id)
+    if tarea is not None:
 
         if request.method == "POST":
             subtarea_texto = request.form.get("subtarea")
-            gestor.agregar_subtarea(indice, subtarea_texto)
+            gestor.agregar_subtarea(tarea_id, subtarea_texto)
             # Se redirige a la página de búsqueda después de agregar la subtarea
             return redirect(url_for("buscar_tareas"))
 
         # Se muestra la página de agregar subtarea a través de la búsqueda
         return render_template("agregar_subtarea.html", tarea=tarea, origen="buscar")
 
-    # Si el índice es inválido, se redirige a la página de búsqueda
+    # Si la tarea no existe, se redirige a la página de búsqueda
     return redirect(url_for("buscar_tareas"))
 
 
 # Se define la ruta para mostrar las próximas tareas que vencen en un plazo determinado de días
 @app.route("/proximas")
+@con_cache
 # Se define la función para mostrar las próximas tareas que vencen en un plazo determinado de días
 def proximas_tareas():
     tareas = gestor.obtener_proximas_tareas()
@@ -265,32 +411,32 @@ def proximas_tareas():
     return render_template("proximas.html", tareas=tareas)
 
 # Se define la ruta para alternar la completación de una subtarea
-@app.route("/toggle_subtarea/<int:tarea_idx>/<int:subtarea_idx>", methods=["POST"])
+@app.route("/toggle_subtarea/<tarea_id>/<int:subtarea_idx>", methods=["POST"])
 # Se define la función para alternar la completación de una subtarea
-def toggle_subtarea(tarea_idx, subtarea_idx):
-    t = gestor.lista_tareas[tarea_idx]
-    subt = t.subtareas[subtarea_idx]
-    subt["completada"] = not subt["completada"]
-    
-    if all(s["completada"] for s in t.subtareas):
-        gestor.marcar_completada(tarea_idx)
-    elif any(s["completada"] for s in t.subtareas):
-        gestor.marcar_progreso(tarea_idx)
-    else:
-        gestor.marcar_pendiente(tarea_idx)
-    
+def toggle_subtarea(tarea_id, subtarea_idx):
+    # El cambio de la subtarea y del estado de la tarea se hace de una vez en el gestor, para que dos clics simultáneos no se mezclen
+    nuevo_estado = gestor.alternar_subtarea(tarea_id, subtarea_idx)
+    if nuevo_estado is None:
+        abort(404)
+
     return jsonify({
-        "nuevo_estado": t.estado,
-        "indice": tarea_idx
+        "nuevo_estado": nuevo_estado,
+        "id": tarea_id
     })
 
 
+# Se define la ruta para obtener las métricas de la aplicación en el formato de texto de Prometheus
+@app.route("/metrics")
+# Se define la función para mostrar las métricas
+def ver_metricas():
+    return Response(metricas.texto(), mimetype="text/plain; version=0.0.4")
+
 # Se define la ruta para ver las estadísticas de las tareas
 @app.route("/estadisticas")
 # Se define la función para ver las estadísticas de las tareas
 def ver_estadisticas():
     # Se obtienen las cantidades de tareas por estado
-    cantidades_tareas = [len(lista_tareas) for lista_tareas in gestor.obtener_tareas_por_estado()]
+    cantidades_tareas = gestor.obtener_cantidades_por_estado()
     suma = sum(cantidades_tareas)
 
     # Se verifica si hay tareas para mostrar las estadísticas
@@ -302,7 +448,7 @@ def ver_estadisticas():
     conjunto_porcentajes_tareas = [[nombres_estados[i], cantidades_tareas[i], porcentajes_tareas[i]] for i in range(len(nombres_estados))]
 
     # Se obtienen las cantidades de tareas completadas en los últimos días
-    cantidades_ultimas_tareas_completadas = [[i, len(gestor.obtener_ultimas_tareas_completadas(dias=i))] for i in [0, 1, 7, 30]]
+    cantidades_ultimas_tareas_completadas = [[i, gestor.contar_ultimas_tareas_completadas(dias=i)] for i in [0, 1, 7, 30]]
 
 
     # Se muestra la página de estadísticas con los datos obtenidos
@@ -313,6 +459,19 @@ def ver_estadisticas():
     )
 
 
+# Se define la ruta para descargar todas las tareas (?formato=json, ndjson o csv y, en CSV, ?subtareas=anidadas o planas)
+@app.route("/exportar")
+# Se define la función para enviar las tareas a medida que se convierten a texto, sin armar todo el archivo en memoria
+def exportar_tareas():
+    formato = request.args.get("formato", "csv")
+    subtareas = request.args.get("subtareas", "anidadas")
+    if formato not in FORMATOS or subtareas not in MODOS_SUBTAREAS:
+        abort(400)
+
+    return Response(gestor.exportar_tareas(formato, subtareas), mimetype=TIPOS_CONTENIDO[formato],
+                    headers={"Content-Disposition": f"attachment; filename=tareas.{formato}"})
+
+
 # Se ejecuta el servidor web
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,161 @@
+# asgi.py
+# Se define el modo de servidor asíncrono (ASGI) de la aplicación, para servirla con un servidor como uvicorn:
+#   uvicorn asgi:aplicacion --timeout-graceful-shutdown 5
+# (uvicorn espera a que terminen las conexiones antes de cerrar la aplicación, y las de /eventos no terminan solas)
+# Las rutas son las mismas de app.py, servidas con el adaptador WSGI -> ASGI de asgiref (pip install asgiref): cada
+# solicitud se atiende en su propio hilo, de modo que el ciclo de eventos nunca espera al gestor ni al disco (los cambios,
+# además, se guardan en el hilo de guardado del gestor), y puede mantener abiertas muchas conexiones a la vez.
+# Además se agrega /eventos, un flujo de eventos (Server-Sent Events) que avisa a cada cliente conectado cuando cambian
+# las tareas, sin ocupar un hilo por conexión
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app, gestor
+
+# Se define la cantidad máxima de solicitudes de la aplicación Flask que se atienden a la vez (una por hilo)
+HILOS = 32
+# Se define cada cuántos segundos se revisa si cambiaron las tareas (también las guardadas por otro proceso)
+INTERVALO_EVENTOS = 0.5
+# Se define cada cuántos segundos se envía un comentario a los clientes de /eventos para mantener la conexión abierta
+INTERVALO_LATIDO = 15
+
+
+# Se define la función para avisar un cambio (una etiqueta, o None al cerrar el servidor) en la cola de un cliente de
+# /eventos; cada cliente solo necesita el último aviso, así que si no leyó el anterior se reemplaza
+def avisar(cola, valor):
+    if cola.full():
+        cola.get_nowait()
+    cola.put_nowait(valor)
+
+
+# Se define la clase AplicacionASGI, que atiende las solicitudes HTTP con la aplicación WSGI (a través de WsgiToAsgi)
+# y el flujo de /eventos directamente en el ciclo de eventos
+class AplicacionASGI:
+    # Se define el constructor con la aplicación WSGI, el gestor de tareas y la cantidad de solicitudes a la vez
+    # Las llamadas bloqueantes al gestor de /eventos y del cierre usan un grupo de hilos aparte
+    def __init__(self, aplicacion_wsgi, gestor, hilos=HILOS):
+        self.aplicacion_wsgi = WsgiToAsgi(aplicacion_wsgi)
+        self.gestor = gestor
+        self.cupos = asyncio.Semaphore(hilos)
+        self.hilos = ThreadPoolExecutor(2, thread_name_prefix="asgi")
+        self.suscriptores = set()   # una cola por cliente conectado a /eventos
+        self.vigilancia = None
+
+    # Se define el método __call__ que recibe cada conexión del servidor ASGI
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.ciclo_de_vida(receive, send)
+        elif scope["type"] == "http" and scope["path"] == "/eventos" and scope["method"] == "GET":
+            await self.eventos(receive, send)
+        elif scope["type"] == "http":
+            await self.atender(scope, receive, send)
+
+    # Se define el método en_hilo para ejecutar una función bloqueante en el grupo de hilos, sin bloquear el ciclo de eventos
+    async def en_hilo(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.hilos, funcion, *args)
+
+    # Se define el método ciclo_de_vida para atender el inicio y el cierre del servidor
+    # Al cerrar se detiene la vigilancia de cambios, se terminan los flujos de /eventos abiertos y se cierra el gestor,
+    # que guarda los cambios pendientes (en un hilo)
+    async def ciclo_de_vida(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif mensaje["type"] == "lifespan.shutdown":
+                await self.detener_vigilancia()
+                for cola in self.suscriptores:
+                    avisar(cola, None)
+                await self.en_hilo(self.gestor.cerrar)
+                self.hilos.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # Se define el método atender para responder una solicitud con la aplicación WSGI
+    # Cada solicitud usa su propio contexto de asgiref, así que se ejecuta en su propio hilo (y no todas en el mismo);
+    # el semáforo limita cuántas se atienden a la vez
+    async def atender(self, scope, receive, send):
+        async with self.cupos, ThreadSensitiveContext():
+            await self.aplicacion_wsgi(scope, receive, send)
+
+    # Se define el método iniciar_vigilancia para empezar a revisar los cambios de las tareas (si todavía no se revisan)
+    def iniciar_vigilancia(self):
+        if self.vigilancia is None or self.vigilancia.done():
+            self.vigilancia = asyncio.get_running_loop().create_task(self.vigilar())
+
+    # Se define el método detener_vigilancia para cancelar la revisión de cambios y esperar a que termine
+    async def detener_vigilancia(self):
+        if self.vigilancia is None:
+            return
+        self.vigilancia.cancel()
+        try:
+            await self.vigilancia
+        except asyncio.CancelledError:
+            pass
+        self.vigilancia = None
+
+    # Se define el método vigilar, que cada INTERVALO_EVENTOS segundos incorpora los cambios de otros procesos y, si la
+    # etiqueta del gestor cambió, avisa a todos los clientes de /eventos
+    # Una sola tarea revisa los cambios para todos los clientes; termina cuando no queda ningún cliente conectado
+    async def vigilar(self):
+        anterior = self.gestor.etiqueta()
+        while self.suscriptores:
+            await asyncio.sleep(INTERVALO_EVENTOS)
+            try:
+                await self.en_hilo(self.gestor.refrescar)
+            except Exception as e:
+                print(f"Error al refrescar: {e}")
+            etiqueta = self.gestor.etiqueta()
+            if etiqueta != anterior:
+                anterior = etiqueta
+                for cola in self.suscriptores:
+                    avisar(cola, etiqueta)
+
+    # Se define el método evento para obtener el texto de un evento de cambio con la etiqueta y la cantidad de tareas
+    def evento(self, etiqueta):
+        datos = json.dumps({"etiqueta": etiqueta, "tareas": len(self.gestor.tareas)})
+        return f"event: cambio\ndata: {datos}\n\n".encode("utf-8")
+
+    # Se define el método eventos para atender una conexión a /eventos: primero se envía el estado actual y después
+    # un evento por cada cambio, hasta que el cliente se desconecta o se cierra el servidor
+    async def eventos(self, receive, send):
+        cola = asyncio.Queue(maxsize=1)
+        self.suscriptores.add(cola)
+        self.iniciar_vigilancia()
+        desconexion = asyncio.ensure_future(self.esperar_desconexion(receive))
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream; charset=utf-8"), (b"cache-control", b"no-cache")],
+            })
+            await send({"type": "http.response.body", "body": self.evento(self.gestor.etiqueta()), "more_body": True})
+            while not desconexion.done():
+                espera = asyncio.ensure_future(cola.get())
+                listas, _ = await asyncio.wait({espera, desconexion}, timeout=INTERVALO_LATIDO,
+                                               return_when=asyncio.FIRST_COMPLETED)
+                if espera in listas:
+                    if espera.result() is None:
+                        await send({"type": "http.response.body", "body": b""})
+                        return
+                    await send({"type": "http.response.body", "body": self.evento(espera.result()), "more_body": True})
+                    continue
+                espera.cancel()
+                if not desconexion.done():
+                    await send({"type": "http.response.body", "body": b": latido\n\n", "more_body": True})
+        finally:
+            self.suscriptores.discard(cola)
+            desconexion.cancel()
+
+    # Se define el método esperar_desconexion, que termina cuando el cliente cierra la conexión
+    async def esperar_desconexion(self, receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+
+# Se crea la aplicación ASGI sobre la aplicación Flask y el gestor de app.py
+aplicacion = AplicacionASGI(app, gestor)
@@ -0,0 +1,115 @@
+# generador.py
+# Se generan almacenamientos de tareas de prueba con una distribución parecida a la de un uso real:
+#   python -m benchmarks.generador cantidad archivo [--semilla N]
+# - categorías sesgadas: unas pocas concentran la mayoría de las tareas
+# - títulos y descripciones con palabras en español (con acentos), de largo variable
+# - subtareas en parte de las tareas, y el estado coherente con las subtareas completadas
+# - fechas de vencimiento mezcladas: vencidas, próximas (en los siguientes días), lejanas y sin fecha
+# Con la misma semilla y la misma fecha de referencia se generan siempre las mismas tareas
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+
+from core.almacenamiento import serializar_tareas
+from core.persistencia import escribir_atomico_partes
+from core.tarea import Tarea
+
+VERBOS = ("Revisar", "Preparar", "Enviar", "Estudiar", "Comprar", "Llamar a", "Organizar", "Terminar", "Leer", "Corregir",
+          "Pagar", "Planificar", "Escribir", "Actualizar", "Limpiar")
+OBJETOS = ("informe", "presentación", "capítulo", "factura", "reunión", "correo", "ejercicios", "proyecto", "mudanza",
+           "cumpleaños", "examen", "contrato", "jardín", "cocina", "matrícula", "currículum", "tesis", "balance")
+PALABRAS = ("antes", "del", "lunes", "con", "el", "equipo", "según", "lo", "acordado", "revisión", "pendiente", "urgente",
+            "para", "la", "próxima", "semana", "notas", "cálculo", "historia", "cliente", "proveedor", "médico", "banco",
+            "biblioteca", "compras", "familia", "viaje", "año", "mañana", "tarde", "documentos", "archivo", "versión")
+PASOS = ("Buscar información", "Hacer borrador", "Pedir revisión", "Corregir detalles", "Entregar", "Confirmar fecha",
+         "Reunir materiales", "Avisar al equipo")
+# Se definen las categorías con su peso (la mayoría de las tareas queda en las primeras)
+CATEGORIAS = (("Universidad", 40), ("Trabajo", 25), ("Casa", 15), ("Personal", 8), ("", 6), ("Salud", 3), ("Finanzas", 2),
+              ("Viajes", 1))
+PRIORIDADES = (("alta", 2), ("media", 5), ("baja", 3))
+
+
+# Se define la función para formatear una fecha como la guarda la aplicación (dd-mm-aaaa)
+def formatear(fecha):
+    return fecha.strftime("%d-%m-%Y")
+
+
+# Se define la función para generar el diccionario de una tarea de prueba
+def generar_diccionario(azar, numero, hoy):
+    titulo = f"{azar.choice(VERBOS)} {azar.choice(OBJETOS)} {numero}"
+    descripcion = " ".join(azar.choices(PALABRAS, k=azar.choice((0, 0, 4, 8, 12, 20))))
+
+    # Una de cada tres tareas tiene subtareas; el estado depende de cuántas están completadas
+    subtareas = []
+    if azar.random() < 0.35:
+        cantidad = azar.randint(1, 6)
+        hechas = azar.randint(0, cantidad)
+        subtareas = [{"nombre": paso, "completada": j < hechas}
+                     for j, paso in enumerate(azar.sample(PASOS, cantidad))]
+        estado = "completada" if hechas == cantidad else "en progreso" if hechas else "pendiente"
+    else:
+        estado = azar.choices(("pendiente", "en progreso", "completada"), (5, 2, 3))[0]
+
+    creacion = hoy - timedelta(days=azar.randint(0, 365))
+    completada = formatear(hoy - timedelta(days=azar.randint(0, 30))) if estado == "completada" else None
+
+    # Vencimiento: sin fecha, vencida, en los próximos tres días o más adelante
+    tipo = azar.random()
+    if tipo < 0.2:
+        vencimiento = None
+    elif tipo < 0.45:
+        vencimiento = formatear(hoy - timedelta(days=azar.randint(1, 120)))
+    elif tipo < 0.55:
+        vencimiento = formatear(hoy + timedelta(days=azar.randint(1, 3)))
+    else:
+        vencimiento = formatear(hoy + timedelta(days=azar.randint(4, 365)))
+
+    return {
+        "id": f"{numero:032x}",
+        "titulo": titulo,
+        "descripcion": descripcion,
+        "estado": estado,
+        "fecha_creacion": formatear(creacion),
+        "fecha_completada": completada,
+        "fecha_vencimiento": vencimiento,
+        "prioridad": azar.choices(*zip(*PRIORIDADES))[0],
+        "subtareas": subtareas,
+        "categoria": azar.choices(*zip(*CATEGORIAS))[0],
+    }
+
+
+# Se define la función para generar los diccionarios de cantidad tareas, uno a uno
+def generar_diccionarios(cantidad, semilla=1, hoy=None):
+    azar = random.Random(semilla)
+    hoy = hoy or date.today()
+    for numero in range(cantidad):
+        yield generar_diccionario(azar, numero, hoy)
+
+
+# Se define la función para generar cantidad tareas, una a una
+def generar_tareas(cantidad, semilla=1, hoy=None):
+    return (Tarea.from_dict(datos) for datos in generar_diccionarios(cantidad, semilla, hoy))
+
+
+# Se define la función para escribir una instantánea JSON con cantidad tareas, sin tenerlas todas en memoria
+def escribir_almacenamiento(archivo, cantidad, semilla=1, hoy=None):
+    escribir_atomico_partes(archivo, serializar_tareas(generar_tareas(cantidad, semilla, hoy)))
+
+
+# Se define la función principal que lee los argumentos y escribe el archivo
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.generador",
+                                     description="Genera una instantánea JSON con tareas de prueba.")
+    parser.add_argument("cantidad", type=int, help="Cantidad de tareas")
+    parser.add_argument("archivo", help="Ruta de la instantánea a escribir")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla del generador (por defecto, 1)")
+    args = parser.parse_args(argumentos)
+    escribir_almacenamiento(args.archivo, args.cantidad, args.semilla)
+    print(f"Se generaron {args.cantidad} tareas en {args.archivo}.")
+    return 0
+
+
+# Se ejecuta el generador
+if __name__ == "__main__":
+    sys.exit(main())
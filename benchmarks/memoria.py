@@ -0,0 +1,33 @@
+# memoria.py
+# Se mide la memoria que ocupa cada tarea cargada, con tracemalloc:
+#   python -m benchmarks.memoria [cantidad]
+# Las tareas se crean como al cargar la instantánea (Tarea.from_dict sobre diccionarios leídos de JSON), de modo que los
+# textos repetidos (estados, prioridades, categorías, fechas) llegan como objetos distintos, igual que en la aplicación
+import json
+import sys
+import tracemalloc
+
+from benchmarks.generador import generar_diccionarios
+from core.tarea import Tarea
+
+
+# Se define la función para generar las líneas JSON de las tareas de prueba (las mismas de benchmarks/generador.py)
+def generar_lineas(cantidad, semilla=1):
+    return (json.dumps(datos) for datos in generar_diccionarios(cantidad, semilla))
+
+
+# Se define la función para medir los bytes por tarea al cargar cantidad tareas
+def medir(cantidad):
+    lineas = list(generar_lineas(cantidad))
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    tareas = [Tarea.from_dict(json.loads(linea)) for linea in lineas]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (despues - antes) / len(tareas)
+
+
+# Se ejecuta la medición
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{cantidad} tareas: {medir(cantidad):.0f} bytes por tarea")
@@ -0,0 +1,189 @@
+# rendimiento.py
+# Se mide el tiempo y la memoria máxima de las operaciones más usadas sobre un almacenamiento generado:
+#   python -m benchmarks.rendimiento [--tareas N] [--repeticiones N] [--guardar base.json] [--comparar base.json]
+# Cada caso se ejecuta varias veces y se informa el menor tiempo; la memoria máxima se mide en una ejecución más,
+# con tracemalloc (que hace más lentas las operaciones, por eso no se usa al medir el tiempo)
+# Con --comparar se compara contra una base guardada antes con --guardar; si algún caso empeora más que la tolerancia,
+# se marca como regresión y el programa termina con código 1
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from itertools import cycle
+
+from benchmarks.generador import escribir_almacenamiento
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Se definen las diferencias que se consideran ruido aunque superen la tolerancia
+MINIMO_SEGUNDOS = 0.001
+MINIMO_BYTES = 64 * 1024
+
+
+# Se define la función para medir el menor tiempo de varias ejecuciones de una operación
+def medir_tiempo(operacion, repeticiones):
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        operacion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+# Se define la función para medir la memoria máxima usada por una operación (además de la que ya estaba en uso)
+def medir_memoria(operacion):
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.get_traced_memory()[0]
+        operacion()
+        return tracemalloc.get_traced_memory()[1] - antes
+    finally:
+        tracemalloc.stop()
+
+
+# Se define la función para crear los casos a medir: una lista de (nombre, operación)
+# Las operaciones del gestor usan un GestorTareasWeb propio y las rutas, la aplicación Flask con su cliente de prueba;
+# cada uno tiene su copia del archivo, para que los guardados de uno no hagan que el otro vuelva a cargar las tareas
+def crear_casos(archivo, aplicacion):
+    from gestor_web import GestorTareasWeb
+
+    gestor = GestorTareasWeb(archivo=archivo, sincrono=True)
+    gestor.cargar_desde_archivo()
+    cliente = aplicacion.app.test_client()
+    con_subtareas = [t for t in aplicacion.gestor.lista_tareas if t.subtareas][:100]
+    siguiente = cycle(con_subtareas)
+    hasta = (date.today() + timedelta(days=90)).strftime("%d-%m-%Y")
+
+    # Se define la operación de cargar el archivo en un gestor nuevo
+    def cargar():
+        GestorTareasWeb(archivo=archivo, sincrono=True).cargar_desde_archivo()
+
+    # Se define la operación de alternar la primera subtarea de una tarea a través de la ruta de la aplicación
+    def alternar():
+        respuesta = cliente.post(f"/toggle_subtarea/{next(siguiente).id}/0")
+        assert respuesta.status_code == 200, respuesta.status_code
+
+    # Se define la operación de pedir la página de estadísticas
+    def estadisticas():
+        respuesta = cliente.get("/estadisticas")
+        assert respuesta.status_code == 200, respuesta.status_code
+
+    casos = [
+        ("cargar_desde_archivo", cargar),
+        ("guardar_en_archivo", gestor.guardar_en_archivo),
+        ("buscar_tareas_avanzada", lambda: gestor.buscar_tareas_avanzada("informe", "pendiente", "alta", limite=20)),
+        ("buscar_tareas_avanzada[texto]", lambda: gestor.buscar_tareas_avanzada("revisión urgente", limite=20)),
+        ("buscar_tareas_avanzada[combinada]",
+         lambda: gestor.buscar_tareas_avanzada("informe", prioridad="alta", categoria="trabajo", fecha_maxima=hasta,
+                                               limite=20)),
+    ]
+    for ordenar_por in (None, "fecha", "estado", "prioridad"):
+        casos.append((f"obtener_tareas_filtradas[{ordenar_por or 'insercion'}]",
+                      lambda ordenar_por=ordenar_por: gestor.obtener_tareas_filtradas(ordenar_por=ordenar_por, limite=20)))
+    casos.append(("obtener_tareas_filtradas[pendiente]",
+                  lambda: gestor.obtener_tareas_filtradas("pendiente", limite=20)))
+    casos.append(("obtener_proximas_tareas", gestor.obtener_proximas_tareas))
+    casos.append(("ver_estadisticas", estadisticas))
+    if con_subtareas:
+        casos.append(("toggle_subtarea", alternar))
+    return casos
+
+
+# Se define la función para ejecutar todos los casos sobre un almacenamiento de cantidad tareas
+# Devuelve {"tareas": cantidad, "resultados": {caso: {"segundos": s, "memoria": bytes}}}
+def ejecutar(cantidad, repeticiones=5, semilla=1):
+    directorio = tempfile.mkdtemp(prefix="todolist-rendimiento-")
+    anterior = os.getcwd()
+    try:
+        os.makedirs(os.path.join(directorio, "data"))
+        archivo_app = os.path.join(directorio, "data", "tareas.json")
+        archivo = os.path.join(directorio, "data", "gestor.json")
+        escribir_almacenamiento(archivo_app, cantidad, semilla)
+        shutil.copyfile(archivo_app, archivo)
+
+        # La aplicación carga data/tareas.json desde el directorio actual al importarse
+        os.chdir(directorio)
+        sys.path.insert(0, RAIZ)
+        import app as aplicacion
+
+        resultados = {}
+        for nombre, operacion in crear_casos(archivo, aplicacion):
+            segundos = medir_tiempo(operacion, repeticiones)
+            memoria = medir_memoria(operacion)
+            resultados[nombre] = {"segundos": segundos, "memoria": memoria}
+            print(f"{nombre:<40} {segundos * 1000:10.2f} ms {memoria / 1024:12.0f} KiB")
+
+        # Se guardan los cambios de la aplicación antes de borrar el directorio, y ya no hace falta guardarlos al salir
+        aplicacion.gestor.cerrar()
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(directorio, ignore_errors=True)
+    return {"tareas": cantidad, "resultados": resultados}
+
+
+# Se define la función para comparar los resultados con una base; devuelve la lista de casos que empeoraron
+def comparar(resultados, base, tolerancia):
+    regresiones = []
+    print(f"\n{'caso':<40} {'tiempo':>12} {'memoria':>12}")
+    for nombre, actual in resultados["resultados"].items():
+        anterior = base["resultados"].get(nombre)
+        if anterior is None:
+            print(f"{nombre:<40} {'(nuevo)':>12}")
+            continue
+        cambios = []
+        peor = False
+        for campo, minimo in (("segundos", MINIMO_SEGUNDOS), ("memoria", MINIMO_BYTES)):
+            diferencia = actual[campo] - anterior[campo]
+            cambios.append(f"{diferencia / anterior[campo]:+.0%}" if anterior[campo] else "-")
+            if diferencia > minimo and diferencia > anterior[campo] * tolerancia:
+                peor = True
+        print(f"{nombre:<40} {cambios[0]:>12} {cambios[1]:>12}{'  REGRESIÓN' if peor else ''}")
+        if peor:
+            regresiones.append(nombre)
+    return regresiones
+
+
+# Se define la función principal que lee los argumentos, ejecuta los casos y guarda o compara los resultados
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.rendimiento",
+                                     description="Mide el tiempo y la memoria de las operaciones principales.")
+    parser.add_argument("--tareas", type=int, default=10000, help="Cantidad de tareas generadas (por defecto, 10000)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Ejecuciones de cada caso (por defecto, 5)")
+    parser.add_argument("--semilla", type=int, default=1, help="Semilla del generador (por defecto, 1)")
+    parser.add_argument("--guardar", help="Guarda los resultados como base en este archivo JSON")
+    parser.add_argument("--comparar", help="Compara los resultados con la base guardada en este archivo JSON")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="Aumento permitido respecto de la base (por defecto, 0.25 = 25%%)")
+    args = parser.parse_args(argumentos)
+
+    base = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if base["tareas"] != args.tareas:
+            print(f"La base se midió con {base['tareas']} tareas; usa --tareas {base['tareas']}.")
+            return 1
+
+    resultados = ejecutar(args.tareas, args.repeticiones, args.semilla)
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=4)
+        print(f"\nSe guardaron los resultados en {args.guardar}.")
+    if base is not None:
+        regresiones = comparar(resultados, base, args.tolerancia)
+        if regresiones:
+            print(f"\n{len(regresiones)} casos empeoraron más de {args.tolerancia:.0%}: {', '.join(regresiones)}")
+            return 1
+        print("\nNingún caso empeoró respecto de la base.")
+    return 0
+
+
+# Se ejecutan las mediciones
+if __name__ == "__main__":
+    sys.exit(main())
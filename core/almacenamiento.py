@@ -0,0 +1,684 @@
+# almacenamiento.py
+# Se definen los motores de almacenamiento que puede usar GestorTareasWeb. Todos ofrecen los mismos métodos:
+#   cargar()                 -> lista de tareas guardadas
+#   guardar_tarea(tarea)     -> guarda (agrega o actualiza) una sola tarea
+#   eliminar_tarea(id)       -> elimina una sola tarea
+#   guardar_cambios(cambios) -> guarda de una vez varios cambios {id: tarea, o None para eliminarla}
+#   guardar_todo(tareas)     -> reemplaza todo el contenido guardado
+#   necesita_compactar()     -> indica si conviene llamar a guardar_todo
+# Para que varios procesos usen el mismo almacenamiento también ofrecen:
+#   bloquear()               -> candado entre procesos; las lecturas y escrituras se hacen con él tomado
+#   hay_cambios_externos()   -> indica, sin leer el contenido, si otro proceso guardó cambios
+#   leer_cambios_externos()  -> (completo, datos): todas las tareas si completo es True, o solo los registros nuevos
+# Para exportar sin cargar todo el contenido ofrecen:
+#   recorrer()               -> las tareas guardadas, una a una y en el mismo orden que cargar()
+import json
+import os
+import re
+import sqlite3
+import threading
+import zlib
+
+from core.tarea import Tarea
+from core.persistencia import (CandadoArchivo, DiarioTareas, FirmaIncremental, escribir_atomico, escribir_atomico_partes,
+                               estado_archivo, firma_contenido)
+from core.binario import InstantaneaBinaria, escribir_instantanea_binaria
+from core.intercambio import decodificar_bloques, exportar_json, agrupar, iterar_arreglo_json, leer_bloques
+
+
+# Se define la función para serializar una lista de tareas al formato JSON de la instantánea, en partes (bytes)
+def serializar_tareas(tareas):
+    return (texto.encode("utf-8") for texto in agrupar(exportar_json(tareas)))
+
+
+# Se define la función para aplicar registros del diario sobre un diccionario id -> tarea
+# Los registros por id son idempotentes; los registros por índice corresponden a diarios de versiones anteriores
+def aplicar_registros(tareas, registros):
+    for registro in registros:
+        op = registro.get("op")
+        if op in ("guardar", "agregar"):
+            tarea = Tarea.from_dict(registro["tarea"])
+            tareas[tarea.id] = tarea
+        elif op == "eliminar" and "id" in registro:
+            tareas.pop(registro["id"], None)
+        elif op == "actualizar":
+            tarea = Tarea.from_dict(registro["tarea"])
+            tarea.id = list(tareas)[registro["indice"]]
+            tareas[tarea.id] = tarea
+        elif op == "eliminar":
+            del tareas[list(tareas)[registro["indice"]]]
+
+
+# Se define la función para recorrer las tareas de una instantánea aplicando los registros del diario, una a una
+# Solo se guardan en memoria las tareas de los registros; el resultado y su orden son los mismos que con aplicar_registros
+def combinar_registros(tareas, registros):
+    # Los registros por índice (diarios de versiones anteriores) necesitan todas las tareas
+    if any("indice" in registro for registro in registros):
+        todas = {tarea.id: tarea for tarea in tareas}
+        aplicar_registros(todas, registros)
+        yield from todas.values()
+        return
+
+    # Se obtiene el último contenido de cada tarea registrada (None si quedó eliminada)
+    # Una tarea eliminada y vuelta a guardar pasa al final, como en un diccionario
+    cambios = {}
+    movidas = set()
+    for registro in registros:
+        op = registro.get("op")
+        if op in ("guardar", "agregar"):
+            tarea = Tarea.from_dict(registro["tarea"])
+            if tarea.id in movidas:
+                cambios.pop(tarea.id, None)
+            cambios[tarea.id] = tarea
+        elif op == "eliminar":
+            cambios[registro["id"]] = None
+            movidas.add(registro["id"])
+
+    for tarea in tareas:
+        if tarea.id in movidas:
+            continue
+        if tarea.id in cambios:
+            tarea = cambios.pop(tarea.id)
+        yield tarea
+    for tarea in cambios.values():
+        if tarea is not None:
+            yield tarea
+
+
+# Se define la clase AlmacenamientoJSON: una instantánea JSON más un diario con un registro por cambio
+# Cada cierto número de registros se compacta el diario en una nueva instantánea (con generaciones rotadas)
+class AlmacenamientoJSON:
+    extension = ".json"
+
+    # Se define el constructor con la ruta de la instantánea, el tamaño máximo del diario y las generaciones a conservar
+    def __init__(self, archivo="data/tareas.json", max_registros_diario=1000, generaciones=3):
+        self.archivo = archivo
+        self.generaciones = generaciones
+        self.diario = DiarioTareas(archivo + ".diario", max_registros_diario)
+        self.compactar_pendiente = False
+        self.candado = CandadoArchivo(archivo + ".lock")
+        self.estado_instantanea = None
+
+    # Se define el método bloquear para tomar el candado entre procesos de la instantánea y el diario
+    def bloquear(self):
+        return self.candado.bloqueado()
+
+    # Se define el método leer_instantanea para leer las tareas de la instantánea: devuelve (tareas, firma, sin_id),
+    # con tareas como diccionario id -> tarea y sin_id indicando si alguna tarea no tenía id (archivos anteriores)
+    # La instantánea se lee por bloques y se crea cada tarea a medida que se lee, sin tener todo el archivo en memoria
+    def leer_instantanea(self):
+        tareas = {}
+        sin_id = False
+        with open(self.archivo, "rb") as f:
+            contenido = FirmaIncremental()
+            bloques = (contenido.actualizar(bloque) and bloque for bloque in leer_bloques(f))
+            for datos in iterar_arreglo_json(decodificar_bloques(bloques)):
+                sin_id = sin_id or "id" not in datos
+                tarea = Tarea.from_dict(datos)
+                tareas[tarea.id] = tarea
+        return tareas, contenido.valor(), sin_id
+
+    # Se define el método abrir_instantanea para obtener la firma de la instantánea y un iterador de sus tareas
+    # El archivo se abre en el momento (y se recorre una vez para calcular la firma), pero cada tarea se crea a medida
+    # que se pide; el archivo abierto se sigue pudiendo leer aunque otro proceso lo reemplace mientras tanto
+    def abrir_instantanea(self):
+        f = open(self.archivo, "rb")
+        contenido = FirmaIncremental()
+        for bloque in leer_bloques(f):
+            contenido.actualizar(bloque)
+        f.seek(0)
+
+        # Se define la función que crea las tareas y cierra el archivo al terminar
+        def tareas():
+            with f:
+                for datos in iterar_arreglo_json(decodificar_bloques(leer_bloques(f))):
+                    yield Tarea.from_dict(datos)
+
+        return contenido.valor(), tareas()
+
+    # Se define el método escribir_instantanea para escribir una nueva instantánea de forma atómica y obtener su firma
+    def escribir_instantanea(self, tareas):
+        return escribir_atomico_partes(self.archivo, serializar_tareas(tareas), self.generaciones)
+
+    # Se define el método cargar para leer la instantánea y reproducir los cambios registrados en el diario
+    def cargar(self):
+        try:
+            tareas, firma, sin_id = self.leer_instantanea()
+        except FileNotFoundError:
+            print("No se encontró archivo, empezando con lista vacía.")
+            tareas, firma, sin_id = {}, firma_contenido(b""), False
+        self.estado_instantanea = estado_archivo(self.archivo)
+
+        registros = self.diario.leer(firma)
+        if registros is None:
+            self.diario.iniciar(firma)
+        else:
+            aplicar_registros(tareas, registros)
+
+        # Si se reprodujo el diario o alguna tarea no tenía id (archivos anteriores), conviene compactar
+        self.compactar_pendiente = bool(registros) or sin_id
+        return list(tareas.values())
+
+    # Se define el método recorrer para obtener las tareas guardadas una a una, sin cargarlas todas
+    # Con el candado tomado solo se abre la instantánea y se leen los registros del diario (con otro lector, para no cambiar
+    # la posición del diario de este almacenamiento); las tareas se leen después, a medida que se piden
+    def recorrer(self):
+        with self.bloquear():
+            return self.abrir_tareas()
+
+    # Se define el método abrir_tareas para hacer lo mismo que recorrer sin tomar el candado (quien llama ya lo tiene)
+    def abrir_tareas(self):
+        try:
+            firma, tareas = self.abrir_instantanea()
+        except FileNotFoundError:
+            firma, tareas = firma_contenido(b""), ()
+        registros = DiarioTareas(self.diario.archivo).leer(firma) or []
+        return combinar_registros(tareas, registros)
+
+    # Se define el método guardar_tarea para anexar al diario el contenido actual de una tarea
+    def guardar_tarea(self, tarea):
+        self.diario.registrar({"op": "guardar", "tarea": tarea.to_dict()})
+
+    # Se define el método eliminar_tarea para anexar al diario la eliminación de una tarea
+    def eliminar_tarea(self, tarea_id):
+        self.diario.registrar({"op": "eliminar", "id": tarea_id})
+
+    # Se define el método guardar_cambios para anexar al diario varios cambios con una sola escritura
+    def guardar_cambios(self, cambios):
+        self.diario.registrar_varios([
+            {"op": "eliminar", "id": tarea_id} if tarea is None else {"op": "guardar", "tarea": tarea.to_dict()}
+            for tarea_id, tarea in cambios.items()
+        ])
+
+    # Se define el método guardar_todo para escribir una nueva instantánea y reiniciar el diario sobre ella
+    def guardar_todo(self, tareas):
+        firma = self.escribir_instantanea(tareas)
+        self.estado_instantanea = estado_archivo(self.archivo)
+        self.diario.iniciar(firma)
+        self.compactar_pendiente = False
+
+    # Se define el método necesita_compactar para saber si hay que escribir una nueva instantánea
+    def necesita_compactar(self):
+        return self.compactar_pendiente or self.diario.necesita_compactar()
+
+    # Se define el método hay_cambios_externos para saber si otro proceso cambió la instantánea o agregó registros al diario
+    def hay_cambios_externos(self):
+        return estado_archivo(self.archivo) != self.estado_instantanea or self.diario.cambio_externo()
+
+    # Se define el método leer_cambios_externos para obtener lo que otro proceso guardó
+    # Si la instantánea es la misma, basta con los registros nuevos del diario; si no, se vuelve a cargar todo
+    def leer_cambios_externos(self):
+        if estado_archivo(self.archivo) == self.estado_instantanea:
+            registros = self.diario.leer_nuevos()
+            if registros is not None:
+                return False, registros
+        return True, self.cargar()
+
+
+# Se define la clase AlmacenamientoBinario: como AlmacenamientoJSON (con el mismo diario), pero con la instantánea
+# en el formato binario de core/binario.py, que se abre con mmap y crea tareas perezosas
+# Al iniciar solo se leen los registros de tamaño fijo; los textos de cada tarea se leen la primera vez que se usan
+class AlmacenamientoBinario(AlmacenamientoJSON):
+    extension = ".bin"
+
+    # Se define el constructor con la ruta de la instantánea binaria
+    def __init__(self, archivo="data/tareas.bin", max_registros_diario=1000, generaciones=3):
+        super().__init__(archivo, max_registros_diario, generaciones)
+
+    # Se define el método leer_instantanea para abrir la instantánea binaria; su firma es el identificador guardado en el pie
+    def leer_instantanea(self):
+        instantanea = InstantaneaBinaria(self.archivo)
+        return {tarea.id: tarea for tarea in instantanea.tareas()}, instantanea.firma, False
+
+    # Se define el método abrir_instantanea para obtener la firma de la instantánea binaria y sus tareas perezosas
+    def abrir_instantanea(self):
+        instantanea = InstantaneaBinaria(self.archivo)
+        return instantanea.firma, instantanea.tareas()
+
+    # Se define el método escribir_instantanea para escribir una nueva instantánea binaria
+    # Los textos de las tareas que todavía no se leyeron se copian de la instantánea anterior sin convertirlos
+    def escribir_instantanea(self, tareas):
+        return escribir_instantanea_binaria(self.archivo, tareas, self.generaciones)
+
+
+# Se define la clase AlmacenamientoPorCategoria: una partición por categoría (cada una con su instantánea y su diario,
+# como AlmacenamientoJSON o AlmacenamientoBinario) dentro de un directorio, más un manifiesto con el archivo de cada categoría
+# Cada cambio se anexa solo al diario de la partición de su tarea y, cuando ese diario se llena, se reescribe solo esa partición
+# Con recorrer(categorias) se leen solo las particiones de algunas categorías, sin abrir las demás
+# cargar() lee todas las particiones: GestorTareasWeb necesita todas las tareas para sus índices, contadores y
+# compactaciones, así que la lectura de una sola partición queda para las exportaciones por categoría
+# Las tareas se cargan agrupadas por categoría (en orden de inserción dentro de cada una)
+class AlmacenamientoPorCategoria:
+    # Se define el constructor con el directorio de las particiones y la clase de almacenamiento de cada una
+    def __init__(self, directorio="data/categorias", max_registros_diario=1000, generaciones=3,
+                 clase_particion=AlmacenamientoJSON):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.archivo = os.path.join(directorio, "manifiesto.json")
+        self.max_registros_diario = max_registros_diario
+        self.generaciones = generaciones
+        self.clase_particion = clase_particion
+        self.candado = CandadoArchivo(self.archivo + ".lock")
+        self.archivos = {}          # categoría -> nombre del archivo de su partición (el contenido del manifiesto)
+        self.estado_manifiesto = None
+        self.particiones = {}       # categoría -> almacenamiento de su partición
+        self.tareas_particion = {}  # categoría -> {id: tarea} con lo guardado en la partición (solo las particiones leídas)
+        self.categoria_de = {}      # id -> categoría de la partición donde está guardada la tarea
+        self.compactar_pendiente = False
+
+    # Se define el método bloquear para tomar el candado entre procesos de todas las particiones
+    def bloquear(self):
+        return self.candado.bloqueado()
+
+    # Se define el método nombre_particion para obtener el nombre del archivo de una categoría
+    # Se agrega la firma del nombre para que categorías que solo difieren en mayúsculas o acentos no compartan archivo
+    def nombre_particion(self, categoria):
+        base = re.sub(r"[^a-z0-9]+", "-", categoria.lower()).strip("-")[:40] or "sin-categoria"
+        return f"{base}-{zlib.crc32(categoria.encode('utf-8')):08x}{self.clase_particion.extension}"
+
+    # Se define el método leer_archivos para leer del manifiesto el archivo de cada categoría ({} si no hay manifiesto)
+    def leer_archivos(self):
+        try:
+            with open(self.archivo, encoding="utf-8") as f:
+                return json.load(f)["particiones"]
+        except FileNotFoundError:
+            return {}
+
+    # Se define el método leer_manifiesto para leer el archivo de cada categoría; devuelve False si no hay manifiesto
+    def leer_manifiesto(self):
+        self.estado_manifiesto = estado_archivo(self.archivo)
+        archivos = self.leer_archivos()
+        if archivos != self.archivos:
+            self.particiones = {}
+        self.archivos = archivos
+        return self.estado_manifiesto is not None
+
+    # Se define el método escribir_manifiesto para guardar el archivo de cada categoría
+    def escribir_manifiesto(self):
+        escribir_atomico(self.archivo, json.dumps({"particiones": self.archivos}, ensure_ascii=False, indent=4).encode("utf-8"))
+        self.estado_manifiesto = estado_archivo(self.archivo)
+
+    # Se define el método particion para obtener el almacenamiento de la partición de una categoría
+    def particion(self, categoria):
+        particion = self.particiones.get(categoria)
+        if particion is None:
+            archivo = os.path.join(self.directorio, self.archivos[categoria])
+            particion = self.particiones[categoria] = self.clase_particion(archivo, self.max_registros_diario,
+                                                                           self.generaciones)
+        return particion
+
+    # Se define el método cargar_particion para leer las tareas de una partición (reproduciendo su diario)
+    # Si la partición lo necesita, se compacta en el momento: solo se reescribe esa partición
+    def cargar_particion(self, categoria):
+        particion = self.particion(categoria)
+        tareas = {tarea.id: tarea for tarea in particion.cargar()}
+        if particion.necesita_compactar():
+            particion.guardar_todo(list(tareas.values()))
+        self.tareas_particion[categoria] = tareas
+        for tarea_id in tareas:
+            self.categoria_de[tarea_id] = categoria
+        return tareas
+
+    # Se define el método tareas_de para obtener las tareas guardadas en la partición de una categoría
+    # La partición se lee si todavía no se leyó y se crea (con una instantánea vacía) si la categoría es nueva
+    # Antes de crearla se vuelve a leer el manifiesto, porque otro proceso pudo haber creado esa partición (u otras)
+    # desde la última lectura; sus categorías se conservan al escribirlo, pero el manifiesto queda como no leído
+    # para que hay_cambios_externos siga indicando que hay que cargar sus tareas
+    def tareas_de(self, categoria):
+        tareas = self.tareas_particion.get(categoria)
+        if tareas is not None:
+            return tareas
+        if categoria not in self.archivos:
+            visto = estado_archivo(self.archivo) == self.estado_manifiesto
+            for otra, archivo in self.leer_archivos().items():
+                self.archivos.setdefault(otra, archivo)
+        if categoria in self.archivos:
+            return self.cargar_particion(categoria)
+        self.archivos[categoria] = self.nombre_particion(categoria)
+        self.particion(categoria).guardar_todo([])
+        self.escribir_manifiesto()
+        if not visto:
+            self.estado_manifiesto = None
+        tareas = self.tareas_particion[categoria] = {}
+        return tareas
+
+    # Se define el método categorias para obtener las categorías guardadas, sin leer sus particiones
+    def categorias(self):
+        with self.bloquear():
+            self.leer_manifiesto()
+        return list(self.archivos)
+
+    # Se define el método cargar para leer todas las particiones
+    # Si una tarea quedó en dos particiones (una caída a mitad de un cambio de categoría), vale la de su categoría
+    def cargar(self):
+        if not self.leer_manifiesto():
+            print("No se encontró archivo, empezando con lista vacía.")
+        self.particiones = {}
+        self.tareas_particion = {}
+        self.categoria_de = {}
+        self.compactar_pendiente = False
+        tareas = {}
+        origen = {}     # id -> categoría de la partición de la que se tomó la tarea
+        for categoria in self.archivos:
+            for tarea in self.cargar_particion(categoria).values():
+                if tarea.id in tareas:
+                    self.compactar_pendiente = True
+                    if tarea.categoria != categoria:
+                        continue
+                tareas[tarea.id] = tarea
+                origen[tarea.id] = categoria
+        self.categoria_de = origen
+        return list(tareas.values())
+
+    # Se define el método recorrer para obtener las tareas guardadas una a una, partición por partición
+    # (o solo las de algunas categorías), sin cargarlas todas
+    # Con el candado tomado solo se lee el manifiesto y se abren las particiones (sin cambiar el estado de este
+    # almacenamiento, que puede estar en uso); una tarea guardada fuera de la partición de su categoría
+    # (una caída a mitad de un cambio de categoría) se entrega al final, si no estaba también en la suya
+    def recorrer(self, categorias=None):
+        with self.bloquear():
+            abiertas = [
+                (categoria, self.clase_particion(os.path.join(self.directorio, archivo), self.max_registros_diario,
+                                                 self.generaciones).abrir_tareas())
+                for categoria, archivo in self.leer_archivos().items() if categorias is None or categoria in categorias
+            ]
+        return self.combinar_particiones(abiertas, categorias is None)
+
+    # Se define el método combinar_particiones para recorrer las tareas de las particiones abiertas por recorrer
+    # Si no se abrieron todas, las tareas guardadas fuera de la partición de su categoría se omiten (no se puede saber
+    # si también están en la suya)
+    def combinar_particiones(self, abiertas, todas):
+        vistas = set()
+        fuera = {}
+        for categoria, tareas in abiertas:
+            for tarea in tareas:
+                if tarea.categoria != categoria:
+                    fuera.setdefault(tarea.id, tarea)
+                elif tarea.id not in vistas:
+                    vistas.add(tarea.id)
+                    yield tarea
+        for tarea in fuera.values():
+            if todas and tarea.id not in vistas:
+                yield tarea
+
+    # Se define el método guardar_tarea para guardar una tarea en la partición de su categoría
+    def guardar_tarea(self, tarea):
+        self.guardar_cambios({tarea.id: tarea})
+
+    # Se define el método eliminar_tarea para eliminar una tarea de su partición
+    def eliminar_tarea(self, tarea_id):
+        self.guardar_cambios({tarea_id: None})
+
+    # Se define el método guardar_cambios para repartir los cambios entre las particiones afectadas
+    # Una tarea que cambió de categoría se elimina de su partición anterior; primero se escribe en las particiones de destino,
+    # de modo que una caída a mitad del cambio deja la tarea repetida (se resuelve al cargar) y no perdida
+    def guardar_cambios(self, cambios):
+        por_particion = {}
+        for tarea_id, tarea in cambios.items():
+            anterior = self.categoria_de.get(tarea_id)
+            categoria = None if tarea is None else tarea.categoria or ""
+            if anterior is not None and anterior != categoria:
+                por_particion.setdefault(anterior, {})[tarea_id] = None
+            if categoria is not None:
+                por_particion.setdefault(categoria, {})[tarea_id] = tarea
+
+        for eliminaciones in (False, True):
+            for categoria, cambios_particion in por_particion.items():
+                parte = {i: t for i, t in cambios_particion.items() if (t is None) == eliminaciones}
+                if parte:
+                    self.guardar_en_particion(categoria, parte)
+
+    # Se define el método guardar_en_particion para anexar cambios al diario de una partición (o reescribirla si hace falta)
+    def guardar_en_particion(self, categoria, cambios):
+        tareas = self.tareas_de(categoria)
+        for tarea_id, tarea in cambios.items():
+            if tarea is None:
+                tareas.pop(tarea_id, None)
+                if self.categoria_de.get(tarea_id) == categoria:
+                    del self.categoria_de[tarea_id]
+            else:
+                tareas[tarea_id] = tarea
+                self.categoria_de[tarea_id] = categoria
+
+        particion = self.particion(categoria)
+        if not particion.necesita_compactar():
+            particion.guardar_cambios(cambios)
+        if particion.necesita_compactar():
+            particion.guardar_todo(list(tareas.values()))
+
+    # Se define el método guardar_todo para reescribir todas las particiones con las tareas indicadas
+    # Las particiones de las categorías que ya no tienen tareas se quitan del manifiesto y se borran
+    def guardar_todo(self, tareas):
+        grupos = {}
+        for tarea in tareas:
+            grupos.setdefault(tarea.categoria or "", {})[tarea.id] = tarea
+
+        anteriores = {categoria: archivo for categoria, archivo in self.archivos.items() if categoria not in grupos}
+        for categoria, grupo in grupos.items():
+            self.archivos.setdefault(categoria, self.nombre_particion(categoria))
+            self.particion(categoria).guardar_todo(list(grupo.values()))
+        for categoria in anteriores:
+            del self.archivos[categoria]
+            self.particiones.pop(categoria, None)
+        self.escribir_manifiesto()
+
+        for archivo in anteriores.values():
+            archivo = os.path.join(self.directorio, archivo)
+            for ruta in [archivo, archivo + ".diario"] + [f"{archivo}.{i}" for i in range(1, self.generaciones + 1)]:
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+
+        self.tareas_particion = grupos
+        self.categoria_de = {tarea_id: categoria for categoria, grupo in grupos.items() for tarea_id in grupo}
+        self.compactar_pendiente = False
+
+    # Se define el método necesita_compactar; cada partición se compacta por separado al llenarse su diario,
+    # así que solo hace falta reescribir todo si al cargar una tarea apareció en dos particiones
+    def necesita_compactar(self):
+        return self.compactar_pendiente
+
+    # Se define el método hay_cambios_externos para saber si otro proceso cambió el manifiesto o alguna partición leída
+    def hay_cambios_externos(self):
+        return (estado_archivo(self.archivo) != self.estado_manifiesto
+                or any(particion.hay_cambios_externos() for particion in self.particiones.values()))
+
+    # Se define el método leer_cambios_externos para obtener lo que otro proceso guardó
+    # Si solo se agregaron registros a los diarios, se devuelven esos registros; si cambió el manifiesto, alguna instantánea
+    # o una misma tarea aparece en los registros de dos particiones (no se sabe en qué orden ocurrieron), se vuelve a cargar todo
+    def leer_cambios_externos(self):
+        if estado_archivo(self.archivo) == self.estado_manifiesto:
+            por_particion = {}
+            for categoria, particion in self.particiones.items():
+                if not particion.hay_cambios_externos():
+                    continue
+                completo, registros = particion.leer_cambios_externos()
+                if completo:
+                    break
+                por_particion[categoria] = registros
+            else:
+                vistos = {}
+                for categoria, registros in por_particion.items():
+                    for registro in registros:
+                        tarea_id = registro["tarea"].get("id") if "tarea" in registro else registro.get("id")
+                        if vistos.setdefault(tarea_id, categoria) != categoria:
+                            return True, self.cargar()
+                aplicados = []
+                for categoria, registros in por_particion.items():
+                    aplicados.extend(self.aplicar_en_particion(categoria, registros))
+                return False, aplicados
+        return True, self.cargar()
+
+    # Se define el método aplicar_en_particion para aplicar los registros nuevos de una partición a las tareas guardadas
+    # Devuelve los registros que cambian las tareas: la eliminación de una tarea que ya se movió a otra partición se omite
+    def aplicar_en_particion(self, categoria, registros):
+        tareas = self.tareas_particion.setdefault(categoria, {})
+        aplicados = []
+        for registro in registros:
+            op = registro.get("op")
+            if op in ("guardar", "agregar"):
+                tarea = Tarea.from_dict(registro["tarea"])
+                anterior = self.categoria_de.get(tarea.id)
+                if anterior is not None and anterior != categoria:
+                    self.tareas_particion.get(anterior, {}).pop(tarea.id, None)
+                tareas[tarea.id] = tarea
+                self.categoria_de[tarea.id] = categoria
+                aplicados.append(registro)
+            elif op == "eliminar" and "id" in registro:
+                tareas.pop(registro["id"], None)
+                if self.categoria_de.get(registro["id"]) == categoria:
+                    del self.categoria_de[registro["id"]]
+                    aplicados.append(registro)
+        return aplicados
+
+
+# Se define la clase AlmacenamientoSQLite: una tabla con una fila por tarea, en modo WAL
+# Cada cambio escribe solo la fila afectada; las consultas del gestor se resuelven en memoria, con sus propios índices,
+# así que la tabla no tiene índices secundarios (solo la clave primaria)
+# La conexión se comparte entre los hilos de las peticiones y el hilo de guardado, así que se usa siempre con un candado
+class AlmacenamientoSQLite:
+    COLUMNAS = ("id", "titulo", "descripcion", "estado", "fecha_creacion", "fecha_completada", "fecha_vencimiento",
+                "ordinal_vencimiento", "ordinal_completada", "prioridad", "subtareas", "categoria")
+
+    # Se define la cantidad de filas que recorrer lee cada vez que toma el candado de la conexión
+    FILAS_POR_LECTURA = 500
+
+    # Se define el constructor que abre la base de datos y crea la tabla si no existe
+    # Los índices secundarios de versiones anteriores se eliminan: ninguna consulta los usa y encarecen cada escritura
+    def __init__(self, archivo="data/tareas.db"):
+        self.archivo = archivo
+        self.candado_conexion = threading.Lock()
+        self.conexion = sqlite3.connect(archivo, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.candado = CandadoArchivo(archivo + ".lock")
+        self.version_datos = None
+        with self.conexion:
+            self.conexion.executescript("""
+                CREATE TABLE IF NOT EXISTS tareas (
+                    id TEXT PRIMARY KEY,
+                    titulo TEXT NOT NULL,
+                    descripcion TEXT,
+                    estado TEXT,
+                    fecha_creacion TEXT,
+                    fecha_completada TEXT,
+                    fecha_vencimiento TEXT,
+                    ordinal_vencimiento INTEGER,
+                    ordinal_completada INTEGER,
+                    prioridad TEXT,
+                    subtareas TEXT,
+                    categoria TEXT
+                );
+                DROP INDEX IF EXISTS idx_tareas_estado;
+                DROP INDEX IF EXISTS idx_tareas_prioridad;
+                DROP INDEX IF EXISTS idx_tareas_vencimiento;
+                DROP INDEX IF EXISTS idx_tareas_categoria;
+            """)
+
+    # Se define el método bloquear para tomar el candado entre procesos (SQLite ya protege cada transacción,
+    # pero el candado evita que un proceso reemplace todo el contenido sin haber visto los cambios de otro)
+    def bloquear(self):
+        return self.candado.bloqueado()
+
+    # Se define el método version para obtener el número de versión de la base de datos
+    # SQLite lo cambia cuando otra conexión (otro proceso) confirma cambios, pero no con los cambios propios
+    def version(self):
+        with self.candado_conexion:
+            return self.conexion.execute("PRAGMA data_version").fetchone()[0]
+
+    # Se define el método fila para convertir una tarea a la tupla de valores de sus columnas
+    def fila(self, tarea):
+        return (tarea.id, tarea.titulo, tarea.descripcion, tarea.estado, tarea.fecha_creacion, tarea.fecha_completada,
+                tarea.fecha_vencimiento, tarea.ordinal_vencimiento, tarea.ordinal_completada, tarea.prioridad,
+                json.dumps([s.to_dict() for s in tarea.subtareas], ensure_ascii=False), tarea.categoria)
+
+    # Se define el método cargar para leer todas las filas en orden de inserción
+    def cargar(self):
+        self.version_datos = self.version()
+        return list(self.recorrer())
+
+    # Se define el método recorrer para obtener las tareas una a una, en orden de inserción, a medida que se leen las filas
+    # Las filas se leen por tandas, continuando desde el último rowid leído, para no tener tomado el candado de la
+    # conexión (ni un cursor abierto) mientras quien recorre procesa cada tarea
+    def recorrer(self):
+        columnas = ", ".join(self.COLUMNAS)
+        ultimo = 0
+        while True:
+            with self.candado_conexion:
+                filas = self.conexion.execute(f"SELECT rowid, {columnas} FROM tareas WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                                              (ultimo, self.FILAS_POR_LECTURA)).fetchall()
+            for fila in filas:
+                datos = dict(zip(self.COLUMNAS, fila[1:]))
+                datos["subtareas"] = json.loads(datos["subtareas"] or "[]")
+                yield Tarea.from_dict(datos)
+            if len(filas) < self.FILAS_POR_LECTURA:
+                return
+            ultimo = filas[-1][0]
+
+    # Se define el método guardar_tarea para insertar o actualizar la fila de una tarea (conservando su posición)
+    def guardar_tarea(self, tarea):
+        self.guardar_cambios({tarea.id: tarea})
+
+    # Se define el método guardar_cambios para insertar, actualizar y eliminar varias filas en una sola transacción
+    def guardar_cambios(self, cambios):
+        columnas = ", ".join(self.COLUMNAS)
+        marcadores = ", ".join("?" for _ in self.COLUMNAS)
+        actualizaciones = ", ".join(f"{c} = excluded.{c}" for c in self.COLUMNAS[1:])
+        with self.candado_conexion, self.conexion:
+            self.conexion.executemany(
+                f"INSERT INTO tareas ({columnas}) VALUES ({marcadores}) ON CONFLICT(id) DO UPDATE SET {actualizaciones}",
+                (self.fila(t) for t in cambios.values() if t is not None))
+            self.conexion.executemany("DELETE FROM tareas WHERE id = ?",
+                                      ((i,) for i, t in cambios.items() if t is None))
+
+    # Se define el método eliminar_tarea para borrar la fila de una tarea
+    def eliminar_tarea(self, tarea_id):
+        with self.candado_conexion, self.conexion:
+            self.conexion.execute("DELETE FROM tareas WHERE id = ?", (tarea_id,))
+
+    # Se define el método guardar_todo para reemplazar todas las filas en una sola transacción
+    def guardar_todo(self, tareas):
+        columnas = ", ".join(self.COLUMNAS)
+        marcadores = ", ".join("?" for _ in self.COLUMNAS)
+        with self.candado_conexion, self.conexion:
+            self.conexion.execute("DELETE FROM tareas")
+            self.conexion.executemany(f"INSERT INTO tareas ({columnas}) VALUES ({marcadores})",
+                                      (self.fila(t) for t in tareas))
+
+    # Se define el método necesita_compactar; en SQLite cada cambio ya queda guardado en su fila
+    def necesita_compactar(self):
+        return False
+
+    # Se define el método hay_cambios_externos para saber si otro proceso confirmó cambios en la base de datos
+    def hay_cambios_externos(self):
+        return self.version() != self.version_datos
+
+    # Se define el método leer_cambios_externos; en SQLite se vuelven a leer todas las filas
+    def leer_cambios_externos(self):
+        return True, self.cargar()
+
+
+# Se define el archivo de cada almacenamiento que se puede elegir con la variable de entorno TODOLIST_ALMACENAMIENTO
+ARCHIVOS_ALMACENAMIENTO = {
+    "json": "data/tareas.json",
+    "sqlite": "data/tareas.db",
+    "binario": "data/tareas.bin",
+    "categorias": "data/categorias/manifiesto.json",
+}
+
+
+# Se define la función para crear el almacenamiento de un archivo según su nombre: SQLite si termina en .db, binario si
+# termina en .bin, por categoría si es el manifiesto de un directorio de particiones (manifiesto.json) y JSON en otro caso
+# Sin archivo se usa el del almacenamiento elegido con TODOLIST_ALMACENAMIENTO (json, sqlite, binario o categorias;
+# por defecto, json). La usan la aplicación web y los programas de terminal, para que todos ofrezcan los mismos
+def crear_almacenamiento(archivo=None):
+    if archivo is None:
+        archivo = ARCHIVOS_ALMACENAMIENTO.get(os.environ.get("TODOLIST_ALMACENAMIENTO"), ARCHIVOS_ALMACENAMIENTO["json"])
+    if os.path.basename(archivo) == "manifiesto.json":
+        return AlmacenamientoPorCategoria(os.path.dirname(archivo))
+    if archivo.endswith(".db"):
+        return AlmacenamientoSQLite(archivo)
+    if archivo.endswith(".bin"):
+        return AlmacenamientoBinario(archivo)
+    return AlmacenamientoJSON(archivo)
@@ -0,0 +1,174 @@
+# binario.py
+# Se define el formato binario de la instantánea de tareas, pensado para abrirse con mmap sin leer todo el archivo:
+#   [textos][registros][tabla de textos repetidos][pie]
+# - textos: los bytes UTF-8 de todos los textos (id, título, descripción, subtareas en JSON y los textos repetidos)
+# - registros: un registro de tamaño fijo por tarea, con la posición y el largo de sus textos en la sección de textos,
+#   el número de sus textos repetidos (estado, prioridad, categoría y fechas) y los ordinales de sus fechas
+# - tabla de textos repetidos: posición y largo de cada texto repetido, que se guarda una sola vez
+# - pie: marca del formato, un identificador aleatorio de la instantánea (su firma para el diario), la cantidad de tareas
+#   y dónde empiezan los registros y la tabla
+# Al cargar se crea una TareaPerezosa por registro con su id y los datos que son números del registro (estado, prioridad,
+# categoría, fechas y ordinales); el título, la descripción y las subtareas se leen del archivo la primera vez que se usan
+import json
+import mmap
+import os
+import struct
+import uuid
+
+from core.tarea import Subtarea, Tarea
+from core.persistencia import escribir_atomico_partes
+
+MARCA = b"TAREASB1"
+PIE = struct.Struct("<8s16sQQQQ")
+# Se define el registro de una tarea: (posición, largo) de id, título, descripción y subtareas; número de estado, prioridad,
+# categoría, fecha de creación, fecha de completado y fecha de vencimiento; ordinales de vencimiento y de completado
+REGISTRO = struct.Struct("<QIQIQIQIIIIIIIii")
+TEXTO = struct.Struct("<QI")
+# Se define el número de texto repetido que representa None, y el ordinal que representa una fecha sin valor
+SIN_TEXTO = 0xFFFFFFFF
+SIN_ORDINAL = 0
+# Se define el valor que indica que un atributo de una tarea perezosa todavía no se leyó
+SIN_LEER = object()
+
+# Se definen los atributos de una tarea guardados como textos propios y como textos repetidos, en el orden del registro
+CAMPOS_TEXTO = ("id", "titulo", "descripcion", "subtareas")
+CAMPOS_REPETIDOS = ("estado", "prioridad", "categoria", "fecha_creacion", "fecha_completada", "fecha_vencimiento")
+# Se definen los atributos que se leen a pedido
+CAMPOS_PEREZOSOS = ("titulo", "descripcion", "subtareas")
+
+
+# Se define la clase InstantaneaBinaria, que abre una instantánea binaria con mmap y lee sus registros a pedido
+class InstantaneaBinaria:
+    # Se define el constructor que abre el archivo y lee el pie y la tabla de textos repetidos
+    # Si el archivo no tiene el formato esperado se lanza ValueError
+    def __init__(self, archivo):
+        with open(archivo, "rb") as f:
+            tamano = os.fstat(f.fileno()).st_size
+            if tamano < PIE.size:
+                raise ValueError("La instantánea binaria está incompleta.")
+            self.datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        marca, identificador, self.cantidad, self.inicio_registros, inicio_tabla, cantidad_textos = \
+            PIE.unpack_from(self.datos, tamano - PIE.size)
+        if marca != MARCA or self.inicio_registros + self.cantidad * REGISTRO.size != inicio_tabla:
+            raise ValueError("El archivo no es una instantánea binaria de tareas.")
+        self.firma = identificador.hex()
+        # Los textos repetidos son pocos, así que se leen todos de una vez (número -> texto, y SIN_TEXTO -> None)
+        self.textos = {i: self.texto(*TEXTO.unpack_from(self.datos, inicio_tabla + i * TEXTO.size))
+                       for i in range(cantidad_textos)}
+        self.textos[SIN_TEXTO] = None
+
+    # Se define el método registro para leer los valores del registro número i
+    def registro(self, i):
+        return REGISTRO.unpack_from(self.datos, self.inicio_registros + i * REGISTRO.size)
+
+    # Se define el método bytes para obtener los bytes de un texto a partir de su posición y su largo
+    def bytes(self, posicion, largo):
+        return self.datos[posicion:posicion + largo]
+
+    # Se define el método texto para obtener un texto a partir de su posición y su largo
+    def texto(self, posicion, largo):
+        return self.datos[posicion:posicion + largo].decode("utf-8")
+
+    # Se define el método tareas para crear una TareaPerezosa por registro, recorriendo todos los registros de una vez
+    def tareas(self):
+        final = self.inicio_registros + self.cantidad * REGISTRO.size
+        with memoryview(self.datos)[self.inicio_registros:final] as registros:
+            return [TareaPerezosa(self, i, valores) for i, valores in enumerate(REGISTRO.iter_unpack(registros))]
+
+
+# Se define la función para obtener el valor de un atributo de una tarea, o SIN_LEER si todavía no se leyó del archivo
+def valor_leido(tarea, atributo):
+    try:
+        return getattr(Tarea, atributo).__get__(tarea)
+    except AttributeError:
+        return SIN_LEER
+
+
+# Se define la clase TareaPerezosa: una Tarea cuyo título, descripción y subtareas se leen de la instantánea binaria
+# la primera vez que se usan (si se cambian antes de leerse, quedan con el valor nuevo)
+class TareaPerezosa(Tarea):
+    __slots__ = ("_instantanea", "_registro")
+
+    # Se define el constructor con la instantánea, el número de registro y sus valores
+    # Los textos repetidos ya están leídos, así que solo se decodifica el id
+    def __init__(self, instantanea, registro, valores):
+        self._instantanea = instantanea
+        self._registro = registro
+        textos = instantanea.textos
+        self.id = instantanea.texto(valores[0], valores[1])
+        self.estado = textos[valores[8]]
+        self.prioridad = textos[valores[9]]
+        self.categoria = textos[valores[10]]
+        self.fecha_creacion = textos[valores[11]]
+        self._fecha_completada = textos[valores[12]]
+        self._fecha_vencimiento = textos[valores[13]]
+        self.ordinal_vencimiento = valores[14] or None
+        self.ordinal_completada = valores[15] or None
+
+    # Se define el método __getattr__, que se llama solo cuando un atributo todavía no tiene valor, para leerlo del archivo
+    def __getattr__(self, nombre):
+        if nombre not in CAMPOS_PEREZOSOS:
+            raise AttributeError(nombre)
+        registro = self._instantanea.registro(self._registro)
+        i = CAMPOS_TEXTO.index(nombre)
+        valor = self._instantanea.texto(registro[2 * i], registro[2 * i + 1])
+        if nombre == "subtareas":
+            valor = [Subtarea.from_dict(s) for s in json.loads(valor)] if valor else []
+        setattr(self, nombre, valor)
+        return valor
+
+
+# Se define la función para escribir una instantánea binaria de forma atómica, sin convertir a texto las tareas perezosas:
+# los atributos que todavía no se leyeron se copian tal como están en la instantánea anterior
+# Devuelve la firma de la nueva instantánea
+def escribir_instantanea_binaria(archivo, tareas, generaciones=0):
+    registros = bytearray()
+    repetidos = {}
+    tabla = []
+    posicion = 0
+    cantidad = 0
+
+    # Se define la función que genera las partes del archivo: primero los textos de cada tarea, después los registros
+    # (guardados mientras tanto), la tabla de textos repetidos y el pie
+    def partes():
+        nonlocal posicion, cantidad
+        for tarea in tareas:
+            valores = []
+            for i, atributo in enumerate(CAMPOS_TEXTO):
+                valor = valor_leido(tarea, atributo)
+                if valor is SIN_LEER:
+                    registro = tarea._instantanea.registro(tarea._registro)
+                    datos = tarea._instantanea.bytes(registro[2 * i], registro[2 * i + 1])
+                elif atributo == "subtareas":
+                    datos = json.dumps([s.to_dict() for s in valor], ensure_ascii=False).encode("utf-8") if valor else b""
+                else:
+                    datos = (valor or "").encode("utf-8")
+                valores += [posicion, len(datos)]
+                posicion += len(datos)
+                yield datos
+
+            for atributo in CAMPOS_REPETIDOS:
+                valor = getattr(tarea, atributo)
+                if valor is None:
+                    valores.append(SIN_TEXTO)
+                    continue
+                if valor not in repetidos:
+                    datos = valor.encode("utf-8")
+                    repetidos[valor] = len(tabla)
+                    tabla.append((posicion, len(datos)))
+                    posicion += len(datos)
+                    yield datos
+                valores.append(repetidos[valor])
+
+            valores += [tarea.ordinal_vencimiento or SIN_ORDINAL, tarea.ordinal_completada or SIN_ORDINAL]
+            registros.extend(REGISTRO.pack(*valores))
+            cantidad += 1
+
+        yield bytes(registros)
+        inicio_tabla = posicion + len(registros)
+        yield b"".join(TEXTO.pack(*texto) for texto in tabla)
+        yield PIE.pack(MARCA, identificador, cantidad, posicion, inicio_tabla, len(tabla))
+
+    identificador = uuid.uuid4().bytes
+    escribir_atomico_partes(archivo, partes(), generaciones)
+    return identificador.hex()
@@ -0,0 +1,65 @@
+# cache.py
+# Se define una caché LRU de textos (por ejemplo, HTML ya generado) con un límite de entradas y, opcionalmente, de tamaño
+# Al superar el límite se descartan las entradas usadas hace más tiempo
+# Las claves deben incluir todo lo que cambia el contenido (por ejemplo, la etiqueta del gestor), así que nunca se invalidan:
+# las entradas de versiones anteriores simplemente dejan de pedirse y se descartan con el tiempo
+import threading
+from collections import OrderedDict
+
+
+# Se define la clase CacheLRU, que se puede usar desde varios hilos a la vez
+class CacheLRU:
+    # Se define el constructor con la cantidad máxima de entradas y el tamaño máximo total (en caracteres, sin límite si es None)
+    def __init__(self, capacidad=256, tamano_maximo=None):
+        self.capacidad = capacidad
+        self.tamano_maximo = tamano_maximo
+        self.entradas = OrderedDict()
+        self.tamano = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.mutex = threading.Lock()
+
+    # Se define el método obtener para obtener el texto guardado con una clave (None si no está)
+    def obtener(self, clave):
+        with self.mutex:
+            valor = self.entradas.get(clave)
+            if valor is None:
+                self.fallos += 1
+                return None
+            self.entradas.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    # Se define el método guardar para guardar un texto con una clave, descartando las entradas más antiguas si hace falta
+    # Un texto más grande que el tamaño máximo no se guarda
+    def guardar(self, clave, valor):
+        if self.tamano_maximo is not None and len(valor) > self.tamano_maximo:
+            return
+        with self.mutex:
+            anterior = self.entradas.pop(clave, None)
+            if anterior is not None:
+                self.tamano -= len(anterior)
+            self.entradas[clave] = valor
+            self.tamano += len(valor)
+            while len(self.entradas) > self.capacidad or (self.tamano_maximo is not None and self.tamano > self.tamano_maximo):
+                _, descartado = self.entradas.popitem(last=False)
+                self.tamano -= len(descartado)
+
+    # Se define el método obtener_o_crear para obtener el texto de una clave o, si no está, crearlo con crear() y guardarlo
+    # Dos hilos pueden crear a la vez el mismo texto; como es el mismo, da igual cuál quede guardado
+    def obtener_o_crear(self, clave, crear):
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = crear()
+            self.guardar(clave, valor)
+        return valor
+
+    # Se define el método limpiar para descartar todas las entradas
+    def limpiar(self):
+        with self.mutex:
+            self.entradas.clear()
+            self.tamano = 0
+
+    # Se define el método __len__ para obtener la cantidad de entradas guardadas
+    def __len__(self):
+        return len(self.entradas)
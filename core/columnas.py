@@ -0,0 +1,211 @@
+# columnas.py
+# Se define una tabla columnar en memoria con los datos de las tareas que usan los filtros, los ordenamientos y las estadísticas
+# Cada tarea ocupa una fila y cada dato es una columna de enteros: estado, prioridad y categoría como códigos,
+# y las fechas de vencimiento y de completado como ordinales
+# Con NumPy (si está instalado) los filtros son máscaras booleanas y los ordenamientos, argsort, sin recorrer las tareas en Python;
+# sin NumPy se usan las mismas columnas (arreglos del módulo array) con comprensiones sobre enteros
+# Las filas siguen el orden de inserción de las tareas: al eliminar una tarea su fila queda marcada como libre
+# y, cuando hay muchas filas libres, se compacta la tabla
+from array import array
+
+# Se importa NumPy si está disponible
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from core.indice_fechas import ORDINAL_MAXIMO
+
+NUMPY_DISPONIBLE = numpy is not None
+# Se define el ordinal de completado de las tareas que no están completadas
+SIN_COMPLETAR = -1
+# Se define el rango de cada prioridad al ordenar (cualquier otra cuenta como media)
+RANGO_PRIORIDAD = {"alta": 1, "media": 2, "baja": 3}
+# Se define la cantidad mínima de filas libres antes de compactar la tabla
+MINIMO_LIBRES = 1024
+
+
+# Se define la clase Diccionario para codificar textos repetidos como enteros (el primer texto nuevo recibe 0, el siguiente 1, etc.)
+class Diccionario:
+    # Se define el constructor con el código de cada texto y los textos en orden de código
+    def __init__(self):
+        self.codigos = {}
+        self.valores = []
+
+    # Se define el método codigo para obtener el código de un texto, agregándolo si es nuevo
+    def codigo(self, valor):
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            codigo = self.codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return codigo
+
+    # Se define el método codigos_sin_mayusculas para obtener los códigos de los textos iguales a valor sin distinguir mayúsculas
+    def codigos_sin_mayusculas(self, valor):
+        valor = valor.lower()
+        return [codigo for codigo, texto in enumerate(self.valores) if (texto or "").lower() == valor]
+
+
+# Se define la clase TablaColumnar, que se mantiene al día con cada cambio de las tareas (como los demás índices)
+class TablaColumnar:
+    # Se define el constructor con la tabla vacía; usar_numpy=False obliga a usar solo el módulo array
+    def __init__(self, usar_numpy=True):
+        self.numpy = numpy if usar_numpy else None
+        self.ids = []               # fila -> id de la tarea (None si la fila está libre)
+        self.fila_por_id = {}
+        self.libres = 0
+        self.vivas = array("b")     # 1 si la fila tiene una tarea, 0 si está libre
+        self.estado = array("i")
+        self.prioridad = array("i")
+        self.categoria = array("i")
+        self.vencimiento = array("i")
+        self.completada = array("i")
+        self.estados = Diccionario()
+        self.prioridades = Diccionario()
+        self.categorias = Diccionario()
+
+    # Se define el método columnas para obtener las columnas de datos, en el orden de valores_fila
+    def columnas(self):
+        return (self.estado, self.prioridad, self.categoria, self.vencimiento, self.completada)
+
+    # Se define el método valores_fila para convertir una tarea a los valores de sus columnas
+    def valores_fila(self, tarea):
+        return (self.estados.codigo(tarea.estado), self.prioridades.codigo(tarea.prioridad),
+                self.categorias.codigo(tarea.categoria),
+                ORDINAL_MAXIMO if tarea.ordinal_vencimiento is None else tarea.ordinal_vencimiento,
+                SIN_COMPLETAR if tarea.ordinal_completada is None else tarea.ordinal_completada)
+
+    # Se define el método agregar para agregar una tarea al final de la tabla o actualizar su fila
+    def agregar(self, tarea):
+        valores = self.valores_fila(tarea)
+        fila = self.fila_por_id.get(tarea.id)
+        if fila is None:
+            self.fila_por_id[tarea.id] = len(self.ids)
+            self.ids.append(tarea.id)
+            self.vivas.append(1)
+            for columna, valor in zip(self.columnas(), valores):
+                columna.append(valor)
+        else:
+            for columna, valor in zip(self.columnas(), valores):
+                columna[fila] = valor
+
+    # Se define el método quitar para liberar la fila de una tarea
+    def quitar(self, tarea_id):
+        fila = self.fila_por_id.pop(tarea_id, None)
+        if fila is None:
+            return
+        self.ids[fila] = None
+        self.vivas[fila] = 0
+        self.libres += 1
+        if self.libres >= MINIMO_LIBRES and self.libres * 2 > len(self.ids):
+            self.compactar()
+
+    # Se define el método compactar para quitar las filas libres, conservando el orden de las demás
+    def compactar(self):
+        filas = [fila for fila, viva in enumerate(self.vivas) if viva]
+        for nombre in ("estado", "prioridad", "categoria", "vencimiento", "completada"):
+            columna = getattr(self, nombre)
+            setattr(self, nombre, array(columna.typecode, [columna[fila] for fila in filas]))
+        self.ids = [self.ids[fila] for fila in filas]
+        self.vivas = array("b", [1]) * len(filas)
+        self.fila_por_id = {tarea_id: fila for fila, tarea_id in enumerate(self.ids)}
+        self.libres = 0
+
+    # Se define el método __len__ para obtener la cantidad de tareas en la tabla
+    def __len__(self):
+        return len(self.fila_por_id)
+
+    # Se define el método vista para ver una columna como arreglo de NumPy, sin copiarla
+    # La vista se usa solo dentro de una consulta: mientras exista, la columna no puede crecer
+    def vista(self, columna):
+        if columna.typecode == "b":
+            return self.numpy.frombuffer(columna, dtype=self.numpy.bool_)
+        return self.numpy.frombuffer(columna, dtype=self.numpy.intc)
+
+    # Se define el método filtrar para obtener las filas (en orden de inserción) que cumplen todos los filtros indicados
+    # estado, prioridad y categoria se comparan sin distinguir mayúsculas; fecha_minima y fecha_maxima son ordinales (incluidos)
+    # Las tareas sin fecha (ORDINAL_MAXIMO en la columna) no cumplen un filtro con fecha_minima
+    # Con NumPy devuelve un arreglo de filas; sin NumPy, una lista
+    def filtrar(self, estado=None, prioridad=None, categoria=None, fecha_minima=None, fecha_maxima=None):
+        if fecha_minima is not None:
+            fecha_maxima = ORDINAL_MAXIMO - 1 if fecha_maxima is None else min(fecha_maxima, ORDINAL_MAXIMO - 1)
+        condiciones = []
+        for columna, diccionario, valor in ((self.estado, self.estados, estado),
+                                            (self.prioridad, self.prioridades, prioridad),
+                                            (self.categoria, self.categorias, categoria)):
+            if valor is not None:
+                condiciones.append((columna, diccionario.codigos_sin_mayusculas(valor)))
+
+        if self.numpy is not None:
+            mascara = self.vista(self.vivas).copy()
+            for columna, codigos in condiciones:
+                mascara &= self.numpy.isin(self.vista(columna), codigos)
+            if fecha_minima is not None:
+                mascara &= self.vista(self.vencimiento) >= fecha_minima
+            if fecha_maxima is not None:
+                mascara &= self.vista(self.vencimiento) <= fecha_maxima
+            return self.numpy.flatnonzero(mascara)
+
+        filas = [fila for fila, viva in enumerate(self.vivas) if viva]
+        for columna, codigos in condiciones:
+            codigos = set(codigos)
+            filas = [fila for fila in filas if columna[fila] in codigos]
+        vencimiento = self.vencimiento
+        if fecha_minima is not None:
+            filas = [fila for fila in filas if vencimiento[fila] >= fecha_minima]
+        if fecha_maxima is not None:
+            filas = [fila for fila in filas if vencimiento[fila] <= fecha_maxima]
+        return filas
+
+    # Se define el método ordenar para ordenar filas por "fecha", "estado" o "prioridad" (de forma estable)
+    # Con otro criterio se devuelven en el mismo orden
+    def ordenar(self, filas, por):
+        if por == "fecha":
+            columna, rangos = self.vencimiento, None
+        elif por == "estado":
+            # El rango de cada código es la posición de su texto en orden alfabético
+            orden = sorted(range(len(self.estados.valores)), key=self.estados.valores.__getitem__)
+            rangos = [0] * len(orden)
+            for rango, codigo in enumerate(orden):
+                rangos[codigo] = rango
+            columna = self.estado
+        elif por == "prioridad":
+            columna, rangos = self.prioridad, [RANGO_PRIORIDAD.get(p, 2) for p in self.prioridades.valores]
+        else:
+            return filas
+
+        if self.numpy is not None:
+            claves = self.vista(columna)[filas]
+            if rangos is not None:
+                claves = self.numpy.array(rangos, dtype=self.numpy.intc)[claves]
+            return filas[self.numpy.argsort(claves, kind="stable")]
+        if rangos is None:
+            return sorted(filas, key=columna.__getitem__)
+        return sorted(filas, key=lambda fila: rangos[columna[fila]])
+
+    # Se define el método completadas_entre para obtener las filas de las tareas completadas entre dos días (ordinales, incluidos)
+    def completadas_entre(self, desde, hasta):
+        if self.numpy is not None:
+            completada = self.vista(self.completada)
+            return self.numpy.flatnonzero(self.vista(self.vivas) & (completada >= desde) & (completada <= hasta))
+        completada = self.completada
+        return [fila for fila, viva in enumerate(self.vivas) if viva and desde <= completada[fila] <= hasta]
+
+    # Se define el método filas_por_estado para obtener las filas de cada estado ({estado: filas en orden de inserción})
+    def filas_por_estado(self):
+        if self.numpy is not None:
+            estado = self.vista(self.estado)
+            vivas = self.vista(self.vivas)
+            return {valor: self.numpy.flatnonzero(vivas & (estado == codigo))
+                    for codigo, valor in enumerate(self.estados.valores)}
+        grupos = {valor: [] for valor in self.estados.valores}
+        for fila, (codigo, viva) in enumerate(zip(self.estado, self.vivas)):
+            if viva:
+                grupos[self.estados.valores[codigo]].append(fila)
+        return grupos
+
+    # Se define el método ids_de para recorrer los ids de unas filas
+    def ids_de(self, filas):
+        ids = self.ids
+        for fila in filas:
+            yield ids[fila]
@@ -0,0 +1,105 @@
+# concurrencia.py
+# Se definen las herramientas para usar el gestor de tareas desde varios hilos (por ejemplo, un servidor con --threads):
+# un candado de lectura/escritura y decoradores para proteger los métodos del gestor
+import functools
+import threading
+from contextlib import contextmanager
+
+
+# Se define la clase CandadoLecturaEscritura: varias lecturas pueden ocurrir a la vez, pero las escrituras son exclusivas
+# Las escrituras que esperan tienen preferencia sobre las lecturas nuevas, para que no queden esperando indefinidamente
+# Un hilo puede volver a tomar el candado que ya tiene (una lectura dentro de una escritura cuenta como escritura)
+class CandadoLecturaEscritura:
+    # Se define el constructor con la condición que protege el estado del candado
+    def __init__(self):
+        self.condicion = threading.Condition(threading.Lock())
+        self.lectores = {}              # id del hilo -> cantidad de lecturas tomadas
+        self.escritor = None            # id del hilo que tiene la escritura
+        self.profundidad_escritura = 0
+        self.escritores_esperando = 0
+
+    # Se define el método adquirir_lectura para tomar el candado en modo lectura
+    def adquirir_lectura(self):
+        yo = threading.get_ident()
+        with self.condicion:
+            if self.escritor == yo:
+                self.profundidad_escritura += 1
+                return
+            # Un hilo que ya tiene una lectura puede tomar otra aunque haya escritores esperando
+            if yo not in self.lectores:
+                while self.escritor is not None or self.escritores_esperando:
+                    self.condicion.wait()
+            self.lectores[yo] = self.lectores.get(yo, 0) + 1
+
+    # Se define el método liberar_lectura para soltar una lectura tomada
+    def liberar_lectura(self):
+        yo = threading.get_ident()
+        with self.condicion:
+            if self.escritor == yo:
+                self.profundidad_escritura -= 1
+                return
+            self.lectores[yo] -= 1
+            if not self.lectores[yo]:
+                del self.lectores[yo]
+                if not self.lectores:
+                    self.condicion.notify_all()
+
+    # Se define el método adquirir_escritura para tomar el candado en modo exclusivo
+    def adquirir_escritura(self):
+        yo = threading.get_ident()
+        with self.condicion:
+            if self.escritor == yo:
+                self.profundidad_escritura += 1
+                return
+            if yo in self.lectores:
+                raise RuntimeError("No se puede pasar de lectura a escritura en el mismo hilo")
+            self.escritores_esperando += 1
+            while self.escritor is not None or self.lectores:
+                self.condicion.wait()
+            self.escritores_esperando -= 1
+            self.escritor = yo
+            self.profundidad_escritura = 1
+
+    # Se define el método liberar_escritura para soltar la escritura tomada
+    def liberar_escritura(self):
+        with self.condicion:
+            self.profundidad_escritura -= 1
+            if not self.profundidad_escritura:
+                self.escritor = None
+                self.condicion.notify_all()
+
+    # Se define el administrador de contexto lectura para usar con "with"
+    @contextmanager
+    def lectura(self):
+        self.adquirir_lectura()
+        try:
+            yield
+        finally:
+            self.liberar_lectura()
+
+    # Se define el administrador de contexto escritura para usar con "with"
+    @contextmanager
+    def escritura(self):
+        self.adquirir_escritura()
+        try:
+            yield
+        finally:
+            self.liberar_escritura()
+
+
+# Se define el decorador con_lectura para ejecutar un método con el candado del objeto (self.candado) en modo lectura
+def con_lectura(metodo):
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.candado.lectura():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+# Se define el decorador con_escritura para ejecutar un método con el candado del objeto (self.candado) en modo escritura
+def con_escritura(metodo):
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.candado.escritura():
+            return metodo(self, *args, **kwargs)
+    return envoltura
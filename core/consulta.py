@@ -0,0 +1,388 @@
+# consulta.py
+# Se define el motor de consultas de tareas que usan la aplicación web, la API y la terminal:
+#   Consulta(filtro, ordenar_por, desplazamiento, limite)
+# El filtro se arma con predicados que se pueden combinar:
+#   Igual("categoria", "Trabajo")      -> el campo tiene ese valor (sin distinguir mayúsculas)
+#   RangoFechas(desde, hasta)          -> vence entre dos ordinales, incluidos (sin fecha cuenta como la fecha máxima,
+#                                         salvo que haya desde: entonces no se incluye)
+#   Texto("informe", campos)           -> tiene palabras que empiezan con cada palabra buscada (como el índice de texto)
+#   Contiene("titulo", "inf")          -> el campo contiene el texto (sin distinguir mayúsculas)
+#   Y(p1, p2, ...) / O(p1, p2, ...)    -> se cumplen todos / alguno
+# ordenar_por es "fecha", "estado", "prioridad" o una lista de ellos (los demás se ignoran); sin orden se usa el de inserción
+# El planificador elige de dónde sacar las tareas candidatas: la tabla columnar (si resuelve todo el filtro), el índice
+# más selectivo (valores, fechas o texto) o el recorrido de todas las tareas; después revisa una por una solo las
+# condiciones que no resolvió el índice. Si el índice resuelve todo el filtro y entrega las tareas en el orden pedido,
+# se detiene al completar la página
+from core.columnas import RANGO_PRIORIDAD
+from core.indice_fechas import ORDINAL_MAXIMO
+from core.indice_texto import tokenizar
+from core.metricas import Conteo
+from core.paginacion import paginar
+
+# Se definen los campos de texto de una tarea en los que se busca por palabras
+CAMPOS_TEXTO = ("titulo", "descripcion", "estado", "fecha_vencimiento", "subtareas")
+# Se definen los campos que se pueden filtrar con los índices de valores y con la tabla columnar
+CAMPOS_VALOR = ("estado", "prioridad", "categoria")
+# Se define cuántas veces más rápido que un recorrido se estima que filtra la tabla columnar (con y sin NumPy)
+FACTOR_COLUMNAS_NUMPY = 50
+FACTOR_COLUMNAS = 2
+
+
+# Se define la función para obtener el texto de un campo de una tarea (las subtareas, como sus nombres separados por espacios)
+def texto_campo(tarea, campo):
+    if campo == "subtareas":
+        return " ".join(subt.nombre for subt in tarea.subtareas)
+    return getattr(tarea, campo) or ""
+
+
+# Se define la función para obtener los textos de una tarea en los que se busca por palabras
+def textos_de(tarea, campos=CAMPOS_TEXTO):
+    return {campo: texto_campo(tarea, campo) for campo in campos}
+
+
+# Se define la función para obtener los valores de una tarea que se guardan en el índice de valores
+def valores_de(tarea):
+    return {campo: getattr(tarea, campo) for campo in CAMPOS_VALOR}
+
+
+# Se define la función para obtener la fecha de vencimiento de una tarea como ordinal (sin fecha, la fecha máxima)
+def fecha_de(tarea):
+    return ORDINAL_MAXIMO if tarea.ordinal_vencimiento is None else tarea.ordinal_vencimiento
+
+
+# Se definen las claves de cada orden
+CLAVES_ORDEN = {
+    "fecha": fecha_de,
+    "estado": lambda tarea: tarea.estado,
+    "prioridad": lambda tarea: RANGO_PRIORIDAD.get(tarea.prioridad, 2),
+}
+
+
+# Se define la clase Acceso, que describe cómo obtener las tareas candidatas de un predicado
+# tipo: "conjunto" (ids sin orden), "fecha" (ids ordenados por fecha) o "insercion" (recorrido de todas las tareas)
+# cantidad: cuántas tareas se obtienen; resto: el predicado que falta revisar en cada tarea (None si no falta nada)
+class Acceso:
+    # Se define el constructor; ids es un conjunto o una función que recorre los ids (None en el recorrido)
+    def __init__(self, tipo, cantidad, ids=None, resto=None):
+        self.tipo = tipo
+        self.cantidad = cantidad
+        self.ids = ids
+        self.resto = resto
+
+    # Se define el método obtener_ids para obtener los ids de las tareas candidatas
+    def obtener_ids(self):
+        return self.ids() if callable(self.ids) else self.ids
+
+
+# Se define la función para combinar predicados con Y (None si no hay ninguno, o el único que hay)
+def todas(predicados):
+    predicados = [p for p in predicados if p is not None]
+    if not predicados:
+        return None
+    return predicados[0] if len(predicados) == 1 else Y(*predicados)
+
+
+# Se define el predicado Igual, que compara un campo con un valor sin distinguir mayúsculas
+class Igual:
+    # Se define el constructor con el nombre del campo y el valor
+    def __init__(self, campo, valor):
+        self.campo = campo
+        self.valor = (valor or "").lower()
+
+    # Se define el método cumple para saber si una tarea cumple el predicado
+    def cumple(self, tarea):
+        return (getattr(tarea, self.campo) or "").lower() == self.valor
+
+    # Se define el método acceso para obtener las tareas candidatas con un índice (None si no hay índice)
+    def acceso(self, planificador):
+        return planificador.acceso_valor(self.campo, self.valor)
+
+
+# Se define el predicado RangoFechas, para las tareas que vencen entre desde y hasta (ordinales incluidos, o None)
+class RangoFechas:
+    # Se define el constructor con los límites del rango
+    def __init__(self, desde=None, hasta=None):
+        self.desde = desde
+        self.hasta = hasta
+
+    # Se define el método cumple para saber si una tarea cumple el predicado
+    # Una tarea sin fecha cuenta como la fecha máxima, pero no cumple un rango con desde
+    def cumple(self, tarea):
+        if tarea.ordinal_vencimiento is None:
+            return self.desde is None and (self.hasta is None or ORDINAL_MAXIMO <= self.hasta)
+        fecha = tarea.ordinal_vencimiento
+        return (self.desde is None or fecha >= self.desde) and (self.hasta is None or fecha <= self.hasta)
+
+    # Se define el método acceso para obtener las tareas candidatas con el índice de fechas
+    def acceso(self, planificador):
+        return planificador.acceso_fechas(self.desde, self.hasta)
+
+
+# Se define el predicado Texto, para las tareas que tienen en sus campos de texto todas las palabras buscadas
+# (o palabras que empiezan con ellas), sin distinguir tildes ni mayúsculas; sin campos se busca en todos
+class Texto:
+    # Se define el constructor con el texto buscado y los campos donde se busca
+    def __init__(self, texto, campos=None):
+        self.texto = texto
+        self.campos = campos
+        self.palabras = set(tokenizar(texto))
+
+    # Se define el método cumple para saber si una tarea cumple el predicado
+    def cumple(self, tarea):
+        palabras = tokenizar(" ".join(texto_campo(tarea, campo) for campo in self.campos or CAMPOS_TEXTO))
+        return all(any(palabra.startswith(buscada) for palabra in palabras) for buscada in self.palabras)
+
+    # Se define el método acceso para obtener las tareas candidatas con el índice de texto
+    def acceso(self, planificador):
+        return planificador.acceso_texto(self.texto, self.campos)
+
+
+# Se define el predicado Contiene, para las tareas cuyo campo contiene un texto (sin distinguir mayúsculas)
+# No tiene índice: siempre se revisa tarea por tarea
+class Contiene:
+    # Se define el constructor con el nombre del campo y el texto
+    def __init__(self, campo, texto):
+        self.campo = campo
+        self.texto = texto.lower()
+
+    # Se define el método cumple para saber si una tarea cumple el predicado
+    def cumple(self, tarea):
+        return self.texto in texto_campo(tarea, self.campo).lower()
+
+    # Se define el método acceso, que no tiene índice
+    def acceso(self, planificador):
+        return None
+
+
+# Se define el predicado Y, que se cumple si se cumplen todos sus predicados
+class Y:
+    # Se define el constructor con los predicados
+    def __init__(self, *predicados):
+        self.predicados = predicados
+
+    # Se define el método cumple para saber si una tarea cumple todos los predicados
+    def cumple(self, tarea):
+        return all(p.cumple(tarea) for p in self.predicados)
+
+    # Se define el método acceso para elegir el acceso más selectivo de los predicados
+    # Los conjuntos de ids (valores y texto) se intersecan, empezando por el más chico; los demás predicados quedan
+    # como resto, para revisarlos en cada tarea candidata
+    def acceso(self, planificador):
+        conjuntos = []      # (acceso, predicado) de los predicados que entregan un conjunto de ids
+        opciones = []       # (acceso, predicados que resuelve)
+        for predicado in self.predicados:
+            acceso = predicado.acceso(planificador)
+            if acceso is None:
+                continue
+            if acceso.tipo == "conjunto":
+                conjuntos.append((acceso, predicado))
+            else:
+                opciones.append((acceso, (predicado,)))
+        if conjuntos:
+            conjuntos.sort(key=lambda c: c[0].cantidad)
+            ids = conjuntos[0][0].ids
+            for acceso, _ in conjuntos[1:]:
+                if not ids:
+                    break
+                ids = ids & acceso.ids
+            resto = todas(acceso.resto for acceso, _ in conjuntos)
+            opciones.append((Acceso("conjunto", len(ids), ids, resto), tuple(p for _, p in conjuntos)))
+        if not opciones:
+            return None
+
+        acceso, resueltos = min(opciones, key=lambda o: o[0].cantidad)
+        pendientes = [p for p in self.predicados if not any(p is r for r in resueltos)]
+        return Acceso(acceso.tipo, acceso.cantidad, acceso.ids, todas(pendientes + [acceso.resto]))
+
+
+# Se define el predicado O, que se cumple si se cumple alguno de sus predicados
+class O:
+    # Se define el constructor con los predicados
+    def __init__(self, *predicados):
+        self.predicados = predicados
+
+    # Se define el método cumple para saber si una tarea cumple alguno de los predicados
+    def cumple(self, tarea):
+        return any(p.cumple(tarea) for p in self.predicados)
+
+    # Se define el método acceso para unir los ids de todos los predicados
+    # Si algún predicado no tiene índice, o entre todos no son menos que las tareas, conviene recorrerlas (None)
+    def acceso(self, planificador):
+        accesos = [p.acceso(planificador) for p in self.predicados]
+        if any(a is None for a in accesos) or sum(a.cantidad for a in accesos) >= planificador.cantidad:
+            return None
+        ids = set()
+        for acceso in accesos:
+            ids.update(acceso.obtener_ids())
+        resto = None if all(a.resto is None for a in accesos) else self
+        return Acceso("conjunto", len(ids), ids, resto)
+
+
+# Se define la función para crear el filtro de los formularios: texto, estado, prioridad, categoría y rango de fechas
+# Los valores vacíos no filtran; las fechas son ordinales (o None) y el texto se busca en campos_texto
+def crear_filtro(texto="", estado="", prioridad="", categoria="", fecha_minima=None, fecha_maxima=None,
+                 campos_texto=None):
+    predicados = []
+    if texto and tokenizar(texto):
+        predicados.append(Texto(texto, campos_texto))
+    for campo, valor in (("estado", estado), ("prioridad", prioridad), ("categoria", categoria)):
+        if valor:
+            predicados.append(Igual(campo, valor))
+    if fecha_minima is not None or fecha_maxima is not None:
+        predicados.append(RangoFechas(fecha_minima, fecha_maxima))
+    return todas(predicados)
+
+
+# Se define la función para obtener los filtros de la tabla columnar equivalentes a un filtro (None si no los hay)
+# La tabla resuelve un Igual por campo de valor y rangos de fechas, combinados con Y
+def condiciones_columnas(filtro):
+    predicados = () if filtro is None else filtro.predicados if isinstance(filtro, Y) else (filtro,)
+    condiciones = {}
+    for predicado in predicados:
+        if isinstance(predicado, Igual) and predicado.campo in CAMPOS_VALOR and predicado.campo not in condiciones:
+            condiciones[predicado.campo] = predicado.valor
+        elif isinstance(predicado, RangoFechas):
+            for limite, valor, elegir in (("fecha_minima", predicado.desde, max), ("fecha_maxima", predicado.hasta, min)):
+                if valor is not None:
+                    anterior = condiciones.get(limite)
+                    condiciones[limite] = valor if anterior is None else elegir(anterior, valor)
+        else:
+            return None
+    return condiciones
+
+
+# Se define la clase Consulta con el filtro, el orden y la página pedida
+class Consulta:
+    # Se define el constructor; sin filtro se obtienen todas las tareas y sin limite, todas las de la consulta
+    def __init__(self, filtro=None, ordenar_por=None, desplazamiento=0, limite=None):
+        if ordenar_por is None or isinstance(ordenar_por, str):
+            ordenar_por = (ordenar_por,)
+        self.filtro = filtro
+        self.ordenar_por = tuple(clave for clave in ordenar_por if clave in CLAVES_ORDEN)
+        self.desplazamiento = max(desplazamiento, 0)
+        self.limite = None if limite is None else max(limite, 0)
+
+    # Se define la propiedad orden_recorrido para saber en qué orden se deben recorrer las candidatas:
+    # "fecha" si solo se ordena por fecha y "insercion" en otro caso (los demás órdenes se aplican después, de forma estable)
+    @property
+    def orden_recorrido(self):
+        return "fecha" if self.ordenar_por == ("fecha",) else "insercion"
+
+    # Se define la propiedad ordenada_al_recorrer para saber si el orden del recorrido ya es el orden pedido
+    @property
+    def ordenada_al_recorrer(self):
+        return self.ordenar_por in ((), ("fecha",))
+
+
+# Se define la clase Planificador, que ejecuta consultas sobre unas tareas con los índices disponibles
+# tareas es un diccionario id -> tarea en orden de inserción (o una lista, si no hay índices); los índices son opcionales:
+# orden (id -> posición de inserción), valores (función que devuelve el IndiceValores), fechas (IndiceFechas),
+# buscar_texto (función que devuelve los ids con un texto) y tabla (TablaColumnar)
+# Los índices que se obtienen con una función pueden crearse recién cuando una consulta los usa
+class Planificador:
+    # Se define el constructor con las tareas y los índices
+    def __init__(self, tareas, orden=None, valores=None, fechas=None, buscar_texto=None, tabla=None):
+        self.tareas = tareas
+        self.todas = tareas.values() if isinstance(tareas, dict) else tareas
+        self.cantidad = len(tareas)
+        self.orden = orden
+        self.valores = valores
+        self.fechas = fechas
+        self.buscar_texto = buscar_texto
+        self.tabla = tabla
+        self.examinadas = 0     # tareas examinadas por la última consulta
+
+    # Se define el método acceso_valor para obtener las tareas con un valor desde el índice de valores
+    def acceso_valor(self, campo, valor):
+        if self.valores is None or campo not in CAMPOS_VALOR:
+            return None
+        ids = self.valores().ids(campo, valor)
+        return Acceso("conjunto", len(ids), ids)
+
+    # Se define el método acceso_fechas para obtener las tareas de un rango de fechas desde el índice de fechas
+    def acceso_fechas(self, desde, hasta):
+        if self.fechas is None:
+            return None
+        return Acceso("fecha", self.fechas.contar(desde, hasta), lambda: self.fechas.rango(desde, hasta))
+
+    # Se define el método acceso_texto para obtener las tareas con un texto desde el índice de texto
+    def acceso_texto(self, texto, campos):
+        if self.buscar_texto is None:
+            return None
+        ids = self.buscar_texto(texto, campos)
+        return None if ids is None else Acceso("conjunto", len(ids), ids)
+
+    # Se define el método costo para estimar el trabajo de un acceso, en tareas examinadas
+    # Si el acceso resuelve todo el filtro y entrega las tareas en el orden pedido, basta con llegar al final de la página;
+    # si hay que ordenar sus ids antes de recorrerlos, se cuenta el doble
+    def costo(self, acceso, consulta):
+        if acceso.tipo != consulta.orden_recorrido and acceso.tipo != "insercion":
+            return 2 * acceso.cantidad
+        if acceso.resto is None and consulta.ordenada_al_recorrer and consulta.limite is not None:
+            return min(acceso.cantidad, consulta.desplazamiento + consulta.limite)
+        return acceso.cantidad
+
+    # Se define el método elegir_acceso para elegir el acceso más barato: el del filtro, el índice de fechas completo
+    # (si se ordena por fecha) o el recorrido de todas las tareas; ante un empate se prefiere el índice
+    def elegir_acceso(self, consulta):
+        opciones = []
+        if consulta.filtro is not None:
+            acceso = consulta.filtro.acceso(self)
+            if acceso is not None:
+                opciones.append(acceso)
+        if consulta.orden_recorrido == "fecha" and self.fechas is not None:
+            opciones.append(Acceso("fecha", len(self.fechas), self.fechas.rango, consulta.filtro))
+        opciones.append(Acceso("insercion", self.cantidad, resto=consulta.filtro))
+        return min(opciones, key=lambda acceso: self.costo(acceso, consulta))
+
+    # Se define el método recorrer para recorrer las tareas candidatas de un acceso en el orden indicado
+    # ("insercion" o "fecha"; con la misma fecha, en orden de inserción)
+    def recorrer(self, acceso, orden):
+        if acceso.tipo == "insercion":
+            return self.todas if orden == "insercion" else sorted(self.todas, key=fecha_de)
+        ids = acceso.obtener_ids()
+        if acceso.tipo != orden:
+            if orden == "insercion":
+                ids = sorted(ids, key=self.orden.__getitem__)
+            else:
+                ids = sorted(ids, key=lambda i: (fecha_de(self.tareas[i]), self.orden[i]))
+        return (self.tareas[i] for i in ids)
+
+    # Se define el método ejecutar para obtener la Pagina de tareas de una consulta
+    # La tabla columnar se usa si resuelve todo el filtro y el orden, y si filtrar sus columnas y buscar las tareas de la
+    # página (a lo sumo, las candidatas del acceso elegido) cuesta menos que el acceso
+    def ejecutar(self, consulta):
+        acceso = self.elegir_acceso(consulta)
+        condiciones = None if self.tabla is None or len(consulta.ordenar_por) > 1 else condiciones_columnas(consulta.filtro)
+        if condiciones is not None:
+            factor = FACTOR_COLUMNAS_NUMPY if self.tabla.numpy is not None else FACTOR_COLUMNAS
+            pagina = acceso.cantidad if consulta.limite is None else min(acceso.cantidad,
+                                                                         consulta.desplazamiento + consulta.limite)
+            if len(self.tabla) / factor + pagina < self.costo(acceso, consulta):
+                return self.ejecutar_en_tabla(consulta, condiciones)
+
+        conteo = Conteo()
+        tareas = conteo.recorrer(self.recorrer(acceso, consulta.orden_recorrido))
+        total = acceso.cantidad
+        if acceso.resto is not None:
+            tareas = (t for t in tareas if acceso.resto.cumple(t))
+            total = None
+        if not consulta.ordenada_al_recorrer:
+            # Se ordena una vez por cada criterio, del último al primero: como el ordenamiento es estable, el primero
+            # decide y los demás desempatan
+            tareas = list(tareas)
+            for clave in reversed(consulta.ordenar_por):
+                tareas.sort(key=CLAVES_ORDEN[clave])
+            total = len(tareas)
+        pagina = paginar(tareas, consulta.desplazamiento, consulta.limite, total)
+        self.examinadas = conteo.cantidad
+        return pagina
+
+    # Se define el método ejecutar_en_tabla para resolver el filtro y el orden con las columnas de la tabla columnar
+    # Solo se buscan las tareas de la página
+    def ejecutar_en_tabla(self, consulta, condiciones):
+        filas = self.tabla.filtrar(**condiciones)
+        filas = self.tabla.ordenar(filas, consulta.ordenar_por[0] if consulta.ordenar_por else None)
+        self.examinadas = len(self.tabla)
+        return paginar((self.tareas[i] for i in self.tabla.ids_de(filas)), consulta.desplazamiento, consulta.limite,
+                       len(filas))
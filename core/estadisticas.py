@@ -0,0 +1,51 @@
+# estadisticas.py
+# Se definen contadores que se actualizan con cada cambio de una tarea, para obtener estadísticas sin recorrer todas las tareas
+from collections import Counter
+
+# Se definen los grupos de estado usados en las estadísticas (cualquier otro estado cuenta como pendiente)
+GRUPOS_ESTADO = ("completada", "en progreso", "pendiente")
+
+
+# Se define la función para obtener el grupo de estado de una tarea
+def grupo_estado(estado):
+    return estado if estado in GRUPOS_ESTADO else "pendiente"
+
+
+# Se define la clase ContadoresTareas con la cantidad de tareas por estado y un histograma de completadas por día
+class ContadoresTareas:
+    # Se define el constructor con los contadores vacíos y lo que se contó de cada tarea
+    def __init__(self):
+        self.por_estado = Counter()
+        self.completadas_por_dia = Counter()   # ordinal de la fecha de completado -> cantidad de tareas
+        self.contado = {}                      # id -> (grupo de estado, ordinal de completado)
+
+    # Se define el método agregar para contar (o volver a contar) una tarea con su estado y fecha de completado actuales
+    def agregar(self, tarea_id, estado, ordinal_completada):
+        nuevo = (grupo_estado(estado), ordinal_completada)
+        if self.contado.get(tarea_id) == nuevo:
+            return
+        self.quitar(tarea_id)
+        self.por_estado[nuevo[0]] += 1
+        if ordinal_completada is not None:
+            self.completadas_por_dia[ordinal_completada] += 1
+        self.contado[tarea_id] = nuevo
+
+    # Se define el método quitar para descontar una tarea
+    def quitar(self, tarea_id):
+        anterior = self.contado.pop(tarea_id, None)
+        if anterior is None:
+            return
+        grupo, ordinal_completada = anterior
+        self.por_estado[grupo] -= 1
+        if ordinal_completada is not None:
+            self.completadas_por_dia[ordinal_completada] -= 1
+            if not self.completadas_por_dia[ordinal_completada]:
+                del self.completadas_por_dia[ordinal_completada]
+
+    # Se define el método cantidades_por_estado para obtener las cantidades en el orden completadas, en progreso y pendientes
+    def cantidades_por_estado(self):
+        return [self.por_estado[grupo] for grupo in GRUPOS_ESTADO]
+
+    # Se define el método completadas_entre para sumar las tareas completadas entre dos días (ordinales, ambos incluidos)
+    def completadas_entre(self, desde, hasta):
+        return sum(self.completadas_por_dia.get(dia, 0) for dia in range(desde, hasta + 1))
@@ -0,0 +1,78 @@
+# indice_fechas.py
+# Se define un índice ordenado por fecha de vencimiento para responder consultas por rango con bisect
+# Las tareas sin fecha (o con fecha inválida) se guardan al final, como si vencieran en la fecha máxima, pero no entran
+# en los rangos con fecha desde
+import bisect
+from datetime import date
+
+ORDINAL_MAXIMO = date.max.toordinal()
+
+
+# Se define la clase IndiceFechas que mantiene una lista ordenada de claves (ordinal, orden, id)
+# El orden de inserción desempata las tareas con la misma fecha, igual que un ordenamiento estable
+class IndiceFechas:
+    # Se define el constructor con la lista ordenada de claves y la clave actual de cada id
+    def __init__(self):
+        self.claves = []
+        self.clave_por_id = {}
+
+    # Se define el método agregar para agregar o mover una tarea dentro del índice
+    def agregar(self, tarea_id, ordinal, orden):
+        clave = (ORDINAL_MAXIMO if ordinal is None else ordinal, orden, tarea_id)
+        anterior = self.clave_por_id.get(tarea_id)
+        if anterior == clave:
+            return
+        if anterior is not None:
+            del self.claves[bisect.bisect_left(self.claves, anterior)]
+        bisect.insort(self.claves, clave)
+        self.clave_por_id[tarea_id] = clave
+
+    # Se define el método quitar para sacar una tarea del índice
+    def quitar(self, tarea_id):
+        clave = self.clave_por_id.pop(tarea_id, None)
+        if clave is not None:
+            del self.claves[bisect.bisect_left(self.claves, clave)]
+
+    # Se define el método agregar_varios para agregar o mover muchas tareas de una vez (entradas: (id, ordinal, orden))
+    # Se quitan las claves anteriores y se ordena la lista una sola vez, en vez de insertar cada clave por separado
+    def agregar_varios(self, entradas):
+        nuevas = {}
+        for tarea_id, ordinal, orden in entradas:
+            nuevas[tarea_id] = (ORDINAL_MAXIMO if ordinal is None else ordinal, orden, tarea_id)
+        if not nuevas:
+            return
+        self.claves = [c for c in self.claves if c[2] not in nuevas]
+        self.claves.extend(nuevas.values())
+        self.claves.sort()
+        self.clave_por_id.update(nuevas)
+
+    # Se define el método quitar_varios para sacar muchas tareas del índice con una sola pasada por la lista
+    def quitar_varios(self, tarea_ids):
+        quitadas = {i for i in tarea_ids if self.clave_por_id.pop(i, None) is not None}
+        if quitadas:
+            self.claves = [c for c in self.claves if c[2] not in quitadas]
+
+    # Se define el método limites para obtener las posiciones de la lista entre las que están las fechas de desde a hasta
+    # Si desde o hasta son None, el rango no tiene límite por ese lado; las tareas sin fecha solo se incluyen si no hay
+    # ningún límite (con solo desde, el rango termina en la última fecha real)
+    def limites(self, desde, hasta):
+        if desde is not None:
+            hasta = ORDINAL_MAXIMO - 1 if hasta is None else min(hasta, ORDINAL_MAXIMO - 1)
+        inicio = 0 if desde is None else bisect.bisect_left(self.claves, (desde,))
+        fin = len(self.claves) if hasta is None else bisect.bisect_left(self.claves, (hasta + 1,))
+        return inicio, fin
+
+    # Se define el método rango para recorrer los ids con fecha entre desde y hasta (ambas incluidas), ordenados por fecha
+    def rango(self, desde=None, hasta=None):
+        inicio, fin = self.limites(desde, hasta)
+        for i in range(inicio, fin):
+            yield self.claves[i][2]
+
+    # Se define el método contar para obtener la cantidad de tareas con fecha entre desde y hasta, sin recorrerlas
+    def contar(self, desde=None, hasta=None):
+        inicio, fin = self.limites(desde, hasta)
+        return max(fin - inicio, 0)
+
+    # Se define el método __len__ para obtener la cantidad de tareas en el índice
+    def __len__(self):
+        return len(self.claves)
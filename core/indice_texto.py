@@ -0,0 +1,108 @@
+# indice_texto.py
+# Se define un índice invertido para buscar tareas por palabras sin recorrer toda la lista
+# Las palabras se normalizan sin tildes y en minúsculas ("Capítulo" y "capitulo" son la misma palabra)
+# y la búsqueda acepta prefijos ("cap" encuentra "capítulo")
+import bisect
+import re
+import unicodedata
+
+PATRON_PALABRA = re.compile(r"\w+")
+
+
+# Se define la función para normalizar un texto: se quitan las tildes y se pasa a minúsculas
+def normalizar(texto):
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+# Se define la función para separar un texto normalizado en palabras
+def tokenizar(texto):
+    return PATRON_PALABRA.findall(normalizar(texto or ""))
+
+
+# Se define la clase IndiceInvertido que asocia cada palabra con los documentos (ids) que la contienen
+# Cada documento tiene varios campos; por cada palabra se guarda una máscara de bits con los campos donde aparece
+class IndiceInvertido:
+    # Se define el constructor con los nombres de los campos que se indexan
+    def __init__(self, campos):
+        self.bits = {nombre: 1 << i for i, nombre in enumerate(campos)}
+        self.postings = {}      # palabra -> {doc_id: máscara de campos}
+        self.vocabulario = []   # palabras ordenadas, para buscar por prefijo con bisect
+        self.documentos = {}    # doc_id -> {palabra: máscara de campos}
+
+    # Se define el método agregar para indexar (o reindexar) un documento a partir de sus campos de texto
+    def agregar(self, doc_id, campos):
+        palabras = {}
+        for nombre, texto in campos.items():
+            bit = self.bits[nombre]
+            for palabra in tokenizar(texto):
+                palabras[palabra] = palabras.get(palabra, 0) | bit
+
+        # Si el documento no cambió, no se toca el índice
+        if self.documentos.get(doc_id) == palabras:
+            return
+        self.quitar(doc_id)
+
+        for palabra, mascara in palabras.items():
+            posting = self.postings.get(palabra)
+            if posting is None:
+                posting = self.postings[palabra] = {}
+                bisect.insort(self.vocabulario, palabra)
+            posting[doc_id] = mascara
+        self.documentos[doc_id] = palabras
+
+    # Se define el método quitar para sacar un documento del índice
+    def quitar(self, doc_id):
+        palabras = self.documentos.pop(doc_id, None)
+        if not palabras:
+            return
+        for palabra in palabras:
+            posting = self.postings[palabra]
+            del posting[doc_id]
+            # Si la palabra ya no aparece en ningún documento, se quita del vocabulario
+            if not posting:
+                del self.postings[palabra]
+                del self.vocabulario[bisect.bisect_left(self.vocabulario, palabra)]
+
+    # Se define el método quitar_varios para sacar muchos documentos del índice
+    # Las palabras que quedan sin documentos se quitan del vocabulario con una sola pasada
+    def quitar_varios(self, doc_ids):
+        vacias = set()
+        for doc_id in doc_ids:
+            for palabra in self.documentos.pop(doc_id, None) or ():
+                posting = self.postings[palabra]
+                del posting[doc_id]
+                if not posting:
+                    del self.postings[palabra]
+                    vacias.add(palabra)
+        if vacias:
+            self.vocabulario = [p for p in self.vocabulario if p not in vacias]
+
+    # Se define el método buscar para obtener los ids de los documentos que contienen todas las palabras de la consulta
+    # Cada palabra de la consulta se compara como prefijo; si se indican campos, solo se consideran esos campos
+    # Si la consulta no tiene palabras se devuelve None (sin restricción)
+    def buscar(self, consulta, campos=None):
+        palabras_consulta = set(tokenizar(consulta))
+        if not palabras_consulta:
+            return None
+        mascara = sum(self.bits[c] for c in campos) if campos else -1
+
+        conjuntos = [self.buscar_prefijo(palabra, mascara) for palabra in palabras_consulta]
+        conjuntos.sort(key=len)
+        resultado = conjuntos[0]
+        for conjunto in conjuntos[1:]:
+            if not resultado:
+                break
+            resultado &= conjunto
+        return resultado
+
+    # Se define el método buscar_prefijo para obtener los ids que contienen alguna palabra que empieza con el prefijo
+    def buscar_prefijo(self, prefijo, mascara=-1):
+        ids = set()
+        i = bisect.bisect_left(self.vocabulario, prefijo)
+        while i < len(self.vocabulario) and self.vocabulario[i].startswith(prefijo):
+            for doc_id, campos in self.postings[self.vocabulario[i]].items():
+                if campos & mascara:
+                    ids.add(doc_id)
+            i += 1
+        return ids
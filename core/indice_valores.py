@@ -0,0 +1,46 @@
+# indice_valores.py
+# Se define un índice de valores exactos (estado, prioridad, categoría) para obtener las tareas con un valor sin recorrerlas
+# Los valores se comparan sin distinguir mayúsculas ("Trabajo" y "trabajo" son el mismo valor)
+
+# Se define el conjunto vacío que se devuelve para los valores que ninguna tarea tiene
+VACIO = frozenset()
+
+
+# Se define la clase IndiceValores que asocia, para cada campo, cada valor con los ids de las tareas que lo tienen
+class IndiceValores:
+    # Se define el constructor con los nombres de los campos que se indexan
+    def __init__(self, campos):
+        self.campos = campos
+        self.ids_por_valor = {campo: {} for campo in campos}    # campo -> {valor: ids}
+        self.valores_por_id = {}                                # id -> valores de sus campos, en el orden de campos
+
+    # Se define el método agregar para indexar (o reindexar) una tarea a partir de los valores de sus campos
+    def agregar(self, tarea_id, valores):
+        nuevos = tuple((valores.get(campo) or "").lower() for campo in self.campos)
+        anteriores = self.valores_por_id.get(tarea_id)
+        if anteriores == nuevos:
+            return
+        if anteriores is not None:
+            self.quitar(tarea_id)
+        for campo, valor in zip(self.campos, nuevos):
+            self.ids_por_valor[campo].setdefault(valor, set()).add(tarea_id)
+        self.valores_por_id[tarea_id] = nuevos
+
+    # Se define el método quitar para sacar una tarea del índice
+    def quitar(self, tarea_id):
+        valores = self.valores_por_id.pop(tarea_id, None)
+        if valores is None:
+            return
+        for campo, valor in zip(self.campos, valores):
+            ids = self.ids_por_valor[campo][valor]
+            ids.discard(tarea_id)
+            if not ids:
+                del self.ids_por_valor[campo][valor]
+
+    # Se define el método ids para obtener los ids de las tareas con un valor en un campo (sin copiarlos: no modificar)
+    def ids(self, campo, valor):
+        return self.ids_por_valor[campo].get((valor or "").lower(), VACIO)
+
+    # Se define el método __len__ para obtener la cantidad de tareas en el índice
+    def __len__(self):
+        return len(self.valores_por_id)
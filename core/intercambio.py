@@ -0,0 +1,277 @@
+# intercambio.py
+# Se definen las funciones para importar y exportar tareas por partes, sin tener todo el archivo en memoria
+# Formatos: "json" (un arreglo, como la instantánea), "ndjson" (una tarea por línea) y "csv"
+# En CSV las subtareas pueden ir "anidadas" (una columna con su JSON) o "planas" (una fila por subtarea)
+# Las exportaciones son generadores de trozos de texto y las importaciones son generadores de tareas,
+# así que se pueden encadenar (por ejemplo, de un archivo a otro) con memoria acotada
+import codecs
+import csv
+import io
+import json
+import re
+from itertools import groupby
+
+from core.tarea import Tarea
+
+FORMATOS = ("json", "ndjson", "csv")
+MODOS_SUBTAREAS = ("anidadas", "planas")
+TIPOS_CONTENIDO = {"json": "application/json", "ndjson": "application/x-ndjson", "csv": "text/csv"}
+TAMANO_BLOQUE = 1 << 16
+
+# Se definen las columnas del CSV; en modo "planas" la columna subtareas se reemplaza por una columna por dato de subtarea
+COLUMNAS_CSV = ("id", "titulo", "descripcion", "estado", "fecha_creacion", "fecha_completada", "fecha_vencimiento",
+                "prioridad", "categoria", "subtareas")
+COLUMNAS_CSV_PLANAS = COLUMNAS_CSV[:-1] + ("subtarea", "subtarea_completada")
+# Se definen las columnas que se dejan vacías en el CSV cuando no tienen valor (None) y que se leen como None
+# (en CSV una fecha vacía y una sin valor se escriben igual; ambas significan que no hay fecha)
+COLUMNAS_OPCIONALES = ("fecha_creacion", "fecha_completada", "fecha_vencimiento")
+
+ESPACIOS = re.compile(r"[ \t\n\r]*")
+
+
+# Se define la función para obtener el formato de un archivo según su extensión (.ndjson/.jsonl, .csv; si no, json)
+def formato_de_archivo(archivo):
+    nombre = archivo.lower()
+    if nombre.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if nombre.endswith(".csv"):
+        return "csv"
+    return "json"
+
+
+# Se define la función para juntar trozos pequeños de texto en trozos de al menos tamano caracteres
+# Así una descarga o una escritura no hace una llamada por cada tarea
+def agrupar(trozos, tamano=TAMANO_BLOQUE):
+    partes = []
+    acumulado = 0
+    for trozo in trozos:
+        partes.append(trozo)
+        acumulado += len(trozo)
+        if acumulado >= tamano:
+            yield "".join(partes)
+            partes = []
+            acumulado = 0
+    if partes:
+        yield "".join(partes)
+
+
+# Se define la función para exportar las tareas como un arreglo JSON con el mismo formato que la instantánea
+def exportar_json(tareas):
+    primera = True
+    for tarea in tareas:
+        # Los textos en JSON no tienen saltos de línea sin escapar, así que se puede indentar reemplazándolos
+        yield ("[\n    " if primera else ",\n    ") + json.dumps(tarea.to_dict(), indent=4).replace("\n", "\n    ")
+        primera = False
+    yield "[]" if primera else "\n]"
+
+
+# Se define la función para exportar las tareas en NDJSON, una tarea por línea
+def exportar_ndjson(tareas):
+    for tarea in tareas:
+        yield json.dumps(tarea.to_dict(), ensure_ascii=False) + "\n"
+
+
+# Se define la función para exportar las tareas en CSV, con las subtareas anidadas o planas
+def exportar_csv(tareas, subtareas="anidadas"):
+    # Se reutiliza un mismo buffer para convertir cada fila a texto
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    # Se define la función para obtener el texto de una fila y vaciar el buffer
+    def fila(valores):
+        escritor.writerow(valores)
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return texto
+
+    planas = subtareas == "planas"
+    yield fila(COLUMNAS_CSV_PLANAS if planas else COLUMNAS_CSV)
+    for tarea in tareas:
+        datos = tarea.to_dict()
+        valores = ["" if datos[c] is None else datos[c] for c in COLUMNAS_CSV[:-1]]
+        if not planas:
+            yield fila(valores + [json.dumps(datos["subtareas"], ensure_ascii=False) if datos["subtareas"] else ""])
+        elif not datos["subtareas"]:
+            yield fila(valores + ["", ""])
+        else:
+            for subtarea in datos["subtareas"]:
+                yield fila(valores + [subtarea["nombre"], "1" if subtarea["completada"] else "0"])
+
+
+# Se define la función para exportar las tareas en el formato indicado, en trozos de texto
+def exportar(tareas, formato="json", subtareas="anidadas"):
+    if formato == "ndjson":
+        trozos = exportar_ndjson(tareas)
+    elif formato == "csv":
+        trozos = exportar_csv(tareas, subtareas)
+    else:
+        trozos = exportar_json(tareas)
+    return agrupar(trozos)
+
+
+# Se define la función para leer un archivo binario por bloques
+def leer_bloques(f, tamano=TAMANO_BLOQUE):
+    while True:
+        bloque = f.read(tamano)
+        if not bloque:
+            return
+        yield bloque
+
+
+# Se define la función para convertir bloques de bytes UTF-8 en texto, aunque un carácter quede partido entre dos bloques
+def decodificar_bloques(bloques):
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    for bloque in bloques:
+        texto = decodificador.decode(bloque)
+        if texto:
+            yield texto
+    texto = decodificador.decode(b"", final=True)
+    if texto:
+        yield texto
+
+
+# Se define la función para obtener uno a uno los elementos de un arreglo JSON que llega en bloques de texto
+# Solo se mantiene en memoria el bloque actual y el elemento que se está leyendo; si el arreglo no es válido se lanza ValueError
+def iterar_arreglo_json(bloques):
+    decodificador = json.JSONDecoder()
+    bloques = iter(bloques)
+    texto = ""
+    posicion = 0
+    fin = False
+    # Estados: "inicio" (se espera "["), "valor" (un elemento o "]"), "separador" ("," o "]") y "siguiente" (un elemento)
+    estado = "inicio"
+    while True:
+        posicion = ESPACIOS.match(texto, posicion).end()
+        if posicion == len(texto) and not fin:
+            texto = next(bloques, None)
+            if texto is None:
+                texto = ""
+                fin = True
+            posicion = 0
+            continue
+        caracter = texto[posicion] if posicion < len(texto) else ""
+
+        if estado == "inicio":
+            if caracter != "[":
+                raise ValueError("Se esperaba un arreglo JSON de tareas.")
+            posicion += 1
+            estado = "valor"
+        elif estado in ("valor", "separador") and caracter == "]":
+            if ESPACIOS.match(texto, posicion + 1).end() < len(texto) or next(bloques, "").strip():
+                raise ValueError("Hay contenido después del arreglo JSON.")
+            return
+        elif estado == "separador":
+            if caracter != ",":
+                raise ValueError("Se esperaba ',' o ']' en el arreglo JSON.")
+            posicion += 1
+            estado = "siguiente"
+        else:
+            try:
+                valor, final = decodificador.raw_decode(texto, posicion)
+            except ValueError:
+                valor = final = None
+            # Si el elemento no se pudo leer o llega justo al final del bloque, puede que esté incompleto:
+            # se agrega el siguiente bloque y se vuelve a intentar
+            if final is None or (final == len(texto) and not fin):
+                if fin:
+                    raise ValueError("Arreglo JSON incompleto o inválido.")
+                siguiente = next(bloques, None)
+                if siguiente is None:
+                    fin = True
+                else:
+                    texto = texto[posicion:] + siguiente
+                    posicion = 0
+                continue
+            yield valor
+            posicion = final
+            estado = "separador"
+
+
+# Se define la función para crear una tarea a partir de un diccionario importado, indicando dónde estaba si no es válido
+def tarea_importada(datos, ubicacion):
+    if not isinstance(datos, dict) or not isinstance(datos.get("titulo"), str):
+        raise ValueError(f"{ubicacion}: tarea inválida (falta el título).")
+    datos.setdefault("descripcion", "")
+    return Tarea.from_dict(datos)
+
+
+# Se define la función para importar las tareas de un arreglo JSON (archivo abierto en modo binario)
+def importar_json(f):
+    for numero, datos in enumerate(iterar_arreglo_json(decodificar_bloques(leer_bloques(f)))):
+        yield tarea_importada(datos, f"Elemento {numero}")
+
+
+# Se define la función para importar las tareas de un archivo NDJSON (archivo abierto en modo texto); se omiten las líneas vacías
+def importar_ndjson(f):
+    for numero, linea in enumerate(f, 1):
+        if not linea.strip():
+            continue
+        try:
+            datos = json.loads(linea)
+        except ValueError:
+            raise ValueError(f"Línea {numero}: JSON inválido.")
+        yield tarea_importada(datos, f"Línea {numero}")
+
+
+# Se define la función para convertir una fila del CSV en el diccionario de una tarea
+def datos_fila(fila):
+    datos = {c: fila.get(c) or "" for c in COLUMNAS_CSV[:-1]}
+    for columna in COLUMNAS_OPCIONALES:
+        datos[columna] = datos[columna] or None
+    datos["id"] = datos["id"] or None
+    datos["estado"] = datos["estado"] or "pendiente"
+    datos["prioridad"] = datos["prioridad"] or "media"
+    return datos
+
+
+# Se define la función para importar las tareas de un archivo CSV (abierto en modo texto con newline="")
+# Se reconoce el modo de las subtareas por las columnas: con "subtarea" las filas seguidas con el mismo id son una tarea
+def importar_csv(f):
+    lector = csv.DictReader(f)
+    columnas = lector.fieldnames or ()
+    if "titulo" not in columnas:
+        raise ValueError("El CSV no tiene la columna titulo.")
+
+    if "subtarea" not in columnas:
+        for numero, fila in enumerate(lector, 2):
+            datos = datos_fila(fila)
+            try:
+                datos["subtareas"] = json.loads(fila.get("subtareas") or "[]")
+            except ValueError:
+                raise ValueError(f"Fila {numero}: subtareas inválidas.")
+            yield tarea_importada(datos, f"Fila {numero}")
+        return
+
+    # Las filas sin id son siempre tareas distintas
+    filas = enumerate(lector, 2)
+    for _, grupo in groupby(filas, key=lambda par: par[1].get("id") or f"#{par[0]}"):
+        grupo = list(grupo)
+        numero, primera = grupo[0]
+        datos = datos_fila(primera)
+        datos["subtareas"] = [
+            {"nombre": fila["subtarea"], "completada": (fila.get("subtarea_completada") or "").strip().lower() in ("1", "true", "si", "sí")}
+            for _, fila in grupo if fila.get("subtarea")
+        ]
+        yield tarea_importada(datos, f"Fila {numero}")
+
+
+# Se define la función para importar las tareas de un archivo abierto, según su formato
+# El archivo JSON se abre en modo binario y los demás en modo texto (UTF-8, con newline="" para CSV)
+def importar(f, formato="json"):
+    if formato == "ndjson":
+        return importar_ndjson(f)
+    if formato == "csv":
+        return importar_csv(f)
+    return importar_json(f)
+
+
+# Se define la función para leer las tareas de un archivo, una a una; el formato se obtiene de la extensión si no se indica
+def leer_tareas(archivo, formato=None):
+    formato = formato or formato_de_archivo(archivo)
+    if formato == "json":
+        f = open(archivo, "rb")
+    else:
+        f = open(archivo, "r", encoding="utf-8", newline="" if formato == "csv" else None)
+    with f:
+        yield from importar(f, formato)
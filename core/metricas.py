@@ -0,0 +1,221 @@
+# metricas.py
+# Se definen las métricas de la aplicación (contadores e histogramas con etiquetas) y su exportación en el formato de
+# texto de Prometheus, que se publica en /metrics. Las métricas se guardan en memoria, en el objeto global metricas:
+#   metricas.sumar(nombre, valor, **etiquetas)    -> suma a un contador
+#   metricas.observar(nombre, valor, **etiquetas) -> agrega un valor a un histograma (por ejemplo, una duración)
+#   with metricas.medir(nombre, **etiquetas):     -> agrega al histograma la duración del bloque, en segundos
+# También se define un perfilador por muestreo, que se activa solo si se pide, para ver en qué se va el tiempo de las
+# solicitudes lentas
+import os
+import sys
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+
+# Se definen los límites de las cubetas de los histogramas de duración, en segundos
+CUBETAS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# Se define la función para escapar el valor de una etiqueta en el formato de Prometheus
+def escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# Se define la función para escribir las etiquetas de una métrica, por ejemplo {ruta="ver_tareas",metodo="GET"}
+def formatear_etiquetas(etiquetas):
+    if not etiquetas:
+        return ""
+    return "{" + ",".join(f'{nombre}="{escapar(valor)}"' for nombre, valor in etiquetas) + "}"
+
+
+# Se define la función para formatear un número como lo espera Prometheus
+def formatear_valor(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+# Se define la función para obtener el tamaño de un archivo en bytes (0 si no existe)
+def tamano_archivo(archivo):
+    try:
+        return os.path.getsize(archivo)
+    except OSError:
+        return 0
+
+
+# Se define la clase Conteo, que cuenta los elementos que se recorren de un iterable sin dejar de recorrerlo a pedido
+# Sirve para saber cuántas tareas examinó una consulta que se detiene al completar la página
+class Conteo:
+    # Se define el constructor con la cantidad en cero
+    def __init__(self):
+        self.cantidad = 0
+
+    # Se define el método recorrer para recorrer un iterable contando sus elementos
+    def recorrer(self, elementos):
+        for elemento in elementos:
+            self.cantidad += 1
+            yield elemento
+
+
+# Se define la clase Metricas, que guarda contadores e histogramas y los exporta en el formato de Prometheus
+# Se puede usar desde varios hilos a la vez
+class Metricas:
+    # Se define el constructor con los límites de las cubetas de los histogramas
+    def __init__(self, cubetas=CUBETAS_SEGUNDOS):
+        self.cubetas = cubetas
+        self.descripciones = {}     # nombre -> (tipo, ayuda)
+        self.contadores = {}        # (nombre, etiquetas) -> valor
+        self.histogramas = {}       # (nombre, etiquetas) -> [cantidad por cubeta, suma, cantidad]
+        self.medidores = {}         # nombre -> función que devuelve el valor actual
+        self.mutex = threading.Lock()
+
+    # Se define el método describir para indicar el tipo (counter, gauge o histogram) y la ayuda de una métrica
+    def describir(self, nombre, tipo, ayuda):
+        self.descripciones[nombre] = (tipo, ayuda)
+
+    # Se define el método sumar para sumar un valor a un contador
+    def sumar(self, nombre, valor=1, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self.mutex:
+            self.contadores[clave] = self.contadores.get(clave, 0) + valor
+
+    # Se define el método observar para agregar un valor a un histograma
+    def observar(self, nombre, valor, **etiquetas):
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self.mutex:
+            histograma = self.histogramas.get(clave)
+            if histograma is None:
+                histograma = self.histogramas[clave] = [[0] * (len(self.cubetas) + 1), 0.0, 0]
+            histograma[0][bisect_left(self.cubetas, valor)] += 1
+            histograma[1] += valor
+            histograma[2] += 1
+
+    # Se define el método medir para agregar a un histograma la duración de un bloque (aunque termine con una excepción)
+    @contextmanager
+    def medir(self, nombre, **etiquetas):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nombre, time.perf_counter() - inicio, **etiquetas)
+
+    # Se define el método medidor para publicar un valor que se calcula al exportar (por ejemplo, la cantidad de tareas)
+    def medidor(self, nombre, ayuda, funcion, tipo="gauge"):
+        self.describir(nombre, tipo, ayuda)
+        self.medidores[nombre] = funcion
+
+    # Se define el método valor para obtener el valor de un contador (0 si no existe)
+    def valor(self, nombre, **etiquetas):
+        return self.contadores.get((nombre, tuple(sorted(etiquetas.items()))), 0)
+
+    # Se define el método texto para exportar todas las métricas en el formato de texto de Prometheus
+    def texto(self):
+        with self.mutex:
+            contadores = dict(self.contadores)
+            histogramas = {clave: (list(h[0]), h[1], h[2]) for clave, h in self.histogramas.items()}
+        series = {}
+        for (nombre, etiquetas), valor in contadores.items():
+            series.setdefault(nombre, []).append(f"{nombre}{formatear_etiquetas(etiquetas)} {formatear_valor(valor)}")
+        for (nombre, etiquetas), (cantidades, suma, cantidad) in histogramas.items():
+            lineas = series.setdefault(nombre, [])
+            acumulado = 0
+            for limite, cantidad_cubeta in zip(self.cubetas + (float("inf"),), cantidades):
+                acumulado += cantidad_cubeta
+                lineas.append(f"{nombre}_bucket{formatear_etiquetas(etiquetas + (('le', formatear_valor(limite)),))} "
+                              f"{acumulado}")
+            lineas.append(f"{nombre}_sum{formatear_etiquetas(etiquetas)} {formatear_valor(suma)}")
+            lineas.append(f"{nombre}_count{formatear_etiquetas(etiquetas)} {cantidad}")
+        for nombre, funcion in self.medidores.items():
+            try:
+                series.setdefault(nombre, []).append(f"{nombre} {formatear_valor(funcion())}")
+            except Exception as e:
+                print(f"Error al calcular la métrica {nombre}: {e}")
+
+        salida = []
+        for nombre in sorted(series):
+            tipo, ayuda = self.descripciones.get(nombre, ("untyped", ""))
+            salida.append(f"# HELP {nombre} {ayuda}")
+            salida.append(f"# TYPE {nombre} {tipo}")
+            salida.extend(sorted(series[nombre]) if tipo != "histogram" else series[nombre])
+        return "\n".join(salida) + "\n"
+
+
+# Se crea el objeto global con las métricas de la aplicación y se describen las que se registran en el gestor y en app.py
+metricas = Metricas()
+metricas.describir("todolist_solicitud_segundos", "histogram", "Duración de las solicitudes por ruta y método")
+metricas.describir("todolist_solicitudes_total", "counter", "Solicitudes atendidas por ruta y código de respuesta")
+metricas.describir("todolist_solicitudes_lentas_total", "counter", "Solicitudes que superaron el umbral del perfilador")
+metricas.describir("todolist_plantilla_segundos", "histogram", "Tiempo de generación de cada plantilla")
+metricas.describir("todolist_carga_segundos", "histogram", "Duración de las cargas de tareas")
+metricas.describir("todolist_carga_bytes_total", "counter", "Bytes de los archivos de tareas cargados")
+metricas.describir("todolist_guardado_segundos", "histogram",
+                   "Duración de los guardados: registros en el diario, instantáneas completas y exportaciones")
+metricas.describir("todolist_guardado_bytes_total", "counter", "Bytes de las instantáneas y exportaciones escritas")
+metricas.describir("todolist_guardado_cambios_total", "counter", "Cambios de tareas guardados en el almacenamiento")
+metricas.describir("todolist_consultas_total", "counter", "Consultas de tareas por tipo")
+metricas.describir("todolist_consulta_examinadas_total", "counter", "Tareas examinadas por las consultas")
+metricas.describir("todolist_consulta_devueltas_total", "counter", "Tareas devueltas por las consultas")
+
+
+# Se define la clase PerfiladorMuestreo, que registra cada cierto intervalo la pila de llamadas de los hilos que atienden
+# una solicitud y, si la solicitud tarda más que el umbral, muestra las pilas más frecuentes (donde se fue el tiempo)
+# Un solo hilo en segundo plano toma las muestras de todas las solicitudes en curso
+class PerfiladorMuestreo:
+    # Se define el constructor con el umbral (segundos), el intervalo entre muestras y las llamadas que se guardan por pila
+    def __init__(self, umbral=1.0, intervalo=0.005, profundidad=8, mostradas=5):
+        self.umbral = umbral
+        self.intervalo = intervalo
+        self.profundidad = profundidad
+        self.mostradas = mostradas
+        self.en_curso = {}      # id del hilo -> (inicio, Counter de pilas)
+        self.mutex = threading.Lock()
+        self.hilo = None
+
+    # Se define el método iniciar para empezar a muestrear el hilo actual
+    def iniciar(self):
+        with self.mutex:
+            self.en_curso[threading.get_ident()] = (time.perf_counter(), Counter())
+            if self.hilo is None:
+                self.hilo = threading.Thread(target=self.muestrear, name="perfilador", daemon=True)
+                self.hilo.start()
+
+    # Se define el método terminar para dejar de muestrear el hilo actual
+    # Si la solicitud superó el umbral se muestran sus pilas más frecuentes; devuelve la duración en segundos
+    def terminar(self, descripcion):
+        with self.mutex:
+            inicio, pilas = self.en_curso.pop(threading.get_ident(), (None, None))
+        if inicio is None:
+            return None
+        duracion = time.perf_counter() - inicio
+        if duracion >= self.umbral:
+            metricas.sumar("todolist_solicitudes_lentas_total")
+            self.mostrar(descripcion, duracion, pilas)
+        return duracion
+
+    # Se define el método muestrear, que ejecuta el hilo en segundo plano
+    def muestrear(self):
+        while True:
+            time.sleep(self.intervalo)
+            marcos = sys._current_frames()
+            with self.mutex:
+                for ident, (_, pilas) in self.en_curso.items():
+                    marco = marcos.get(ident)
+                    if marco is not None:
+                        pilas[self.pila(marco)] += 1
+
+    # Se define el método pila para resumir las últimas llamadas de un marco como texto (archivo:línea función)
+    def pila(self, marco):
+        return tuple(f"{os.path.basename(llamada.filename)}:{llamada.lineno} {llamada.name}"
+                     for llamada in traceback.extract_stack(marco, limit=self.profundidad))
+
+    # Se define el método mostrar para imprimir las pilas más frecuentes de una solicitud lenta
+    def mostrar(self, descripcion, duracion, pilas):
+        total = sum(pilas.values())
+        print(f"Solicitud lenta: {descripcion} tardó {duracion:.3f} s ({total} muestras)")
+        for pila, cantidad in pilas.most_common(self.mostradas):
+            print(f"  {cantidad / total:.0%} en:")
+            for llamada in pila:
+                print(f"      {llamada}")
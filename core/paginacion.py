@@ -0,0 +1,48 @@
+# paginacion.py
+# Se define la paginación de resultados: en vez de devolver (y mostrar) todas las tareas, se devuelve solo una página
+from itertools import islice
+
+
+# Se define la clase Pagina: una lista con los elementos de una página, más el total y la posición para navegar entre páginas
+# Como es una lista, se puede usar igual que los resultados sin paginar
+class Pagina(list):
+    # Se define el constructor con los elementos de la página, el total de elementos, el desplazamiento y el límite
+    def __init__(self, elementos, total, desplazamiento=0, limite=None):
+        super().__init__(elementos)
+        self.total = total
+        self.desplazamiento = desplazamiento
+        self.limite = limite
+
+    # Se define la propiedad numero para obtener el número de la página (empezando en 1)
+    @property
+    def numero(self):
+        return self.desplazamiento // self.limite + 1 if self.limite else 1
+
+    # Se define la propiedad cantidad_paginas para obtener la cantidad total de páginas
+    @property
+    def cantidad_paginas(self):
+        if not self.limite:
+            return 1
+        return max((self.total + self.limite - 1) // self.limite, 1)
+
+    # Se define la propiedad hay_anterior para saber si existe una página anterior
+    @property
+    def hay_anterior(self):
+        return self.desplazamiento > 0
+
+    # Se define la propiedad hay_siguiente para saber si existe una página siguiente
+    @property
+    def hay_siguiente(self):
+        return self.limite is not None and self.desplazamiento + self.limite < self.total
+
+
+# Se define la función para obtener una página de elementos a partir del desplazamiento y el límite (None = sin límite)
+# Si se conoce el total (por ejemplo, el tamaño de un índice), solo se recorren los elementos hasta el final de la página
+def paginar(elementos, desplazamiento=0, limite=None, total=None):
+    desplazamiento = max(desplazamiento, 0)
+    limite = None if limite is None else max(limite, 0)
+    fin = None if limite is None else desplazamiento + limite
+    if total is None:
+        elementos = list(elementos)
+        return Pagina(elementos[desplazamiento:fin], len(elementos), desplazamiento, limite)
+    return Pagina(islice(elementos, desplazamiento, fin), total, desplazamiento, limite)
@@ -0,0 +1,312 @@
+# persistencia.py
+# Se definen las utilidades para persistir las tareas en disco:
+# un diario (journal) de solo anexado con un registro por cambio, la firma de la instantánea JSON
+# y la escritura atómica de instantáneas con generaciones rotadas, más un candado entre procesos
+# para que varios procesos (workers del servidor o la terminal) puedan usar los mismos archivos
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+
+# Se importa el módulo para bloquear archivos según el sistema operativo (fcntl en Unix, msvcrt en Windows)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+
+# Se define la función para calcular la firma de una instantánea a partir de su contenido en bytes
+# La firma permite saber si el diario fue escrito sobre esta misma instantánea
+def firma_contenido(contenido):
+    return FirmaIncremental().actualizar(contenido).valor()
+
+
+# Se define la clase FirmaIncremental para calcular la misma firma a medida que se escribe o se lee el contenido por partes
+class FirmaIncremental:
+    # Se define el constructor con la firma de un contenido vacío
+    def __init__(self):
+        self.longitud = 0
+        self.crc = 0
+
+    # Se define el método actualizar para agregar una parte del contenido
+    def actualizar(self, datos):
+        self.longitud += len(datos)
+        self.crc = zlib.crc32(datos, self.crc)
+        return self
+
+    # Se define el método valor para obtener la firma del contenido agregado hasta ahora
+    def valor(self):
+        return f"{self.longitud}-{self.crc:08x}"
+
+
+# Se define la función para obtener el estado de un archivo (dispositivo, inodo, tamaño y fecha de modificación)
+# Sirve para saber sin leerlo si otro proceso lo cambió; escribir_atomico siempre crea un archivo (inodo) nuevo
+def estado_archivo(archivo):
+    try:
+        st = os.stat(archivo)
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+# Se define la función para escribir un archivo de forma atómica
+# El contenido se escribe en un archivo temporal del mismo directorio, se sincroniza a disco y se renombra sobre el destino,
+# de modo que un lector o una caída a mitad de la escritura nunca ven un archivo truncado
+def escribir_atomico(archivo, contenido, generaciones=0):
+    return escribir_atomico_partes(archivo, [contenido], generaciones)
+
+
+# Se define la función para escribir un archivo de forma atómica a partir de partes (bytes) que se van generando
+# Así no hace falta tener todo el contenido en memoria; devuelve la firma del contenido escrito
+def escribir_atomico_partes(archivo, partes, generaciones=0):
+    directorio = os.path.dirname(os.path.abspath(archivo))
+    descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(archivo) + ".", suffix=".tmp", dir=directorio)
+    firma = FirmaIncremental()
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            for parte in partes:
+                f.write(parte)
+                firma.actualizar(parte)
+            f.flush()
+            os.fsync(f.fileno())
+        # Se conservan los permisos del archivo anterior (mkstemp crea el temporal solo para el dueño)
+        try:
+            shutil.copymode(archivo, temporal)
+        except OSError:
+            os.chmod(temporal, 0o644)
+        rotar_generaciones(archivo, generaciones)
+        os.replace(temporal, archivo)
+    except BaseException:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        raise
+    sincronizar_directorio(directorio)
+    return firma.valor()
+
+
+# Se define la función para rotar las generaciones anteriores de un archivo: archivo.1 es la más reciente
+# La generación actual se enlaza (o copia) en archivo.1 para que el archivo original nunca deje de existir
+def rotar_generaciones(archivo, generaciones):
+    if generaciones <= 0 or not os.path.exists(archivo):
+        return
+    for i in range(generaciones - 1, 0, -1):
+        if os.path.exists(f"{archivo}.{i}"):
+            os.replace(f"{archivo}.{i}", f"{archivo}.{i + 1}")
+    try:
+        if os.path.exists(f"{archivo}.1"):
+            os.remove(f"{archivo}.1")
+        os.link(archivo, f"{archivo}.1")
+    except OSError:
+        shutil.copy2(archivo, f"{archivo}.1")
+
+
+# Se define la función para sincronizar el directorio y que el renombrado quede persistido
+# En sistemas que no permiten abrir directorios (Windows) se omite
+def sincronizar_directorio(directorio):
+    try:
+        descriptor = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+# Se define la función para bloquear un archivo abierto hasta obtener el candado exclusivo
+def bloquear_descriptor(descriptor):
+    if fcntl is not None:
+        fcntl.flock(descriptor, fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        # En Windows se bloquea el primer byte; msvcrt.locking se rinde después de 10 segundos, así que se reintenta
+        os.lseek(descriptor, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(descriptor, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+# Se define la función para liberar el candado de un archivo abierto
+def desbloquear_descriptor(descriptor):
+    if fcntl is not None:
+        fcntl.flock(descriptor, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(descriptor, 0, os.SEEK_SET)
+        msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+
+
+# Se define la clase CandadoArchivo: un candado exclusivo entre procesos sobre un archivo auxiliar (por ejemplo, tareas.json.lock)
+# Es consultivo (solo lo respetan quienes lo usan) y reentrante dentro de un mismo hilo; los demás hilos del proceso esperan
+# igual que los otros procesos. El archivo se abre en cada bloqueo para que los procesos creados con fork no compartan el candado
+class CandadoArchivo:
+    # Se define el constructor con la ruta del archivo auxiliar
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.mutex = threading.RLock()
+        self.profundidad = 0
+        self.descriptor = None
+
+    # Se define el método adquirir para tomar el candado (espera si otro proceso o hilo lo tiene)
+    def adquirir(self):
+        self.mutex.acquire()
+        if self.profundidad == 0:
+            try:
+                self.descriptor = os.open(self.archivo, os.O_RDWR | os.O_CREAT, 0o644)
+                bloquear_descriptor(self.descriptor)
+            except BaseException:
+                if self.descriptor is not None:
+                    os.close(self.descriptor)
+                    self.descriptor = None
+                self.mutex.release()
+                raise
+        self.profundidad += 1
+
+    # Se define el método liberar para soltar el candado tomado
+    def liberar(self):
+        self.profundidad -= 1
+        if self.profundidad == 0:
+            try:
+                desbloquear_descriptor(self.descriptor)
+            finally:
+                os.close(self.descriptor)
+                self.descriptor = None
+        self.mutex.release()
+
+    # Se define el administrador de contexto bloqueado para usar con "with"
+    @contextmanager
+    def bloqueado(self):
+        self.adquirir()
+        try:
+            yield
+        finally:
+            self.liberar()
+
+
+# Se define la clase DiarioTareas para registrar cada cambio como una línea JSON compacta
+# La primera línea del diario indica la firma de la instantánea sobre la que se aplican los registros
+# Se recuerda hasta dónde se leyó el diario, para leer solo los registros que otro proceso agregue después
+# Varios cambios guardados juntos se escriben en una sola línea {"op": "lote", "registros": [...]}: si la escritura
+# se interrumpe, la línea queda incompleta y no se aplica ninguno de ellos
+class DiarioTareas:
+    # Se define el constructor con la ruta del diario y la cantidad de registros antes de compactar
+    def __init__(self, archivo, max_registros=1000):
+        self.archivo = archivo
+        self.max_registros = max_registros
+        self.cantidad_registros = 0
+        self.identidad = None   # (dispositivo, inodo) del diario leído o escrito por última vez
+        self.posicion = 0       # bytes leídos hasta el último registro completo
+        self.tamano = 0         # tamaño del diario la última vez que se leyó o escribió
+        self.danado = False     # si se encontró una línea incompleta (una escritura interrumpida)
+
+    # Se define el método iniciar para crear un diario vacío asociado a la firma de la instantánea
+    def iniciar(self, firma):
+        escribir_atomico(self.archivo, (json.dumps({"base": firma}) + "\n").encode("utf-8"))
+        st = os.stat(self.archivo)
+        self.identidad = (st.st_dev, st.st_ino)
+        self.posicion = self.tamano = st.st_size
+        self.cantidad_registros = 0
+        self.danado = False
+
+    # Se define el método registrar para anexar un registro al final del diario
+    def registrar(self, registro):
+        self.registrar_varios([registro])
+
+    # Se define el método registrar_varios para anexar varios registros con una sola escritura, en un solo lote
+    def registrar_varios(self, registros):
+        registro = registros[0] if len(registros) == 1 else {"op": "lote", "registros": registros}
+        datos = (json.dumps(registro, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.archivo, "ab") as f:
+            inicio = f.seek(0, os.SEEK_END)
+            f.write(datos)
+        self.cantidad_registros += len(registros)
+        # Si otro proceso había agregado registros que todavía no se leyeron, se dejan para leer_nuevos
+        if inicio == self.tamano:
+            self.posicion = self.tamano = inicio + len(datos)
+
+    # Se define el método leer para obtener los registros del diario que corresponden a la firma indicada
+    # Si no existe el diario o pertenece a otra instantánea (ya compactada) se devuelve None
+    def leer(self, firma):
+        try:
+            with open(self.archivo, "rb") as f:
+                encabezado = f.readline()
+                try:
+                    if json.loads(encabezado).get("base") != firma:
+                        return None
+                except ValueError:
+                    return None
+
+                st = os.fstat(f.fileno())
+                self.identidad = (st.st_dev, st.st_ino)
+                self.posicion = len(encabezado)
+                self.danado = False
+                registros = self.leer_registros(f)
+        except FileNotFoundError:
+            return None
+
+        self.cantidad_registros = len(registros)
+        return registros
+
+    # Se define el método leer_nuevos para obtener los registros agregados (por otro proceso) desde la última lectura
+    # Si el diario fue reemplazado (se compactó sobre otra instantánea) o no existe, se devuelve None
+    def leer_nuevos(self):
+        try:
+            with open(self.archivo, "rb") as f:
+                st = os.fstat(f.fileno())
+                if (st.st_dev, st.st_ino) != self.identidad:
+                    return None
+                f.seek(self.posicion)
+                registros = self.leer_registros(f)
+        except FileNotFoundError:
+            return None
+
+        self.cantidad_registros += len(registros)
+        return registros
+
+    # Se define el método leer_registros para leer los registros completos desde la posición actual del archivo
+    def leer_registros(self, f):
+        registros = []
+        for linea in f:
+            # Una línea sin salto final corresponde a una escritura interrumpida y se descarta
+            if not linea.endswith(b"\n"):
+                self.danado = True
+                break
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                self.danado = True
+                break
+            # Los registros de un lote se devuelven por separado
+            if registro.get("op") == "lote":
+                registros.extend(registro["registros"])
+            else:
+                registros.append(registro)
+            self.posicion += len(linea)
+        self.tamano = os.fstat(f.fileno()).st_size
+        return registros
+
+    # Se define el método cambio_externo para saber, sin leerlo, si el diario cambió desde la última lectura o escritura
+    def cambio_externo(self):
+        try:
+            st = os.stat(self.archivo)
+        except FileNotFoundError:
+            return self.identidad is not None
+        return (st.st_dev, st.st_ino) != self.identidad or st.st_size != self.tamano
+
+    # Se define el método necesita_compactar para saber si el diario superó el máximo de registros,
+    # si tiene una línea incompleta (no se puede seguir anexando detrás de ella) o si todavía no se inició ni se leyó
+    # (sin encabezado, sus registros no corresponderían a ninguna instantánea)
+    def necesita_compactar(self):
+        return self.identidad is None or self.danado or self.cantidad_registros >= self.max_registros
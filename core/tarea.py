@@ -1,20 +1,97 @@
+import sys
+import uuid
+from core.validacion import fecha_a_ordinal
+
+
+# Se define la función para generar un id único y estable para una tarea
+def generar_id():
+    return uuid.uuid4().hex
+
+
+# Se define la función para compartir un texto repetido (estado, prioridad, categoría, fecha) entre todas las tareas
+# Los textos leídos de un archivo son objetos distintos aunque sean iguales; sys.intern deja una sola copia de cada uno
+def compartir(valor):
+    return sys.intern(valor) if type(valor) is str else valor
+
+
+class Subtarea:  # Se define la clase Subtarea
+    # Con __slots__ cada subtarea ocupa lo justo para sus dos atributos, sin un diccionario propio
+    __slots__ = ("nombre", "completada")
+
+    # Se define el constructor de la clase Subtarea con su nombre, iniciando la subtarea sin completar
+    def __init__(self, nombre, completada=False):
+        self.nombre = nombre
+        self.completada = completada
+
+    # Se define el método to_dict para convertir la subtarea a un diccionario
+    def to_dict(self):
+        return {"nombre": self.nombre, "completada": self.completada}
+
+    # Se define un método estático para crear una subtarea a partir de un diccionario (o solo de su nombre)
+    @staticmethod
+    def from_dict(data):
+        if isinstance(data, Subtarea):
+            return data
+        if isinstance(data, str):
+            return Subtarea(data)
+        return Subtarea(data["nombre"], bool(data.get("completada", False)))
+
+    # Se define la comparación por contenido
+    def __eq__(self, otra):
+        if not isinstance(otra, Subtarea):
+            return NotImplemented
+        return self.nombre == otra.nombre and self.completada == otra.completada
+
+    # Se define la representación de la subtarea
+    def __repr__(self):
+        return f"Subtarea({self.nombre!r}, completada={self.completada!r})"
+
+
 class Tarea:  # Se define la clase Tarea
+    # Con __slots__ cada tarea guarda sus atributos en posiciones fijas, sin un diccionario propio
+    __slots__ = ("id", "titulo", "descripcion", "estado", "fecha_creacion", "_fecha_completada", "ordinal_completada",
+                 "_fecha_vencimiento", "ordinal_vencimiento", "prioridad", "subtareas", "categoria")
+
     # Se define el constructor de la clase Tarea con los atributos necesarios para una tarea, iniciando la tarea como pendiente y con prioridad media
-    def __init__(self, titulo, descripcion, estado="pendiente", fecha_creacion=None, fecha_completada=None, fecha_vencimiento=None, prioridad="media", subtareas=None, categoria=""): 
+    def __init__(self, titulo, descripcion, estado="pendiente", fecha_creacion=None, fecha_completada=None, fecha_vencimiento=None, prioridad="media", subtareas=None, categoria="", id=None):
+        # El id identifica a la tarea aunque cambie su posición en la lista
+        self.id = id or generar_id()
         self.titulo = titulo
         self.descripcion = descripcion
-        self.estado = estado
-        self.fecha_creacion = fecha_creacion
-        self.fecha_completada = fecha_completada
-        self.fecha_vencimiento = fecha_vencimiento
-        self.prioridad = prioridad
-        # Subtareas: lista de dicts: {"nombre": str, "completada": bool}
-        self.subtareas = subtareas if subtareas is not None else []
-        self.categoria = categoria 
+        # Los estados, prioridades, categorías y fechas se repiten mucho entre tareas, así que se comparten
+        self.estado = compartir(estado)
+        self.fecha_creacion = compartir(fecha_creacion)
+        self.fecha_completada = compartir(fecha_completada)
+        self.fecha_vencimiento = compartir(fecha_vencimiento)
+        self.prioridad = compartir(prioridad)
+        # Subtareas: lista de Subtarea (también se aceptan diccionarios {"nombre": str, "completada": bool})
+        self.subtareas = [Subtarea.from_dict(s) for s in subtareas] if subtareas else []
+        self.categoria = compartir(categoria)
+
+    # Se define la propiedad fecha_vencimiento; al asignarla se calcula su ordinal una sola vez
+    @property
+    def fecha_vencimiento(self):
+        return self._fecha_vencimiento
+
+    @fecha_vencimiento.setter
+    def fecha_vencimiento(self, valor):
+        self._fecha_vencimiento = valor
+        self.ordinal_vencimiento = fecha_a_ordinal(valor)
+
+    # Se define la propiedad fecha_completada; al asignarla se calcula su ordinal una sola vez
+    @property
+    def fecha_completada(self):
+        return self._fecha_completada
+
+    @fecha_completada.setter
+    def fecha_completada(self, valor):
+        self._fecha_completada = valor
+        self.ordinal_completada = fecha_a_ordinal(valor)
 
     # Se define el método to_dict para convertir la clase a un diccionario
     def to_dict(self):
         return {
+            "id": self.id,
             "titulo": self.titulo,
             "descripcion": self.descripcion,
             "estado": self.estado,
@@ -22,13 +99,13 @@ class Tarea:  # Se define la clase Tarea
             "fecha_completada": self.fecha_completada,
             "fecha_vencimiento": self.fecha_vencimiento,
             "prioridad": self.prioridad,
-            "subtareas": self.subtareas,
+            "subtareas": [s.to_dict() for s in self.subtareas],
             "categoria": self.categoria
         }
 
     # Se define un método estático de clase Tarea para crear una tarea a partir de un diccionario
     @staticmethod
-    def from_dict(data):  
+    def from_dict(data):
         return Tarea(
             titulo=data["titulo"],
             descripcion=data["descripcion"],
@@ -38,5 +115,6 @@ class Tarea:  # Se define la clase Tarea
             fecha_vencimiento=data.get("fecha_vencimiento"),
             prioridad=data.get("prioridad", "media"),
             subtareas=data.get("subtareas", []),
-            categoria=data.get("categoria", "")
+            categoria=data.get("categoria", ""),
+            id=data.get("id")
         )
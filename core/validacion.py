@@ -1,7 +1,11 @@
 # validacion.py
 # Se importa la librería de datetime para manejar fechas
 # Se definen funciones para validar y formatear títulos y fechas
-from datetime import datetime
+import re
+from datetime import date, datetime
+
+# Se define el formato de las fechas: día y mes de uno o dos dígitos y año de cuatro, como acepta strptime con '%d-%m-%Y'
+FORMATO_FECHA = re.compile(r"(\d{1,2})-(\d{1,2})-(\d{4})", re.ASCII)
 
 # Se define la función para validar y formatear títulos 
 def validar_titulo(titulo):
@@ -12,11 +16,22 @@ def validar_titulo(titulo):
 def validar_fecha(fecha_str):
     if not fecha_str.strip():
         return True  # permitir fecha vacía (opcional)
+    return fecha_a_ordinal(fecha_str) is not None  # si se pudo convertir, es válida
+
+# Se define la función para convertir una fecha 'd-m-Y' a su número ordinal (días desde el 01-01-0001)
+# Las tareas guardan este número para comparar y ordenar fechas sin volver a convertir el texto
+# La función devuelve None si la fecha está vacía, no tiene el formato 'dd-mm-aaaa' o no existe (por ejemplo, 31-02-2025)
+def fecha_a_ordinal(fecha_str):
+    if not fecha_str:
+        return None
+    partes = FORMATO_FECHA.fullmatch(fecha_str.strip())
+    if partes is None:
+        return None
+    dia, mes, anio = partes.groups()
     try:
-        datetime.strptime(fecha_str, "%d-%m-%Y") # intenta convertir la cadena a un objeto datetime
-        return True  # si no falla, es válida
-    except ValueError:  # si falla, no es válida
-        return False
+        return date(int(anio), int(mes), int(dia)).toordinal()
+    except ValueError:
+        return None
 
 # Se define la función para formatear fechas
 # La función recibe una cadena de texto con una fecha y la devuelve en el formato 'dd-mm-aaaa'
@@ -1,53 +1,505 @@
 # gestor_web.py
 
-# Se importa la clase Tarea para crear y manipular tareas, así como la clase datetime y timedelta para manejar fechas y horas
-import json
-from core.tarea import Tarea
-from datetime import datetime, timedelta
+# Se importa la clase Tarea para crear y manipular tareas, así como las clases date y datetime para manejar fechas
+import atexit
+import functools
+import threading
+import time
+import uuid
+import weakref
+from core.tarea import Subtarea, Tarea
+from core.concurrencia import CandadoLecturaEscritura, con_escritura, con_lectura
+from core.persistencia import escribir_atomico_partes
+from core.almacenamiento import AlmacenamientoJSON
+from core.intercambio import exportar, formato_de_archivo, leer_tareas
+from core.indice_texto import IndiceInvertido, tokenizar
+from core.indice_fechas import IndiceFechas
+from core.indice_valores import IndiceValores
+from core.estadisticas import ContadoresTareas
+from core.columnas import NUMPY_DISPONIBLE, TablaColumnar
+from core.consulta import (CAMPOS_TEXTO, CAMPOS_VALOR, Consulta, Planificador, RangoFechas, crear_filtro, textos_de,
+                           valores_de)
+from core.metricas import metricas, tamano_archivo
+from core.validacion import fecha_a_ordinal
+from datetime import date, datetime
+
+# Se define cuántos segundos espera el hilo de guardado antes de reintentar cuando un guardado falla
+ESPERA_REINTENTO = 1.0
+
+# Se define cuántas tareas importadas se incorporan de una vez
+TAMANO_LOTE_IMPORTACION = 1000
+
+
+# Se define la función que se ejecuta al terminar el programa para guardar los cambios pendientes de un gestor
+# Recibe una referencia débil, para que registrarla no mantenga vivo al gestor hasta el final del programa
+def guardar_al_salir(referencia):
+    gestor = referencia()
+    if gestor is not None:
+        gestor.flush()
+
+
+# Se define la función para aplicar a una tarea los cambios de actualizar_tarea, sin indexarla ni registrar el cambio
+# El estado se cambia igual que con los métodos marcar_* (al dejar de estar completada se borra la fecha de completado)
+def aplicar_cambios(tarea, cambios):
+    for campo in ("titulo", "descripcion", "fecha_vencimiento", "prioridad", "categoria"):
+        if campo in cambios:
+            setattr(tarea, campo, cambios[campo])
+
+    estado = cambios.get("estado")
+    if estado == "completada" and tarea.estado != "completada":
+        tarea.estado = "completada"
+        tarea.fecha_completada = datetime.today().strftime("%d-%m-%Y")
+    elif estado in ("en progreso", "pendiente"):
+        if tarea.estado == "completada":
+            tarea.fecha_completada = None
+        tarea.estado = estado
+
 
 # Se define la clase GestorTareasWeb para gestionar las tareas y sus operaciones
 class GestorTareasWeb:
-    # Se define el constructor de la clase GestorTareasWeb para inicializar la lista de tareas vacía
-    def __init__(self):
-        self.lista_tareas = []
+    # Se define el constructor de la clase GestorTareasWeb para inicializar el diccionario de tareas vacío
+    # Las tareas se guardan en un diccionario id -> tarea que conserva el orden de inserción
+    # Cada cambio se guarda en el motor de almacenamiento; por defecto es AlmacenamientoJSON (instantánea JSON + diario),
+    # pero se puede indicar otro, como AlmacenamientoSQLite
+    # Los índices (orden de inserción, texto, fechas de vencimiento y valores de estado, prioridad y categoría) y los
+    # contadores de estadísticas se mantienen al día en cada cambio; las consultas los usan a través de core/consulta.py
+    # El índice de texto se crea recién con la primera búsqueda, porque necesita leer todos los textos de las tareas
+    # (con AlmacenamientoBinario, los textos se leen del archivo solo cuando se usan); el de valores, con la primera
+    # consulta que lo usa, para no hacer más lenta la carga
+    # Las consultas toman el candado en modo lectura (pueden ocurrir a la vez) y los cambios en modo escritura (uno a la vez)
+    # Los cambios no se escriben de inmediato: se anotan como pendientes (varios cambios a una misma tarea cuentan como uno)
+    # y un hilo en segundo plano los guarda juntos cuando pasan max_latencia segundos o se juntan max_lote tareas.
+    # Con sincrono=True cada cambio se guarda en el momento (útil en pruebas y en la terminal)
+    # La generación aumenta con cada cambio; junto con un identificador de la instancia forma la etiqueta (ETag) de la API
+    # Varios procesos pueden compartir el almacenamiento: las escrituras toman un candado entre procesos y, antes de escribir,
+    # se incorporan los cambios que otro proceso haya guardado (refrescar hace lo mismo antes de cada consulta)
+    # Con columnar=True se mantiene además una tabla columnar (core/columnas.py) para filtrar y ordenar sin recorrer
+    # las tareas; por defecto se usa solo si NumPy está instalado
+    def __init__(self, archivo="data/tareas.json", max_registros_diario=1000, generaciones=3, almacenamiento=None,
+                 sincrono=False, max_latencia=0.5, max_lote=200, columnar=None):
+        self.tareas = {}
+        self.orden = {}
+        self.contador_orden = 0
+        self.indice_texto = None
+        self.mutex_indice_texto = threading.Lock()
+        self.indice_fechas = IndiceFechas()
+        self.indice_valores = None
+        self.mutex_indice_valores = threading.Lock()
+        self.contadores = ContadoresTareas()
+        self.columnar = NUMPY_DISPONIBLE if columnar is None else columnar
+        self.tabla = TablaColumnar() if self.columnar else None
+        self.generacion = 0
+        self.versiones = {}             # id -> generación en la que cambió la tarea por última vez
+        self.instancia = uuid.uuid4().hex[:8]
+        self.almacenamiento = almacenamiento or AlmacenamientoJSON(archivo, max_registros_diario, generaciones)
+        self.candado = CandadoLecturaEscritura()
+        self.sincrono = sincrono
+        self.max_latencia = max_latencia
+        self.max_lote = max_lote
+        self.cambios_pendientes = {}    # id -> tarea a guardar, o None si hay que eliminarla
+        self.compactacion_pendiente = False
+        self.condicion_guardado = threading.Condition()
+        self.mutex_guardado = threading.Lock()
+        self.hilo_guardado = None
+        self.cerrado = False
+        self.en_lote = False
+        # Al terminar el programa se guardan los cambios que queden pendientes (salvo que antes se llame a cerrar)
+        self.al_salir = None
+        if not sincrono:
+            self.al_salir = functools.partial(guardar_al_salir, weakref.ref(self))
+            atexit.register(self.al_salir)
+
+    # Se define la propiedad lista_tareas para obtener las tareas como lista, en orden de inserción
+    @property
+    @con_lectura
+    def lista_tareas(self):
+        return list(self.tareas.values())
+
+    # Se define el setter de lista_tareas para reemplazar todas las tareas a partir de una lista
+    @lista_tareas.setter
+    @con_escritura
+    def lista_tareas(self, tareas):
+        self.tareas = {t.id: t for t in tareas}
+        self.reconstruir_indices()
+
+    # Se define el método etiqueta para obtener un texto que cambia cada vez que cambian las tareas
+    # Incluye el identificador de la instancia, para que dos procesos con la misma generación no se confundan
+    def etiqueta(self):
+        return f"{self.instancia}-{self.generacion}"
+
+    # Se define el método version_tarea para obtener un número que cambia cada vez que cambia una tarea (None si no existe)
+    # Sirve para guardar en caché lo que se genera a partir de una sola tarea, como su fragmento HTML
+    def version_tarea(self, tarea_id):
+        return self.versiones.get(tarea_id)
+
+    # Se define el método indexar_tarea para agregar o actualizar una tarea en los índices
+    def indexar_tarea(self, tarea):
+        self.generacion += 1
+        self.indexar_orden_texto_y_estado(tarea)
+        self.indice_fechas.agregar(tarea.id, tarea.ordinal_vencimiento, self.orden[tarea.id])
+
+    # Se define el método indexar_orden_texto_y_estado para actualizar todos los índices de una tarea salvo el de fechas
+    def indexar_orden_texto_y_estado(self, tarea):
+        if tarea.id not in self.orden:
+            self.orden[tarea.id] = self.contador_orden
+            self.contador_orden += 1
+        self.versiones[tarea.id] = self.generacion
+        if self.indice_texto is not None:
+            self.indice_texto.agregar(tarea.id, self.textos_busqueda(tarea))
+        if self.indice_valores is not None:
+            self.indice_valores.agregar(tarea.id, valores_de(tarea))
+        self.contadores.agregar(tarea.id, tarea.estado, tarea.ordinal_completada)
+        if self.tabla is not None:
+            self.tabla.agregar(tarea)
+
+    # Se define el método textos_busqueda para obtener los textos de una tarea que se indexan para la búsqueda
+    def textos_busqueda(self, tarea):
+        return textos_de(tarea)
+
+    # Se define el método buscar_texto para buscar en el índice de texto, creándolo si todavía no existe
+    # Se llama con el candado en modo lectura: varias consultas pueden llegar a la vez, así que el índice se crea con un mutex
+    # (los cambios, que toman el candado en modo escritura, no pueden ocurrir mientras se crea)
+    # Si la consulta no tiene palabras devuelve None sin crear el índice
+    def buscar_texto(self, consulta, campos=None):
+        if not tokenizar(consulta):
+            return None
+        with self.mutex_indice_texto:
+            if self.indice_texto is None:
+                indice = IndiceInvertido(CAMPOS_TEXTO)
+                for tarea in self.tareas.values():
+                    indice.agregar(tarea.id, self.textos_busqueda(tarea))
+                self.indice_texto = indice
+        return self.indice_texto.buscar(consulta, campos)
+
+    # Se define el método obtener_indice_valores para obtener el índice de valores (estado, prioridad y categoría),
+    # creándolo si todavía no existe; como en buscar_texto, se crea con un mutex porque las consultas pueden llegar a la vez
+    def obtener_indice_valores(self):
+        with self.mutex_indice_valores:
+            if self.indice_valores is None:
+                indice = IndiceValores(CAMPOS_VALOR)
+                for tarea in self.tareas.values():
+                    indice.agregar(tarea.id, valores_de(tarea))
+                self.indice_valores = indice
+        return self.indice_valores
+
+    # Se define el método desindexar_tarea para quitar una tarea de los índices
+    def desindexar_tarea(self, tarea_id):
+        self.generacion += 1
+        self.orden.pop(tarea_id, None)
+        self.versiones.pop(tarea_id, None)
+        if self.indice_texto is not None:
+            self.indice_texto.quitar(tarea_id)
+        self.indice_fechas.quitar(tarea_id)
+        if self.indice_valores is not None:
+            self.indice_valores.quitar(tarea_id)
+        self.contadores.quitar(tarea_id)
+        if self.tabla is not None:
+            self.tabla.quitar(tarea_id)
 
-    # Se define el método agregar_tarea para agregar una tarea a la lista de tareas y guardar el archivo
+    # Se define el método indexar_tareas para agregar muchas tareas a los índices de una vez
+    # El índice de fechas se ordena una sola vez en vez de insertar cada tarea por separado
+    def indexar_tareas(self, tareas):
+        self.generacion += 1
+        for tarea in tareas:
+            self.indexar_orden_texto_y_estado(tarea)
+        self.indice_fechas.agregar_varios((t.id, t.ordinal_vencimiento, self.orden[t.id]) for t in tareas)
+
+    # Se define el método desindexar_tareas para quitar muchas tareas de los índices con una sola pasada por cada índice
+    def desindexar_tareas(self, tarea_ids):
+        self.generacion += 1
+        for tarea_id in tarea_ids:
+            self.orden.pop(tarea_id, None)
+            self.versiones.pop(tarea_id, None)
+            if self.indice_valores is not None:
+                self.indice_valores.quitar(tarea_id)
+            self.contadores.quitar(tarea_id)
+            if self.tabla is not None:
+                self.tabla.quitar(tarea_id)
+        if self.indice_texto is not None:
+            self.indice_texto.quitar_varios(tarea_ids)
+        self.indice_fechas.quitar_varios(tarea_ids)
+
+    # Se define el método reconstruir_indices para volver a crear los índices a partir de todas las tareas
+    def reconstruir_indices(self):
+        self.generacion += 1
+        self.orden = {}
+        self.contador_orden = 0
+        self.versiones = {}
+        self.indice_texto = None
+        self.indice_fechas = IndiceFechas()
+        self.indice_valores = None
+        self.contadores = ContadoresTareas()
+        self.tabla = TablaColumnar() if self.columnar else None
+        self.indexar_tareas(list(self.tareas.values()))
+
+    # Se define el método obtener_tarea para obtener una tarea según su id (None si no existe)
+    @con_lectura
+    def obtener_tarea(self, tarea_id):
+        return self.tareas.get(tarea_id)
+
+    # Se define el método agregar_tarea para agregar una tarea al diccionario de tareas y registrar el cambio
+    @con_escritura
     def agregar_tarea(self, tarea):
-        self.lista_tareas.append(tarea)
-        self.guardar_en_archivo()
-
-    # Se define el método eliminar_tarea para eliminar una tarea de la lista de tareas y guardar el archivo
-    def eliminar_tarea(self, indice):
-        if 0 <= indice < len(self.lista_tareas):
-            self.lista_tareas.pop(indice)
-            self.guardar_en_archivo()
-
-    # Se define el método marcar_pendiente para marcar una tarea como pendiente y guardar el archivo
-    def marcar_pendiente(self, indice):
-        if 0 <= indice < len(self.lista_tareas):
-            if (self.lista_tareas[indice].estado == "completada"):
-                self.lista_tareas[indice].fecha_completada = None
-            self.lista_tareas[indice].estado = "pendiente"
-            self.guardar_en_archivo()
-
-    # Se define el método marcar_progreso para marcar una tarea como en progreso y guardar el archivo
-    def marcar_progreso(self, indice):
-        if 0 <= indice < len(self.lista_tareas):
-            if (self.lista_tareas[indice].estado == "completada"):
-                self.lista_tareas[indice].fecha_completada = None
-            self.lista_tareas[indice].estado = "en progreso"
-            self.guardar_en_archivo()
-
-    # Se define el método marcar_completada para marcar una tarea como completada, establecer la fecha de completado y guardar el archivo
-    def marcar_completada(self, indice):
-        if 0 <= indice < len(self.lista_tareas):
-            self.lista_tareas[indice].estado = "completada"
-            self.lista_tareas[indice].fecha_completada = datetime.today().strftime("%d-%m-%Y")
-            self.guardar_en_archivo()
-
-    # Se define el método editar_tarea para editar una tarea y guardar el archivo
-    def editar_tarea(self, indice, nuevo_titulo, nueva_desc, nueva_fecha, nueva_prioridad, nueva_categoria):
-        tarea = self.lista_tareas[indice]
+        self.tareas[tarea.id] = tarea
+        self.registrar_tarea(tarea)
+
+    # Se define el método eliminar_tarea para eliminar una tarea según su id y registrar el cambio
+    # Devuelve True si la tarea existía
+    @con_escritura
+    def eliminar_tarea(self, tarea_id):
+        if self.tareas.pop(tarea_id, None) is None:
+            return False
+        self.desindexar_tarea(tarea_id)
+        self.anotar_cambio(tarea_id, None)
+        return True
+
+    # Se define el método registrar_tarea para actualizar los índices y anotar la tarea como cambio pendiente
+    def registrar_tarea(self, tarea):
+        self.indexar_tarea(tarea)
+        self.anotar_cambio(tarea.id, tarea)
+
+    # Se define el método anotar_cambio para dejar un cambio pendiente de guardar (tarea None significa eliminarla)
+    def anotar_cambio(self, tarea_id, tarea):
+        with self.condicion_guardado:
+            self.cambios_pendientes[tarea_id] = tarea
+            self.condicion_guardado.notify()
+        # Dentro de un lote se guarda una sola vez, al terminar
+        if not self.en_lote:
+            self.programar_guardado()
+
+    # Se define el método programar_guardado para guardar en el momento (modo síncrono o gestor cerrado) o despertar al
+    # hilo de guardado
+    def programar_guardado(self):
+        if self.sincrono or self.cerrado:
+            self.flush()
+        elif self.hilo_guardado is None:
+            self.hilo_guardado = threading.Thread(target=self.ciclo_guardado, name="guardado-tareas", daemon=True)
+            self.hilo_guardado.start()
+
+    # Se define el método aplicar_lote para aplicar muchas operaciones de una vez, con el candado tomado una sola vez
+    # Cada operación es un diccionario: {"op": "crear", "tarea": tarea}, {"op": "actualizar", "id": id, "cambios": {...}}
+    # (los mismos cambios que actualizar_tarea) o {"op": "eliminar", "id": id}
+    # Primero se verifica que todas se puedan aplicar; si alguna no, se lanza ValueError con su número y no se aplica ninguna
+    # Los cambios se guardan juntos (en el diario, como un solo lote) y los índices se actualizan una vez para todas
+    # las tareas del lote. Devuelve la lista de ids afectados, en el orden de las operaciones
+    @con_escritura
+    def aplicar_lote(self, operaciones):
+        # Se verifica cada operación teniendo en cuenta las anteriores del mismo lote
+        creadas = set()
+        eliminadas = set()
+        for numero, operacion in enumerate(operaciones):
+            op = operacion.get("op")
+            if op == "crear":
+                tarea = operacion.get("tarea")
+                if not isinstance(tarea, Tarea) or tarea.id in self.tareas or tarea.id in creadas:
+                    raise ValueError(f"Operación {numero}: tarea inválida o repetida")
+                creadas.add(tarea.id)
+            elif op in ("actualizar", "eliminar"):
+                tarea_id = operacion.get("id")
+                if (tarea_id not in self.tareas and tarea_id not in creadas) or tarea_id in eliminadas:
+                    raise ValueError(f"Operación {numero}: no se encontró la tarea {tarea_id}")
+                if op == "eliminar":
+                    eliminadas.add(tarea_id)
+            else:
+                raise ValueError(f"Operación {numero}: operación desconocida {op!r}")
+
+        # Se aplican las operaciones; todas las tareas creadas o actualizadas se indexan al final, juntas, y las eliminadas
+        # se desindexan al final. Así ninguna tarea creada se indexa antes que otra creada antes que ella en el lote
+        # (el orden de inserción decide los empates al ordenar)
+        tocadas = {}
+        quitadas = []
+        afectadas = []
+        self.en_lote = True
+        try:
+            for operacion in operaciones:
+                op = operacion["op"]
+                tarea_id = operacion["tarea"].id if op == "crear" else operacion["id"]
+                if op == "crear":
+                    tarea = operacion["tarea"]
+                    self.tareas[tarea_id] = tarea
+                    tocadas[tarea_id] = tarea
+                elif op == "actualizar":
+                    tarea = self.tareas[tarea_id]
+                    aplicar_cambios(tarea, operacion.get("cambios", {}))
+                    tocadas.setdefault(tarea_id, tarea)
+                else:
+                    tarea = None
+                    del self.tareas[tarea_id]
+                    quitadas.append(tarea_id)
+                self.anotar_cambio(tarea_id, tarea)
+                afectadas.append(tarea_id)
+            self.indexar_tareas([t for t in tocadas.values() if t.id in self.tareas])
+            self.desindexar_tareas(quitadas)
+        finally:
+            self.en_lote = False
+        self.programar_guardado()
+        return afectadas
+
+    # Se define el método ciclo_guardado que ejecuta el hilo en segundo plano
+    # Espera el primer cambio pendiente y luego hasta max_latencia segundos (o hasta juntar max_lote tareas) antes de guardar
+    # Si un guardado falla, se informa el error y se vuelve a intentar después de ESPERA_REINTENTO segundos (los cambios
+    # siguen pendientes); el ciclo termina al cerrar el gestor
+    def ciclo_guardado(self):
+        while True:
+            with self.condicion_guardado:
+                while not self.cambios_pendientes and not self.compactacion_pendiente and not self.cerrado:
+                    self.condicion_guardado.wait()
+                if self.cerrado:
+                    return
+                limite = time.monotonic() + self.max_latencia
+                while len(self.cambios_pendientes) < self.max_lote and not self.compactacion_pendiente and not self.cerrado:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self.condicion_guardado.wait(restante)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error al guardar los cambios pendientes: {e}")
+                with self.condicion_guardado:
+                    self.condicion_guardado.wait_for(lambda: self.cerrado, ESPERA_REINTENTO)
+
+    # Se define el método cerrar para guardar los cambios pendientes y detener el hilo de guardado
+    # Después de cerrar ya no hace falta guardar al terminar el programa, así que se quita ese registro
+    def cerrar(self):
+        with self.condicion_guardado:
+            self.cerrado = True
+            self.condicion_guardado.notify_all()
+        if self.hilo_guardado is not None:
+            self.hilo_guardado.join()
+            self.hilo_guardado = None
+        self.flush()
+        if self.al_salir is not None:
+            atexit.unregister(self.al_salir)
+            self.al_salir = None
+
+    # Se define el método flush para guardar de inmediato los cambios pendientes y compactar si corresponde
+    # Si otro proceso guardó cambios desde la última lectura, primero se incorporan y luego se vuelve a intentar
+    # Con compactar=True se reemplaza todo el contenido guardado por las tareas en memoria
+    def flush(self, compactar=False):
+        while not self.intentar_flush(compactar):
+            # Si no se pudieron leer los cambios del otro proceso, se guarda todo el contenido en memoria
+            if not self.sincronizar():
+                compactar = True
+
+    # Se define el método intentar_flush que guarda los cambios pendientes; devuelve False si hay cambios de otro proceso
+    # Toma el candado en modo lectura: los cambios esperan a que termine, pero las consultas siguen respondiendo
+    @con_lectura
+    def intentar_flush(self, compactar):
+        with self.mutex_guardado, self.almacenamiento.bloquear():
+            if not compactar and self.almacenamiento.hay_cambios_externos():
+                return False
+
+            # Se decide si hay que compactar antes de tomar los cambios, para no perderlos si la consulta falla
+            compactar = compactar or self.almacenamiento.necesita_compactar()
+            with self.condicion_guardado:
+                cambios = self.cambios_pendientes
+                self.cambios_pendientes = {}
+                compactar = compactar or self.compactacion_pendiente
+                self.compactacion_pendiente = False
+
+            if cambios and not compactar:
+                try:
+                    with metricas.medir("todolist_guardado_segundos", tipo="diario"):
+                        self.almacenamiento.guardar_cambios(cambios)
+                    metricas.sumar("todolist_guardado_cambios_total", len(cambios))
+                except Exception as e:
+                    # Si los cambios no se pudieron guardar, se intenta guardar todo el contenido
+                    print(f"Error al registrar cambio: {e}")
+                    compactar = True
+
+            if compactar or self.almacenamiento.necesita_compactar():
+                try:
+                    with metricas.medir("todolist_guardado_segundos", tipo="instantanea"):
+                        self.almacenamiento.guardar_todo(list(self.tareas.values()))
+                    metricas.sumar("todolist_guardado_cambios_total", len(cambios))
+                    metricas.sumar("todolist_guardado_bytes_total", tamano_archivo(self.almacenamiento.archivo),
+                                   tipo="instantanea")
+                except Exception as e:
+                    print(f"Error al guardar: {e}")
+                    # Se vuelve a intentar en el próximo guardado
+                    with self.condicion_guardado:
+                        self.compactacion_pendiente = True
+        return True
+
+    # Se define el método refrescar para incorporar los cambios guardados por otro proceso (otro worker o la terminal)
+    # Solo compara el estado de los archivos (o la versión de la base de datos), así que se puede llamar en cada solicitud
+    def refrescar(self):
+        if self.almacenamiento.hay_cambios_externos():
+            self.sincronizar()
+
+    # Se define el método sincronizar para leer los cambios de otro proceso y aplicarlos a las tareas y los índices
+    # Los cambios pendientes de este proceso se guardarán después que los del otro, así que prevalecen sobre ellos
+    # Devuelve False si no se pudieron leer los cambios
+    @con_escritura
+    def sincronizar(self):
+        with self.mutex_guardado, self.almacenamiento.bloquear():
+            try:
+                completo, datos = self.almacenamiento.leer_cambios_externos()
+            except Exception as e:
+                print(f"Error al cargar: {e}")
+                return False
+            with self.condicion_guardado:
+                pendientes = dict(self.cambios_pendientes)
+
+            if completo:
+                tareas = {t.id: t for t in datos}
+                for tarea_id, tarea in pendientes.items():
+                    if tarea is None:
+                        tareas.pop(tarea_id, None)
+                    else:
+                        tareas[tarea_id] = tarea
+                self.tareas = tareas
+                self.reconstruir_indices()
+                return True
+
+            for registro in datos:
+                op = registro.get("op")
+                if op in ("guardar", "agregar"):
+                    tarea = Tarea.from_dict(registro["tarea"])
+                    if tarea.id not in pendientes:
+                        self.tareas[tarea.id] = tarea
+                        self.indexar_tarea(tarea)
+                elif op == "eliminar" and registro.get("id") not in pendientes:
+                    if self.tareas.pop(registro.get("id"), None) is not None:
+                        self.desindexar_tarea(registro["id"])
+        return True
+
+    # Se define el método marcar_pendiente para marcar una tarea como pendiente y registrar el cambio
+    @con_escritura
+    def marcar_pendiente(self, tarea_id):
+        tarea = self.tareas.get(tarea_id)
+        if tarea is not None:
+            if (tarea.estado == "completada"):
+                tarea.fecha_completada = None
+            tarea.estado = "pendiente"
+            self.registrar_tarea(tarea)
+
+    # Se define el método marcar_progreso para marcar una tarea como en progreso y registrar el cambio
+    @con_escritura
+    def marcar_progreso(self, tarea_id):
+        tarea = self.tareas.get(tarea_id)
+        if tarea is not None:
+            if (tarea.estado == "completada"):
+                tarea.fecha_completada = None
+            tarea.estado = "en progreso"
+            self.registrar_tarea(tarea)
+
+    # Se define el método marcar_completada para marcar una tarea como completada, establecer la fecha de completado y registrar el cambio
+    @con_escritura
+    def marcar_completada(self, tarea_id):
+        tarea = self.tareas.get(tarea_id)
+        if tarea is not None:
+            tarea.estado = "completada"
+            tarea.fecha_completada = datetime.today().strftime("%d-%m-%Y")
+            self.registrar_tarea(tarea)
+
+    # Se define el método editar_tarea para editar una tarea y registrar el cambio
+    @con_escritura
+    def editar_tarea(self, tarea_id, nuevo_titulo, nueva_desc, nueva_fecha, nueva_prioridad, nueva_categoria):
+        tarea = self.tareas.get(tarea_id)
+        if tarea is None:
+            return
 
         # Se verifica si los nuevos valores no están vacíos y se actualizan los atributos de la tarea
         if nuevo_titulo and nuevo_titulo.strip():
@@ -67,160 +519,259 @@ class GestorTareasWeb:
         # Se verifica si la nueva categoría no está vacía y se actualiza el atributo de la tarea
         if nueva_categoria is not None:
             tarea.categoria = nueva_categoria.strip()
-        self.guardar_en_archivo()
+        self.registrar_tarea(tarea)
 
-    # Se define el método buscar_tareas para buscar las tareas según una palabra clave en título o descripción
-    def buscar_tareas(self, palabra_clave):
-        palabra = palabra_clave.lower()
-        resultados = []
+    # Se define el método actualizar_tarea para cambiar varios campos de una tarea de una vez (lo usa la API)
+    # cambios es un diccionario con los campos a cambiar (ya validados); el estado se cambia igual que con los métodos marcar_*
+    # Devuelve la tarea actualizada, o None si no existe
+    @con_escritura
+    def actualizar_tarea(self, tarea_id, cambios):
+        tarea = self.tareas.get(tarea_id)
+        if tarea is None:
+            return None
+        aplicar_cambios(tarea, cambios)
+        self.registrar_tarea(tarea)
+        return tarea
 
-        # Se recorre la lista de tareas y se busca la tarea con el título o descripción especificado
-        for t in self.lista_tareas:
-            en_titulo = palabra in t.titulo.lower()
-            en_descripcion = palabra in t.descripcion.lower()
-            en_estado = palabra in t.estado.lower()
-            en_fecha = t.fecha_vencimiento and palabra in t.fecha_vencimiento.lower()
-            en_subtareas = any(palabra in subt["nombre"].lower() for subt in t.subtareas)
-
-            # Si la tarea cumple con los filtros, se agrega a la lista de tareas filtradas
-            if en_titulo or en_descripcion or en_estado or en_fecha or en_subtareas:
-                resultados.append(t)
-
-        return resultados
+    # Se define el método buscar_tareas para buscar las tareas según una palabra clave en título, descripción, estado, fecha o subtareas
+    # Se usa el índice invertido, por lo que solo se revisan las tareas que contienen las palabras buscadas
+    def buscar_tareas(self, palabra_clave):
+        return self.consultar(Consulta(crear_filtro(texto=palabra_clave)), "busqueda")
 
     # Se define el método obtener_tareas_filtradas para obtener las tareas filtradas según los filtros de estado, fecha máxima y orden
-    def obtener_tareas_filtradas(self, filtro_estado=None, fecha_maxima=None, ordenar_por=None):
-        tareas_filtradas = self.lista_tareas.copy()
+    # Si la fecha máxima no es válida, se ignora el filtro
+    # Se devuelve una Pagina con las tareas desde desplazamiento hasta limite (sin limite, todas)
+    def obtener_tareas_filtradas(self, filtro_estado=None, fecha_maxima=None, ordenar_por=None, desplazamiento=0,
+                                 limite=None):
+        filtro = crear_filtro(estado=filtro_estado, fecha_maxima=fecha_a_ordinal(fecha_maxima))
+        return self.consultar(Consulta(filtro, ordenar_por, desplazamiento, limite), "filtradas")
 
-        # Filtrar por estado
-        if filtro_estado:
-            tareas_filtradas = [t for t in tareas_filtradas if t.estado.lower() == filtro_estado.lower()]
+    # Se define el método consultar para ejecutar una Consulta (core/consulta.py) con los índices del gestor
+    # El planificador elige la tabla columnar, el índice más selectivo o el recorrido de las tareas; el nombre de la
+    # consulta se usa en las métricas
+    @con_lectura
+    def consultar(self, consulta, nombre="consulta"):
+        planificador = Planificador(self.tareas, self.orden, self.obtener_indice_valores, self.indice_fechas,
+                                    self.buscar_texto, self.tabla)
+        pagina = planificador.ejecutar(consulta)
+        return self.anotar_consulta(nombre, planificador.examinadas, pagina)
 
-        # Filtrar por fecha
-        if fecha_maxima:
-            try:
-                # Se intenta convertir la fecha máxima a un objeto datetime
-                fecha_max_dt = datetime.strptime(fecha_maxima, "%d-%m-%Y")
-                tareas_filtradas = [t for t in tareas_filtradas if t.fecha_vencimiento and datetime.strptime(t.fecha_vencimiento, "%d-%m-%Y") <= fecha_max_dt]
-            except ValueError:
-                pass
-
-        # Ordenar las tareas filtradas según el criterio especificado
-        if ordenar_por == "fecha":
-            tareas_filtradas.sort(key=lambda t: datetime.strptime(t.fecha_vencimiento, "%d-%m-%Y") if t.fecha_vencimiento else datetime.max)
-        elif ordenar_por == "estado":
-            tareas_filtradas.sort(key=lambda t: t.estado)
-        elif ordenar_por == "prioridad":
-            tareas_filtradas.sort(key=lambda t: {"alta": 1, "media": 2, "baja": 3}.get(t.prioridad, 2))
-
-        return tareas_filtradas
+    # Se define el método anotar_consulta para registrar en las métricas cuántas tareas examinó una consulta y cuántas
+    # devolvió; devuelve el resultado de la consulta
+    def anotar_consulta(self, consulta, examinadas, resultado):
+        metricas.sumar("todolist_consultas_total", consulta=consulta)
+        metricas.sumar("todolist_consulta_examinadas_total", examinadas, consulta=consulta)
+        metricas.sumar("todolist_consulta_devueltas_total", len(resultado), consulta=consulta)
+        return resultado
 
     # Se define el método obtener_proximas_tareas para obtener las próximas tareas que vencen en un plazo determinado de días
     def obtener_proximas_tareas(self, dias=3):
         # Se obtiene la fecha actual y se calcula la fecha límite sumando los días especificados
-        hoy = datetime.today()
-        limite = hoy + timedelta(days=dias)
-        proximas = []
-        # Se recorre la lista de tareas y se verifica si la fecha de vencimiento está dentro del rango límite
-        for t in self.lista_tareas:
-            if t.fecha_vencimiento:
-                try:
-                    # Se intenta convertir la fecha de vencimiento de la tarea a un objeto datetime
-                    fecha_tarea = datetime.strptime(t.fecha_vencimiento, "%d-%m-%Y")
-                    # Se verifica si la fecha de vencimiento es dentro del rango límite
-                    if hoy <= fecha_tarea <= limite:
-                        proximas.append(t)
-                except ValueError:
-                    pass
-        return proximas
-
-    # Se define el método para guardar las tareas en un archivo JSON
-    def guardar_en_archivo(self, archivo="data/tareas.json"):
+        # Vencen "próximamente" las tareas con fecha posterior a hoy y hasta la fecha límite, ordenadas por fecha
+        hoy = date.today().toordinal()
+        limite = hoy + dias
+        return self.consultar(Consulta(RangoFechas(hoy + 1, limite), "fecha"), "proximas")
+
+    # Se define el método para guardar todas las tareas
+    # Sin archivo, se reemplaza el contenido del almacenamiento (en JSON, compacta el diario en una nueva instantánea);
+    # con un archivo, se exporta una copia en esa ruta (JSON, NDJSON o CSV según la extensión, o el formato indicado)
+    def guardar_en_archivo(self, archivo=None, formato=None, subtareas="anidadas"):
+        if archivo is None:
+            # Se guardan todas las tareas, lo que incluye los cambios pendientes
+            self.flush(compactar=True)
+            return
         try:
-            # Se abre el archivo en modo escritura y se guarda la lista de tareas en formato JSON
-            with open(archivo, "w", encoding="utf-8") as f:
-                # Se convierte cada tarea a un diccionario y se guarda en el archivo
-                json.dump([t.to_dict() for t in self.lista_tareas], f, indent=4)
+            # Se escribe el archivo de forma atómica, por partes
+            partes = self.exportar_tareas(formato or formato_de_archivo(archivo), subtareas)
+            with metricas.medir("todolist_guardado_segundos", tipo="exportacion"):
+                escribir_atomico_partes(archivo, (parte.encode("utf-8") for parte in partes))
+            metricas.sumar("todolist_guardado_bytes_total", tamano_archivo(archivo), tipo="exportacion")
         except Exception as e:
             print(f"Error al guardar: {e}")
 
-    # Se define el método para cargar las tareas desde un archivo JSON
-    def cargar_desde_archivo(self, archivo="data/tareas.json"):
+    # Se define el método exportar_tareas para obtener las tareas en el formato indicado, en trozos de texto
+    # Solo se copia la lista de tareas con el candado tomado; cada tarea se convierte a texto a medida que se pide,
+    # así que una descarga lenta no bloquea los cambios
+    def exportar_tareas(self, formato="json", subtareas="anidadas"):
+        return exportar(self.lista_tareas, formato, subtareas)
+
+    # Se define el método importar_tareas para agregar las tareas leídas de un iterable (por ejemplo, leer_tareas)
+    # Las tareas con un id que ya existe se reemplazan; con reemplazar=True se eliminan las que no vienen en la importación
+    # Las tareas se incorporan en lotes de TAMANO_LOTE_IMPORTACION a medida que se leen, sin tenerlas todas en memoria
+    # (solo sus ids). Si el archivo tiene un error, quedan incorporados los lotes anteriores y no se elimina ninguna tarea
+    # Devuelve la cantidad de tareas importadas
+    def importar_tareas(self, tareas, reemplazar=False):
+        importadas = set()
+        lote = {}
         try:
-            # Se intenta abrir el archivo en modo lectura y cargar las tareas desde el archivo JSON
-            with open(archivo, "r", encoding="utf-8") as f:
-                tareas_cargadas = json.load(f)
-                # Se crea una lista de tareas a partir de los diccionarios cargados
-                self.lista_tareas = [Tarea.from_dict(t) for t in tareas_cargadas]
+            for tarea in tareas:
+                lote[tarea.id] = tarea
+                importadas.add(tarea.id)
+                if len(lote) >= TAMANO_LOTE_IMPORTACION:
+                    self.incorporar_tareas(lote)
+                    lote = {}
+            self.incorporar_tareas(lote, importadas if reemplazar else None)
+        finally:
+            # Lo incorporado se guarda al final, todo junto: si son muchas tareas, escribiendo todo el contenido de una vez
+            with self.condicion_guardado:
+                if len(importadas) > self.max_lote:
+                    self.compactacion_pendiente = True
+                self.condicion_guardado.notify()
+            self.programar_guardado()
+        return len(importadas)
+
+    # Se define el método incorporar_tareas para aplicar un lote de una importación a las tareas y los índices, y dejar
+    # sus cambios pendientes de guardar; con conservar (un conjunto de ids), además se eliminan las tareas que no están en él
+    @con_escritura
+    def incorporar_tareas(self, nuevas, conservar=None):
+        cambios = dict(nuevas)
+        self.tareas.update(nuevas)
+        self.indexar_tareas(list(nuevas.values()))
+        if conservar is not None:
+            quitadas = [tarea_id for tarea_id in self.tareas if tarea_id not in conservar]
+            for tarea_id in quitadas:
+                del self.tareas[tarea_id]
+                cambios[tarea_id] = None
+            self.desindexar_tareas(quitadas)
+        with self.condicion_guardado:
+            self.cambios_pendientes.update(cambios)
+
+    # Se define el método para cargar las tareas
+    # Sin archivo, se cargan desde el almacenamiento; con un archivo, se leen las tareas de ese archivo
+    # (JSON, NDJSON o CSV según la extensión), una a una
+    @con_escritura
+    def cargar_desde_archivo(self, archivo=None):
+        # Antes de reemplazar las tareas se guardan los cambios pendientes
+        if self.cambios_pendientes:
+            self.flush()
+        try:
+            if archivo is None:
+                with self.almacenamiento.bloquear():
+                    with metricas.medir("todolist_carga_segundos", origen="almacenamiento"):
+                        self.lista_tareas = self.almacenamiento.cargar()
+                    metricas.sumar("todolist_carga_bytes_total", tamano_archivo(self.almacenamiento.archivo),
+                                   origen="almacenamiento")
+                    # Si el almacenamiento lo pide (por ejemplo, después de reproducir el diario), se compacta
+                    # antes de soltar el candado, para no pisar cambios de otro proceso
+                    if self.almacenamiento.necesita_compactar():
+                        self.guardar_en_archivo()
+            else:
+                # Se crea el diccionario de tareas a medida que se leen del archivo
+                with metricas.medir("todolist_carga_segundos", origen="archivo"):
+                    self.lista_tareas = leer_tareas(archivo)
+                metricas.sumar("todolist_carga_bytes_total", tamano_archivo(archivo), origen="archivo")
         except FileNotFoundError:
             print("No se encontró archivo, empezando con lista vacía.")
         except Exception as e:
             print(f"Error al cargar: {e}")
 
-    # Se define el método agregar_subtarea para agregar una subtarea a una tarea existente y guardar el archivo
-    def agregar_subtarea(self, indice, texto):
-        # Se verifica si el índice es válido y se agrega la subtarea al diccionario de la tarea
-        if 0 <= indice < len(self.lista_tareas):
-         subtarea = { "nombre": texto, "completada": False }
-         self.lista_tareas[indice].subtareas.append(subtarea)
-         self.guardar_en_archivo()
+    # Se define el método agregar_subtarea para agregar una subtarea a una tarea existente y registrar el cambio
+    @con_escritura
+    def agregar_subtarea(self, tarea_id, texto):
+        # Se verifica si la tarea existe y se agrega la subtarea a la lista de subtareas de la tarea
+        tarea = self.tareas.get(tarea_id)
+        if tarea is not None:
+         tarea.subtareas.append(Subtarea(texto))
+         self.registrar_tarea(tarea)
          
-    # Se define el método buscar_tareas_avanzada para buscar las tareas avanzadas según un texto, un estado o una prioridad
-    def buscar_tareas_avanzada(self, texto="", estado="", prioridad=""):
-        # Se convertir los parámetros a minúsculas
-        texto = texto.lower()
-        estado = estado.lower()
-        prioridad = prioridad.lower()
-
-        resultados = []
-
-        # Se recorre la lista de tareas y se busca la tarea con el título o descripción especificado
-        for t in self.lista_tareas:
-            match_texto = texto in t.titulo.lower() or texto in t.descripcion.lower()
-            match_estado = (estado == "" or t.estado.lower() == estado)
-            match_prioridad = (prioridad == "" or t.prioridad.lower() == prioridad)
-
-            # Si la tarea cumple con los filtros, se agrega a la lista de tareas filtradas
-            if match_texto and match_estado and match_prioridad:
-                resultados.append(t)
-
-        return resultados
-    
+    # Se define el método alternar_subtarea para marcar o desmarcar una subtarea y actualizar el estado de la tarea
+    # Si todas las subtareas están completadas la tarea queda completada, si hay alguna queda en progreso y si no, pendiente
+    # Devuelve el nuevo estado de la tarea, o None si la tarea o la subtarea no existen
+    @con_escritura
+    def alternar_subtarea(self, tarea_id, subtarea_idx):
+        t = self.tareas.get(tarea_id)
+        if t is None or not 0 <= subtarea_idx < len(t.subtareas):
+            return None
+        subt = t.subtareas[subtarea_idx]
+        subt.completada = not subt.completada
+
+        if all(s.completada for s in t.subtareas):
+            self.marcar_completada(tarea_id)
+        elif any(s.completada for s in t.subtareas):
+            self.marcar_progreso(tarea_id)
+        else:
+            self.marcar_pendiente(tarea_id)
+        return t.estado
+
+    # Se define el método buscar_tareas_avanzada para buscar las tareas avanzadas según un texto, un estado, una prioridad,
+    # una categoría y un rango de fechas de vencimiento (dd-mm-aaaa; las fechas inválidas se ignoran)
+    # El texto se busca en título y descripción; los valores vacíos no filtran
+    # Se devuelve una Pagina con los resultados desde desplazamiento hasta limite (sin limite, todos)
+    def buscar_tareas_avanzada(self, texto="", estado="", prioridad="", desplazamiento=0, limite=None, categoria="",
+                               fecha_minima=None, fecha_maxima=None):
+        filtro = crear_filtro(texto, estado, prioridad, categoria, fecha_a_ordinal(fecha_minima),
+                              fecha_a_ordinal(fecha_maxima), campos_texto=("titulo", "descripcion"))
+        return self.consultar(Consulta(filtro, desplazamiento=desplazamiento, limite=limite), "busqueda")
+
     # Se define el método obtener_tareas_por_estado para obtener las tareas agrupadas por estado
+    @con_lectura
     def obtener_tareas_por_estado(self):
+        if self.tabla is not None:
+            # Se agrupan las filas por estado en la tabla columnar (cualquier otro estado cuenta como pendiente)
+            grupos = self.tabla.filas_por_estado()
+            completadas = grupos.pop("completada", [])
+            en_progreso = grupos.pop("en progreso", [])
+            pendientes = sorted(fila for filas in grupos.values() for fila in filas)
+            return tuple([self.tareas[i] for i in self.tabla.ids_de(filas)]
+                         for filas in (completadas, en_progreso, pendientes))
+
         # Se crean listas para almacenar las tareas por estado
         tareas_completadas = []
         tareas_en_progreso = []
         tareas_pendientes = []
 
         # Se recorre la lista de tareas y se agregan las tareas por estado
-        for t in self.lista_tareas:
+        for t in self.tareas.values():
             if t.estado == "completada":
-                tareas_completadas.append(tareas_completadas)
+                tareas_completadas.append(t)
             elif t.estado == "en progreso":
-                tareas_en_progreso.append(tareas_en_progreso)
+                tareas_en_progreso.append(t)
             else:
-                tareas_pendientes.append(tareas_pendientes)
+                tareas_pendientes.append(t)
         
         return tareas_completadas, tareas_en_progreso, tareas_pendientes
     
     # Se define el método obtener_ultimas_tareas_completadas para obtener las últimas tareas completadas en un plazo determinado de días
+    @con_lectura
     def obtener_ultimas_tareas_completadas(self, dias=7):
-        # Se obtiene la fecha actual y se calcula la fecha límite sumando los días especificados
-        hoy = datetime.today()
-        limite = hoy - timedelta(days=dias)
+        # Se obtiene la fecha actual y se calcula la fecha límite restando los días especificados
+        hoy = date.today().toordinal()
+        limite = hoy - dias
+        if self.tabla is not None:
+            # Se buscan las filas con la fecha de completado en el rango, sobre la columna de fechas de completado
+            if dias == 0 or dias == 1:
+                filas = self.tabla.completadas_entre(limite, limite)
+            elif dias > 1:
+                filas = self.tabla.completadas_entre(limite + 1, hoy)
+            else:
+                filas = []
+            return [self.tareas[i] for i in self.tabla.ids_de(filas)]
         ultimas = []
-        # Se recorre la lista de tareas y se verifica si la fecha de vencimiento está dentro del rango límite
-        for t in self.lista_tareas:
-            if t.fecha_completada:
-                try:
-                    # Se intenta convertir la fecha de vencimiento de la tarea a un objeto datetime
-                    fecha_tarea = datetime.strptime(t.fecha_completada, "%d-%m-%Y")
-                    # Se verifica si la fecha de vencimiento es dentro del rango límite
-                    if (dias == 0 or dias == 1) and fecha_tarea.strftime("%d-%m-%Y").__eq__(limite.strftime("%d-%m-%Y")):
-                        ultimas.append(t)
-                    elif dias > 1 and limite <= fecha_tarea <= hoy:
-                        ultimas.append(t)
-                except ValueError:
-                    pass
-        return ultimas
\ No newline at end of file
+        # Se recorre la lista de tareas y se verifica si la fecha de completado está dentro del rango límite
+        # Con 0 o 1 días se cuenta solo ese día (hoy o ayer); con más días, los últimos días hasta hoy
+        for t in self.tareas.values():
+            completada = t.ordinal_completada
+            if completada is None:
+                continue
+            if (dias == 0 or dias == 1) and completada == limite:
+                ultimas.append(t)
+            elif dias > 1 and limite < completada <= hoy:
+                ultimas.append(t)
+        return ultimas
+
+    # Se define el método obtener_cantidades_por_estado para obtener la cantidad de tareas completadas, en progreso y pendientes
+    # Se leen los contadores, sin recorrer las tareas
+    @con_lectura
+    def obtener_cantidades_por_estado(self):
+        return self.contadores.cantidades_por_estado()
+
+    # Se define el método contar_ultimas_tareas_completadas para contar las tareas completadas en un plazo determinado de días
+    # Usa el histograma de completadas por día, con el mismo criterio que obtener_ultimas_tareas_completadas
+    @con_lectura
+    def contar_ultimas_tareas_completadas(self, dias=7):
+        hoy = date.today().toordinal()
+        if dias == 0 or dias == 1:
+            return self.contadores.completadas_entre(hoy - dias, hoy - dias)
+        if dias > 1:
+            return self.contadores.completadas_entre(hoy - dias + 1, hoy)
+        return 0
@@ -0,0 +1,27 @@
+// Carga el detalle de una tarea (subtareas y acciones) la primera vez que se abre su acordeón,
+// para que la página solo incluya las cabeceras de las tareas
+document.addEventListener("show.bs.collapse", event => {
+  const cuerpo = event.target.querySelector(".accordion-body[data-url]");
+  // Si el detalle ya se cargó (o se está cargando), no se vuelve a pedir
+  if (!cuerpo || cuerpo.dataset.cargado) {
+    return;
+  }
+  cuerpo.dataset.cargado = "1";
+
+  fetch(cuerpo.dataset.url)
+  .then(response => {
+    if (!response.ok) {
+      throw new Error(response.status);
+    }
+    return response.text();
+  })
+  .then(html => {
+    cuerpo.innerHTML = html;
+  })
+  .catch(error => {
+    // Si falla, se permite volver a intentar al abrir el acordeón de nuevo
+    delete cuerpo.dataset.cargado;
+    cuerpo.innerHTML = '<p class="text-danger">No se pudo cargar el detalle de la tarea.</p>';
+    console.error("Error cargando detalle:", error);
+  });
+});
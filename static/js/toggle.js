@@ -8,12 +8,14 @@ function toggleSubtarea(checkbox) {
   .then(response => response.json())
   .then(data => {
   
-  // Obtiene el nuevo estado y el índice de la tarea
+  // Obtiene el nuevo estado y el id de la tarea
 	const nuevo_estado = data.nuevo_estado;
-	const indice = data.indice;
+	const id = data.id;
 
-  // Se actualiza el texto del estado de la subtarea en la interfaz
-	document.querySelectorAll(".estado-tarea").item(indice).textContent = nuevo_estado.charAt(0).toUpperCase() + nuevo_estado.slice(1);
+  // Se actualiza el texto del estado de la tarea en la interfaz
+	document.querySelectorAll(`.estado-tarea[data-tarea-id="${id}"]`).forEach(badge => {
+	  badge.textContent = nuevo_estado.charAt(0).toUpperCase() + nuevo_estado.slice(1);
+	});
   })
   .catch(error => {
     console.error("Error toggling subtarea:", error);
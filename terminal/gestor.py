@@ -1,20 +1,84 @@
 # gestor.py
 
-# Se importa la clase Tarea para crear y manipular tareas, así como la clase datetime y timedelta para manejar fechas y horas
-import json
-from core.tarea import Tarea
-from datetime import datetime, timedelta
+# Se importa la función que crea el almacenamiento (el mismo que usa la aplicación web), la clase Subtarea, así como la clase date para manejar fechas
+from core.almacenamiento import crear_almacenamiento
+from core.consulta import Consulta, Contiene, Igual, O, Planificador, RangoFechas, todas
+from core.tarea import Subtarea
+from core.validacion import fecha_a_ordinal
+from datetime import date
+
 
 # Se define la clase GestorTareas para gestionar las tareas y sus operaciones
 class GestorTareas:
     # Se define el constructor de la clase GestorTareas para inicializar la lista de tareas vacía
-    def __init__(self):
+    # junto con el índice de títulos (título en minúsculas -> tareas con ese título, en orden de inserción)
+    # Las tareas se guardan con el mismo almacenamiento que la aplicación web (instantánea JSON + diario), de modo que
+    # ambas pueden usarse a la vez: cada cambio se anexa al diario con el candado entre procesos tomado
+    # Con un archivo .db se usa la base de datos SQLite, con un .bin la instantánea binaria (core/binario.py) y con un
+    # manifiesto.json, las particiones por categoría; sin archivo, el almacenamiento elegido con TODOLIST_ALMACENAMIENTO
+    def __init__(self, archivo=None):
         self.lista_tareas = []
+        self.indice_titulos = {}
+        self.almacenamiento = crear_almacenamiento(archivo)
 
-    # Se define el método agregar_tarea para agregar una tarea a la lista de tareas y guardar el archivo
+    # Se define el método agregar_tarea para agregar una tarea a la lista de tareas y guardar el cambio
     def agregar_tarea(self, tarea):
         self.lista_tareas.append(tarea)
-        self.guardar_en_archivo()
+        self.indexar_titulo(tarea)
+        self.guardar_cambio(tarea.id, tarea)
+
+    # Se define el método guardar_cambio para guardar una tarea (o su eliminación, si tarea es None) en el almacenamiento
+    def guardar_cambio(self, tarea_id, tarea):
+        try:
+            with self.almacenamiento.bloquear():
+                if not self.almacenamiento.necesita_compactar():
+                    self.almacenamiento.guardar_cambios({tarea_id: tarea})
+                if self.almacenamiento.necesita_compactar():
+                    self.compactar()
+        except Exception as e:
+            print(f"Error al guardar: {e}")
+
+    # Se define el método compactar para escribir una nueva instantánea (con el candado tomado)
+    # Primero se incorporan los cambios de otros procesos, para no pisarlos
+    def compactar(self):
+        if self.almacenamiento.hay_cambios_externos():
+            self.cargar_tareas()
+        self.almacenamiento.guardar_todo(self.lista_tareas)
+
+    # Se define el método refrescar para volver a cargar las tareas si otro proceso (por ejemplo, la aplicación web) las cambió
+    def refrescar(self):
+        if self.almacenamiento.hay_cambios_externos():
+            self.cargar_desde_archivo(self.almacenamiento.archivo)
+
+    # Se define el método cargar_tareas para leer las tareas del almacenamiento y reconstruir el índice de títulos
+    def cargar_tareas(self):
+        self.lista_tareas = self.almacenamiento.cargar()
+        self.reconstruir_indice_titulos()
+
+    # Se define el método indexar_titulo para agregar una tarea al índice de títulos
+    def indexar_titulo(self, tarea):
+        self.indice_titulos.setdefault(tarea.titulo.casefold(), []).append(tarea)
+
+    # Se define el método desindexar_titulo para quitar una tarea del índice de títulos
+    def desindexar_titulo(self, tarea):
+        clave = tarea.titulo.casefold()
+        tareas = self.indice_titulos.get(clave, [])
+        if tarea in tareas:
+            tareas.remove(tarea)
+        if not tareas:
+            self.indice_titulos.pop(clave, None)
+
+    # Se define el método reconstruir_indice_titulos para volver a crear el índice a partir de la lista de tareas
+    def reconstruir_indice_titulos(self):
+        self.indice_titulos = {}
+        for tarea in self.lista_tareas:
+            self.indexar_titulo(tarea)
+
+    # Se define el método buscar_por_titulo para obtener la tarea con el título indicado sin distinguir mayúsculas
+    # Si hay títulos repetidos se devuelve la primera tarea agregada con ese título, igual que la búsqueda lineal
+    def buscar_por_titulo(self, titulo):
+        tareas = self.indice_titulos.get(titulo.casefold())
+        return tareas[0] if tareas else None
 
     # Se define el método eliminar_tarea para eliminar una tarea de la lista de tareas y guardar el archivo
     def eliminar_tarea(self):
@@ -37,8 +101,9 @@ class GestorTareas:
                 confirm = input(f"¿Está seguro que desea eliminar '{tarea_eliminada.titulo}'? (s/n): ")
                 if confirm.lower() == "s":
                     self.lista_tareas.pop(seleccion - 1)
+                    self.desindexar_titulo(tarea_eliminada)
                     print(f"Tarea '{tarea_eliminada.titulo}' eliminada.")
-                    self.guardar_en_archivo()
+                    self.guardar_cambio(tarea_eliminada.id, None)
                 else:
                     print("Eliminación cancelada.")
             else:
@@ -48,34 +113,34 @@ class GestorTareas:
 
     # Se define el método marcar_pendiente para marcar una tarea como pendiente y guardar el archivo
     def marcar_pendiente(self, titulo):
-        for tarea in self.lista_tareas:
-            if tarea.titulo.lower() == titulo.lower():
-                tarea.estado = "pendiente"
-                print(f"Tarea '{titulo}' marcada como pendiente.")
-                self.guardar_en_archivo()
-                return
+        tarea = self.buscar_por_titulo(titulo)
+        if tarea is not None:
+            tarea.estado = "pendiente"
+            print(f"Tarea '{titulo}' marcada como pendiente.")
+            self.guardar_cambio(tarea.id, tarea)
+            return
 
         print(f"No se encontró la tarea con título '{titulo}'.")
 
     # Se define el método marcar_progreso para marcar una tarea como en progreso y guardar el archivo
     def marcar_progreso(self, titulo):
-        for tarea in self.lista_tareas:
-            if tarea.titulo.lower() == titulo.lower():
-                tarea.estado = "en progreso"
-                print(f"Tarea '{titulo}' marcada como en progreso.")
-                self.guardar_en_archivo()
-                return
+        tarea = self.buscar_por_titulo(titulo)
+        if tarea is not None:
+            tarea.estado = "en progreso"
+            print(f"Tarea '{titulo}' marcada como en progreso.")
+            self.guardar_cambio(tarea.id, tarea)
+            return
 
         print(f"No se encontró la tarea con título '{titulo}'.")
 
     # Se define el método marcar_completada para marcar una tarea como completada y guardar el archivo
     def marcar_completada(self, titulo):
-        for tarea in self.lista_tareas:
-            if tarea.titulo.lower() == titulo.lower():
-                tarea.estado = "completada"
-                print(f"Tarea '{titulo}' marcada como completada.")
-                self.guardar_en_archivo()
-                return
+        tarea = self.buscar_por_titulo(titulo)
+        if tarea is not None:
+            tarea.estado = "completada"
+            print(f"Tarea '{titulo}' marcada como completada.")
+            self.guardar_cambio(tarea.id, tarea)
+            return
 
         print(f"No se encontró la tarea con título '{titulo}'.")
 
@@ -86,64 +151,36 @@ class GestorTareas:
             print("No hay tareas.")
             return
 
-        # Se crea una variable fecha_max_dt para almacenar la fecha máxima filtrada
-        fecha_max_dt = None
+        # Se crea una variable fecha_max para almacenar el ordinal de la fecha máxima filtrada
+        fecha_max = None
         if fecha_maxima:
-            try:
-                # Se intenta convertir la fecha máxima a un objeto datetime
-                fecha_max_dt = datetime.strptime(fecha_maxima, "%d-%m-%Y")
-            except ValueError:
+            fecha_max = fecha_a_ordinal(fecha_maxima)
+            if fecha_max is None:
                 print(" Fecha máxima inválida. Ignorando filtro de fecha.")
-                fecha_max_dt = None
 
-        # Se filtran las tareas según el estado y la fecha máxima
-        tareas_filtradas = []
-        for t in self.lista_tareas:
-            incluir = True
-
-            # Se filtra la tarea según el estado
-            if filtro_estado and t.estado.lower() != filtro_estado.lower():
-                incluir = False
-
-            # Se filtra la tarea según la fecha máxima
-            if fecha_max_dt and t.fecha_vencimiento:
-                try:
-                    # Se intenta convertir la fecha de vencimiento de la tarea a un objeto datetime
-                    fecha_tarea_dt = datetime.strptime(t.fecha_vencimiento, "%d-%m-%Y")
-                    if fecha_tarea_dt > fecha_max_dt:
-                        incluir = False
-                except ValueError:
-                    incluir = False
-
-            # Si la tarea cumple con los filtros, se agrega a la lista de tareas filtradas
-            if incluir:
-                tareas_filtradas.append(t)
-
-        # Se ordenan las tareas filtradas según el criterio especificado
-        if ordenar_por == "fecha":
-            tareas_filtradas.sort(key=lambda t: datetime.strptime(t.fecha_vencimiento, "%d-%m-%Y") if t.fecha_vencimiento else datetime.max)
-        elif ordenar_por == "estado":
-            tareas_filtradas.sort(key=lambda t: t.estado)
-        elif ordenar_por == "prioridad":
-            tareas_filtradas.sort(key=lambda t: {"alta": 1, "media": 2, "baja": 3}.get(t.prioridad, 2))
+        # Se filtran las tareas según el estado y la fecha máxima (las tareas sin fecha se incluyen y las fechas inválidas
+        # quedan fuera) y se ordenan según el criterio especificado, con el mismo motor de consultas que la aplicación web
+        predicados = []
+        if filtro_estado:
+            predicados.append(Igual("estado", filtro_estado))
+        if fecha_max is not None:
+            predicados.append(O(Igual("fecha_vencimiento", ""), RangoFechas(hasta=fecha_max)))
+        tareas_filtradas = Planificador(self.lista_tareas).ejecutar(Consulta(todas(predicados), ordenar_por))
 
         # Se muestra la lista de tareas filtradas
         print("\n=== LISTA DE TAREAS ===")
         # Se obtiene la fecha actual para verificar si las tareas están vencidas
-        hoy = datetime.today()
+        hoy = date.today().toordinal()
 
         # Se recorre la lista de tareas filtradas, se muestra su estado y fecha de vencimiento
         for tarea in tareas_filtradas:
             vencida = ""
             if tarea.fecha_vencimiento:
-                try:
-                    # Se intenta convertir la fecha de vencimiento de la tarea a un objeto datetime
-                    fecha_tarea_dt = datetime.strptime(tarea.fecha_vencimiento, "%d-%m-%Y")
-                    # Se verifica si la tarea está vencida
-                    if fecha_tarea_dt < hoy:
-                        vencida = "  VENCIDA"
-                except ValueError:
+                # Se verifica si la tarea está vencida (vence hoy o antes)
+                if tarea.ordinal_vencimiento is None:
                     vencida = "  Fecha inválida"
+                elif tarea.ordinal_vencimiento <= hoy:
+                    vencida = "  VENCIDA"
 
             print(f"[{tarea.estado.upper()}] {tarea.titulo} - {tarea.descripcion} (Vence: {tarea.fecha_vencimiento}) [Prioridad: {tarea.prioridad.upper()}]{vencida}")
 
@@ -151,75 +188,82 @@ class GestorTareas:
             if tarea.subtareas:
                 print("  Subtareas:")
                 for idx, subtarea in enumerate(tarea.subtareas, 1):
-                    print(f"    {idx}. {subtarea}")
+                    marca = "x" if subtarea.completada else " "
+                    print(f"    {idx}. [{marca}] {subtarea.nombre}")
 
-    # Se define el método para guardar las tareas en un archivo JSON
-    def guardar_en_archivo(self, archivo="data/tareas.json"):
+    # Se define el método para guardar todas las tareas en una nueva instantánea (compactando el diario)
+    # Sin archivo se usa el del almacenamiento actual
+    def guardar_en_archivo(self, archivo=None):
         try:
-            # Se abre el archivo en modo escritura y se guarda la lista de tareas en formato JSON
-            with open(archivo, "w", encoding="utf-8") as f:
-                json.dump([tarea.to_dict() for tarea in self.lista_tareas], f, indent=4)
+            if archivo is not None and archivo != self.almacenamiento.archivo:
+                self.almacenamiento = crear_almacenamiento(archivo)
+            with self.almacenamiento.bloquear():
+                self.compactar()
         except Exception as e:
             print(f"Error al guardar: {e}")
 
-    # Se define el método para cargar las tareas desde un archivo JSON
-    def cargar_desde_archivo(self, archivo="data/tareas.json"):
+    # Se define el método para cargar las tareas desde la instantánea y su diario; sin archivo se usa el del almacenamiento actual
+    # Si no se encuentra el archivo, el almacenamiento muestra un mensaje y se empieza con la lista vacía
+    def cargar_desde_archivo(self, archivo=None):
         try:
-            # Se abre el archivo en modo lectura y se carga la lista de tareas desde formato JSON
-            with open(archivo, "r", encoding="utf-8") as f:
-                tareas_cargadas = json.load(f)
-                self.lista_tareas = [Tarea.from_dict(t) for t in tareas_cargadas]
-        # Si no se encuentra el archivo, se muestra un mensaje de error
-        except FileNotFoundError:
-            print("No se encontró archivo, empezando con lista vacía.")
+            if archivo is not None and archivo != self.almacenamiento.archivo:
+                self.almacenamiento = crear_almacenamiento(archivo)
+            with self.almacenamiento.bloquear():
+                self.cargar_tareas()
+                if self.almacenamiento.necesita_compactar():
+                    self.almacenamiento.guardar_todo(self.lista_tareas)
         except Exception as e:
             print(f"Error al cargar: {e}")
 
     # Se define el método para editar una tarea
     def editar_tarea(self, titulo):
-        # Se recorre la lista de tareas y se busca la tarea con el título especificado
-        for tarea in self.lista_tareas:
-            if tarea.titulo.lower() == titulo.lower():
-                print(f"Editando tarea: {tarea.titulo}")
-                nuevo_titulo = input("Nuevo título (enter para mantener): ")
-                nueva_desc = input("Nueva descripción (enter para mantener): ")
-                nueva_fecha = input("Nueva fecha de vencimiento (enter para mantener): ")
-                nueva_prioridad = input("Nueva prioridad (alta / media / baja) (enter para mantener): ")
-
-                if nuevo_titulo.strip():
-                    tarea.titulo = nuevo_titulo
-                if nueva_desc.strip():
-                    tarea.descripcion = nueva_desc
-                if nueva_fecha.strip():
-                    tarea.fecha_vencimiento = nueva_fecha
-                if nueva_prioridad.strip().lower() in ["alta", "media", "baja"]:
-                    tarea.prioridad = nueva_prioridad.lower()
-
-                print("Tarea actualizada.")
-                self.guardar_en_archivo()
-                return
+        # Se busca la tarea con el título especificado en el índice de títulos
+        tarea = self.buscar_por_titulo(titulo)
+        if tarea is not None:
+            print(f"Editando tarea: {tarea.titulo}")
+            nuevo_titulo = input("Nuevo título (enter para mantener): ")
+            nueva_desc = input("Nueva descripción (enter para mantener): ")
+            nueva_fecha = input("Nueva fecha de vencimiento (enter para mantener): ")
+            nueva_prioridad = input("Nueva prioridad (alta / media / baja) (enter para mantener): ")
+
+            if nuevo_titulo.strip():
+                # Se actualiza el índice de títulos con el nuevo título
+                self.desindexar_titulo(tarea)
+                tarea.titulo = nuevo_titulo
+                self.indexar_titulo(tarea)
+            if nueva_desc.strip():
+                tarea.descripcion = nueva_desc
+            if nueva_fecha.strip():
+                tarea.fecha_vencimiento = nueva_fecha
+            if nueva_prioridad.strip().lower() in ["alta", "media", "baja"]:
+                tarea.prioridad = nueva_prioridad.lower()
+
+            print("Tarea actualizada.")
+            self.guardar_cambio(tarea.id, tarea)
+            return
         print(f"No se encontró tarea con título '{titulo}'.")
 
     # Se define el método para cambiar el estado de una tarea
     def cambiar_estado_tarea(self, titulo):
-        for tarea in self.lista_tareas:
-            if tarea.titulo.lower() == titulo.lower():
-                print(f"Estado actual: {tarea.estado}")
-                if tarea.estado == "pendiente":
-                    tarea.estado = "en progreso"
-                elif tarea.estado == "en progreso":
-                    tarea.estado = "completada"
-                else:
-                    print("La tarea ya está completada.")
-                    return
-                print(f"Estado actualizado a {tarea.estado}.")
-                self.guardar_en_archivo()
+        tarea = self.buscar_por_titulo(titulo)
+        if tarea is not None:
+            print(f"Estado actual: {tarea.estado}")
+            if tarea.estado == "pendiente":
+                tarea.estado = "en progreso"
+            elif tarea.estado == "en progreso":
+                tarea.estado = "completada"
+            else:
+                print("La tarea ya está completada.")
                 return
+            print(f"Estado actualizado a {tarea.estado}.")
+            self.guardar_cambio(tarea.id, tarea)
+            return
         print(f"No se encontró tarea con título '{titulo}'.")
 
     # Se define el método para buscar tareas por palabra clave en título o descripción
     def buscar_tareas(self, palabra_clave):
-        resultados = [t for t in self.lista_tareas if palabra_clave.lower() in t.titulo.lower() or palabra_clave.lower() in t.descripcion.lower()]
+        filtro = O(Contiene("titulo", palabra_clave), Contiene("descripcion", palabra_clave))
+        resultados = Planificador(self.lista_tareas).ejecutar(Consulta(filtro))
         if resultados:
             print("\n=== RESULTADOS DE BÚSQUEDA ===")
             for tarea in resultados:
@@ -229,32 +273,26 @@ class GestorTareas:
 
     # Se define el método para agregar una subtarea a una tarea existente
     def agregar_subtarea(self, titulo):
-        for tarea in self.lista_tareas:
-            if tarea.titulo.lower() == titulo.lower():
-                subtarea = input("Ingrese subtarea: ")
-                tarea.subtareas.append(subtarea)
-                print("Subtarea agregada.")
-                self.guardar_en_archivo()
-                return
+        tarea = self.buscar_por_titulo(titulo)
+        if tarea is not None:
+            subtarea = input("Ingrese subtarea: ")
+            tarea.subtareas.append(Subtarea(subtarea))
+            print("Subtarea agregada.")
+            self.guardar_cambio(tarea.id, tarea)
+            return
         print(f"No se encontró tarea con título '{titulo}'.")
 
     # Se define el método para mostrar las próximas tareas que vencen en un plazo determinado de días
     def mostrar_proximas_tareas(self, dias=3):
         # Se obtiene la fecha actual y se calcula la fecha límite sumando los días especificados
-        hoy = datetime.today()
-        limite = hoy + timedelta(days=dias)
+        hoy = date.today().toordinal()
+        limite = hoy + dias
 
         proximas = []
         # Se recorre la lista de tareas y se verifica si la fecha de vencimiento está dentro del rango límite
         for t in self.lista_tareas:
-            if t.fecha_vencimiento:
-                try:
-                    # Se intenta convertir la fecha de vencimiento de la tarea a un objeto datetime
-                    fecha_tarea = datetime.strptime(t.fecha_vencimiento, "%d-%m-%Y")
-                    if hoy <= fecha_tarea <= limite:
-                        proximas.append(t)
-                except ValueError:
-                    pass
+            if t.ordinal_vencimiento is not None and hoy < t.ordinal_vencimiento <= limite:
+                proximas.append(t)
 
         # Se muestra la lista de tareas próximas a vencer
         if proximas:
@@ -266,5 +304,8 @@ class GestorTareas:
 
 # Se define el método para eliminar una tarea por título
 def eliminar_tarea_por_titulo(self, titulo):
+    eliminadas = [t for t in self.lista_tareas if t.titulo == titulo]
     self.lista_tareas = [t for t in self.lista_tareas if t.titulo != titulo]
-    self.guardar_en_archivo()
+    self.reconstruir_indice_titulos()
+    for tarea in eliminadas:
+        self.guardar_cambio(tarea.id, None)
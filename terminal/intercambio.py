@@ -0,0 +1,109 @@
+# intercambio.py
+# Se definen los comandos de terminal para exportar e importar tareas en JSON, NDJSON o CSV:
+#   python -m terminal.intercambio exportar tareas.ndjson
+#   python -m terminal.intercambio exportar tareas.csv --subtareas planas
+#   python -m terminal.intercambio exportar - --formato ndjson        (a la salida estándar)
+#   python -m terminal.intercambio exportar casa.csv --categoria Casa
+#   python -m terminal.intercambio importar tareas.csv [--reemplazar]
+# Las tareas se leen y se escriben una a una, de modo que sirven para mover archivos con millones de tareas
+# Usan el mismo almacenamiento que la aplicación web (con TODOLIST_ALMACENAMIENTO=sqlite, la base de datos,
+# con TODOLIST_ALMACENAMIENTO=binario, la instantánea binaria, y con TODOLIST_ALMACENAMIENTO=categorias, las particiones)
+import argparse
+import sys
+
+from gestor_web import GestorTareasWeb
+from core.almacenamiento import AlmacenamientoPorCategoria, crear_almacenamiento
+from core.intercambio import FORMATOS, MODOS_SUBTAREAS, exportar as exportar_tareas, formato_de_archivo, leer_tareas
+from core.persistencia import escribir_atomico_partes
+
+
+# Se define la función para crear el gestor sobre el almacenamiento configurado y cargar las tareas
+def crear_gestor():
+    gestor = GestorTareasWeb(almacenamiento=crear_almacenamiento())
+    gestor.cargar_desde_archivo()
+    return gestor
+
+
+# Se define la función para recorrer las tareas guardadas (o solo las de algunas categorías), una a una
+# Con el almacenamiento por categoría se leen solo sus particiones; con los demás se recorren todas y se filtran
+def recorrer_tareas(categorias=None):
+    almacenamiento = crear_almacenamiento()
+    if isinstance(almacenamiento, AlmacenamientoPorCategoria):
+        return almacenamiento.recorrer(categorias)
+    tareas = almacenamiento.recorrer()
+    if not categorias:
+        return tareas
+    return (tarea for tarea in tareas if tarea.categoria in categorias)
+
+
+# Se define la función para contar las tareas de un iterable a medida que se recorren (cantidad[0])
+def contar(tareas, cantidad):
+    for tarea in tareas:
+        cantidad[0] += 1
+        yield tarea
+
+
+# Se define la función para exportar las tareas a un archivo (o a la salida estándar con "-"), o solo las de algunas categorías
+# Las tareas se leen del almacenamiento a medida que se escriben, sin cargarlas todas
+def exportar(archivo, formato, subtareas, categorias=None):
+    cantidad = [0]
+    partes = exportar_tareas(contar(recorrer_tareas(categorias), cantidad), formato or "json", subtareas)
+    if archivo == "-":
+        for parte in partes:
+            sys.stdout.write(parte)
+        sys.stdout.flush()
+    else:
+        try:
+            escribir_atomico_partes(archivo, (parte.encode("utf-8") for parte in partes))
+        except OSError as e:
+            print(f"Error al exportar: {e}", file=sys.stderr)
+            return 1
+        print(f"Se exportaron {cantidad[0]} tareas a {archivo}.", file=sys.stderr)
+    return 0
+
+
+# Se define la función para importar las tareas de un archivo
+def importar(archivo, formato, reemplazar):
+    gestor = crear_gestor()
+    try:
+        cantidad = gestor.importar_tareas(leer_tareas(archivo, formato), reemplazar)
+    except (OSError, ValueError) as e:
+        print(f"Error al importar: {e}", file=sys.stderr)
+        return 1
+    finally:
+        # Se guarda lo importado, incluso los lotes incorporados antes de un error
+        gestor.flush()
+    print(f"Se importaron {cantidad} tareas ({len(gestor.tareas)} en total).", file=sys.stderr)
+    return 0
+
+
+# Se define la función principal con los comandos exportar e importar
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(prog="python -m terminal.intercambio",
+                                     description="Exporta o importa tareas en JSON, NDJSON o CSV.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    parser_exportar = comandos.add_parser("exportar", help="Exporta todas las tareas")
+    parser_exportar.add_argument("archivo", help="Archivo de destino, o - para la salida estándar")
+    parser_exportar.add_argument("--formato", choices=FORMATOS, help="Formato (por defecto, según la extensión)")
+    parser_exportar.add_argument("--subtareas", choices=MODOS_SUBTAREAS, default="anidadas",
+                                 help="En CSV: subtareas en una columna JSON (anidadas) o una fila por subtarea (planas)")
+    parser_exportar.add_argument("--categoria", action="append", dest="categorias",
+                                 help="Exporta solo las tareas de esta categoría (se puede repetir)")
+
+    parser_importar = comandos.add_parser("importar", help="Importa tareas (las de igual id se reemplazan)")
+    parser_importar.add_argument("archivo", help="Archivo de origen")
+    parser_importar.add_argument("--formato", choices=FORMATOS, help="Formato (por defecto, según la extensión)")
+    parser_importar.add_argument("--reemplazar", action="store_true",
+                                 help="Elimina las tareas que no vienen en el archivo")
+
+    args = parser.parse_args(argumentos)
+    if args.comando == "exportar":
+        return exportar(args.archivo, args.formato or (None if args.archivo == "-" else formato_de_archivo(args.archivo)),
+                        args.subtareas, args.categorias)
+    return importar(args.archivo, args.formato, args.reemplazar)
+
+
+# Se ejecutan los comandos
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,8 @@ def mostrar_menu():
 # Se define la función principal del programa
 def main():
     # Se crea un objeto GestorTareas para gestionar las tareas y se carga la lista de tareas desde un archivo
+    # Se usa el mismo almacenamiento que la aplicación web, elegido con la variable de entorno TODOLIST_ALMACENAMIENTO
+    # (sqlite: data/tareas.db, binario: data/tareas.bin, categorias: data/categorias; por defecto, data/tareas.json)
     gestor = GestorTareas()
     gestor.cargar_desde_archivo()
 
@@ -33,6 +35,8 @@ def main():
     while True:
         mostrar_menu()
         opcion = input("Seleccione una opción: ")
+        # Se incorporan los cambios hechos desde la aplicación web mientras tanto
+        gestor.refrescar()
 
         # Agrega una tarea nueva
         if opcion == "1":
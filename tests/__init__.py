@@ -0,0 +1 @@
+# Se definen las pruebas del gestor de tareas (python -m pytest o python -m unittest discover tests)
@@ -0,0 +1,208 @@
+# test_almacenamiento.py
+# Se definen las pruebas de los motores de almacenamiento
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from core.almacenamiento import (AlmacenamientoBinario, AlmacenamientoJSON, AlmacenamientoPorCategoria, AlmacenamientoSQLite,
+                                 crear_almacenamiento)
+from core.tarea import Tarea
+from gestor_web import GestorTareasWeb
+
+
+# Se definen las pruebas de crear_almacenamiento, que usan la aplicación web y los programas de terminal
+class PruebasCrearAlmacenamiento(unittest.TestCase):
+    # Se crea un directorio temporal para los archivos de cada prueba
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que el almacenamiento se elige según el nombre del archivo
+    def test_segun_archivo(self):
+        casos = {
+            "tareas.json": AlmacenamientoJSON,
+            "tareas.db": AlmacenamientoSQLite,
+            "tareas.bin": AlmacenamientoBinario,
+            os.path.join("categorias", "manifiesto.json"): AlmacenamientoPorCategoria,
+        }
+        for archivo, clase in casos.items():
+            with self.subTest(archivo=archivo):
+                almacenamiento = crear_almacenamiento(os.path.join(self.directorio, archivo))
+                self.assertIs(type(almacenamiento), clase)
+                self.assertEqual(almacenamiento.archivo, os.path.join(self.directorio, archivo))
+
+    # Se prueba que sin archivo se usa el almacenamiento elegido con TODOLIST_ALMACENAMIENTO
+    def test_segun_variable_de_entorno(self):
+        casos = {"sqlite": AlmacenamientoSQLite, "binario": AlmacenamientoBinario, "categorias": AlmacenamientoPorCategoria,
+                 "json": AlmacenamientoJSON}
+        anterior = os.getcwd()
+        os.chdir(self.directorio)
+        try:
+            for tipo, clase in casos.items():
+                with self.subTest(tipo=tipo), mock.patch.dict(os.environ, {"TODOLIST_ALMACENAMIENTO": tipo}):
+                    os.makedirs("data", exist_ok=True)
+                    self.assertIs(type(crear_almacenamiento()), clase)
+        finally:
+            os.chdir(anterior)
+
+
+# Se definen las pruebas de recorrer, que debe entregar las mismas tareas que cargar, en el mismo orden
+class PruebasRecorrer(unittest.TestCase):
+    # Se crea un directorio temporal para los archivos de cada prueba
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se definen los almacenamientos a probar
+    def almacenamientos(self):
+        return {
+            "json": lambda: AlmacenamientoJSON(os.path.join(self.directorio, "tareas.json")),
+            "binario": lambda: AlmacenamientoBinario(os.path.join(self.directorio, "tareas.bin")),
+            "categorias": lambda: AlmacenamientoPorCategoria(os.path.join(self.directorio, "categorias")),
+            "sqlite": lambda: AlmacenamientoSQLite(os.path.join(self.directorio, "tareas.db")),
+        }
+
+    # Se prueba recorrer después de una instantánea y de cambios en el diario (editar, eliminar y volver a guardar)
+    def test_recorrer_igual_que_cargar(self):
+        for nombre, crear in self.almacenamientos().items():
+            with self.subTest(almacenamiento=nombre):
+                gestor = GestorTareasWeb(almacenamiento=crear(), sincrono=True)
+                tareas = [Tarea(f"Tarea {i}", "", categoria=("Casa", "Trabajo")[i % 2]) for i in range(6)]
+                for tarea in tareas:
+                    gestor.agregar_tarea(tarea)
+                gestor.guardar_en_archivo()
+
+                gestor.actualizar_tarea(tareas[1].id, {"titulo": "Editada", "categoria": "Casa"})
+                gestor.eliminar_tarea(tareas[2].id)
+                gestor.eliminar_tarea(tareas[3].id)
+                gestor.agregar_tarea(tareas[3])
+                gestor.agregar_tarea(Tarea("Nueva", "", categoria="Otra"))
+
+                cargadas = [t.to_dict() for t in crear().cargar()]
+                recorridas = [t.to_dict() for t in crear().recorrer()]
+                self.assertEqual(recorridas, cargadas)
+                self.assertEqual(len(recorridas), 6)
+
+    # Se prueba recorrer solo algunas categorías del almacenamiento por categoría
+    def test_recorrer_categorias(self):
+        almacenamiento = AlmacenamientoPorCategoria(os.path.join(self.directorio, "categorias"))
+        gestor = GestorTareasWeb(almacenamiento=almacenamiento, sincrono=True)
+        for i in range(4):
+            gestor.agregar_tarea(Tarea(f"Tarea {i}", "", categoria=("Casa", "Trabajo")[i % 2]))
+        self.assertEqual([t.titulo for t in almacenamiento.recorrer(["Trabajo"])], ["Tarea 1", "Tarea 3"])
+
+    # Se prueba que recorrer algunas categorías no lee las particiones de las demás (aunque falten sus archivos)
+    def test_recorrer_categorias_sin_leer_otras(self):
+        almacenamiento = AlmacenamientoPorCategoria(os.path.join(self.directorio, "categorias"))
+        gestor = GestorTareasWeb(almacenamiento=almacenamiento, sincrono=True)
+        for i in range(4):
+            gestor.agregar_tarea(Tarea(f"Tarea {i}", "", categoria=("Casa", "Trabajo")[i % 2]))
+        os.remove(os.path.join(almacenamiento.directorio, almacenamiento.archivos["Casa"]))
+        self.assertEqual([t.titulo for t in almacenamiento.recorrer(["Trabajo"])], ["Tarea 1", "Tarea 3"])
+
+
+# Se definen las pruebas del almacenamiento SQLite
+class PruebasSQLite(unittest.TestCase):
+    # Se crea un almacenamiento SQLite en un directorio temporal
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.almacenamiento = AlmacenamientoSQLite(os.path.join(self.directorio, "tareas.db"))
+
+    # Se cierra la conexión y se borra el directorio temporal
+    def tearDown(self):
+        self.almacenamiento.conexion.close()
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que recorrer lee por tandas sin saltar ni repetir filas, aunque se escriba entre una tanda y otra
+    def test_recorrer_por_tandas(self):
+        self.almacenamiento.guardar_todo([Tarea(f"Tarea {i}", "") for i in range(1200)])
+        recorrido = self.almacenamiento.recorrer()
+        primeras = [next(recorrido) for _ in range(600)]
+        self.almacenamiento.guardar_tarea(Tarea("Nueva", ""))
+        titulos = [t.titulo for t in primeras + list(recorrido)]
+        self.assertEqual(titulos, [f"Tarea {i}" for i in range(1200)] + ["Nueva"])
+
+    # Se prueba que varios hilos pueden usar a la vez la conexión compartida (escribir, leer y consultar la versión)
+    def test_hilos(self):
+        errores = []
+
+        # Se define la tarea de cada hilo
+        def trabajar(numero):
+            try:
+                for i in range(50):
+                    self.almacenamiento.guardar_cambios({f"{numero}-{i}": Tarea(f"Tarea {i}", "", id=f"{numero}-{i}")})
+                    self.almacenamiento.version()
+                    sum(1 for _ in self.almacenamiento.recorrer())
+            except Exception as e:
+                errores.append(e)
+
+        hilos = [threading.Thread(target=trabajar, args=(n,)) for n in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(errores, [])
+        self.assertEqual(len(self.almacenamiento.cargar()), 200)
+
+    # Se prueba que la tabla no tiene índices secundarios, porque las consultas se resuelven en memoria
+    def test_sin_indices_secundarios(self):
+        indices = self.almacenamiento.conexion.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall()
+        self.assertEqual(indices, [])
+
+
+# Se definen las pruebas de la importación por lotes
+class PruebasImportar(unittest.TestCase):
+    # Se crea un gestor síncrono con tres tareas en un directorio temporal
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.gestor = GestorTareasWeb(archivo=os.path.join(self.directorio, "tareas.json"), sincrono=True)
+        self.existentes = [Tarea(f"Existente {i}", "") for i in range(3)]
+        for tarea in self.existentes:
+            self.gestor.agregar_tarea(tarea)
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se define la función que entrega tareas y falla después de cantidad tareas, como un archivo con un error
+    def tareas_con_error(self, cantidad):
+        for i in range(cantidad):
+            yield Tarea(f"Importada {i}", "")
+        raise ValueError("Línea inválida")
+
+    # Se prueba que una importación con reemplazar conserva las tareas con el mismo id y elimina las demás
+    def test_importar_reemplazando(self):
+        reemplazo = Tarea("Reemplazo", "", id=self.existentes[0].id)
+        nuevas = [reemplazo] + [Tarea(f"Importada {i}", "") for i in range(2500)]
+        self.assertEqual(self.gestor.importar_tareas(iter(nuevas), reemplazar=True), 2501)
+        self.assertEqual([t.titulo for t in self.gestor.lista_tareas[:2]], ["Reemplazo", "Importada 0"])
+        self.assertEqual(len(self.gestor.tareas), 2501)
+
+        cargado = GestorTareasWeb(archivo=self.gestor.almacenamiento.archivo, sincrono=True)
+        cargado.cargar_desde_archivo()
+        self.assertEqual(len(cargado.tareas), 2501)
+
+    # Se prueba que si el archivo tiene un error quedan los lotes anteriores y no se elimina ninguna tarea
+    def test_importar_con_error(self):
+        with self.assertRaises(ValueError):
+            self.gestor.importar_tareas(self.tareas_con_error(2500), reemplazar=True)
+        self.assertEqual(len(self.gestor.tareas), 3 + 2000)
+
+        cargado = GestorTareasWeb(archivo=self.gestor.almacenamiento.archivo, sincrono=True)
+        cargado.cargar_desde_archivo()
+        self.assertEqual(len(cargado.tareas), 3 + 2000)
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# test_api.py
+# Se definen las pruebas de la API JSON en /api/tareas
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import Flask
+
+from api import crear_api
+from core.consulta import Consulta, Igual
+from core.paginacion import paginar
+from core.tarea import Tarea
+from gestor_web import GestorTareasWeb
+
+
+# Se definen las pruebas de la creación de tareas
+class PruebasCrearTarea(unittest.TestCase):
+    # Se crea una aplicación con la API sobre un gestor síncrono en un directorio temporal
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.gestor = GestorTareasWeb(archivo=os.path.join(self.directorio, "tareas.json"), sincrono=True)
+        aplicacion = Flask(__name__)
+        aplicacion.register_blueprint(crear_api(self.gestor))
+        self.cliente = aplicacion.test_client()
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que una tarea creada con otro estado se agrega de una vez, ya con ese estado (los índices cambian una sola vez)
+    def test_crear_con_estado(self):
+        generacion = self.gestor.generacion
+        respuesta = self.cliente.post("/api/tareas", json={"titulo": "Informe", "estado": "completada"})
+        self.assertEqual(respuesta.status_code, 201)
+        tarea = self.gestor.obtener_tarea(respuesta.get_json()["id"])
+        self.assertEqual(tarea.estado, "completada")
+        self.assertIsNotNone(tarea.fecha_completada)
+        self.assertEqual(self.gestor.generacion, generacion + 1)
+
+    # Se prueba que una fecha límite mal formada se rechaza con 400 y no se crea la tarea
+    def test_crear_fecha_mal_formada(self):
+        respuesta = self.cliente.post("/api/tareas", json={"titulo": "Informe", "fecha_limite": "01-02-25"})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertEqual(self.gestor.lista_tareas, [])
+
+    # Se prueba que las tareas creadas en un lote también se crean con su estado
+    def test_lote_crear_con_estado(self):
+        respuesta = self.cliente.post("/api/tareas/lote", json={"operaciones": [
+            {"op": "crear", "tarea": {"titulo": "Uno", "estado": "en progreso"}},
+        ]})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual([t.estado for t in self.gestor.lista_tareas], ["en progreso"])
+
+
+# Se definen las pruebas del listado paginado
+class PruebasListarTareas(unittest.TestCase):
+    # Se crea una aplicación con la API sobre un gestor síncrono con tres tareas
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.gestor = GestorTareasWeb(archivo=os.path.join(self.directorio, "tareas.json"), sincrono=True)
+        for titulo in ("Uno", "Dos", "Tres"):
+            self.gestor.agregar_tarea(Tarea(titulo, ""))
+        aplicacion = Flask(__name__)
+        aplicacion.register_blueprint(crear_api(self.gestor))
+        self.cliente = aplicacion.test_client()
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que un límite o desplazamiento negativo se rechaza con 400 en vez de fallar con 500
+    def test_paginacion_negativa(self):
+        for parametros in ("limite=-1", "desplazamiento=-1", "limite=-5&desplazamiento=1"):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.cliente.get("/api/tareas?" + parametros).status_code, 400)
+
+    # Se prueba que la consulta ajusta un límite negativo a cero en vez de fallar
+    def test_consulta_limite_negativo(self):
+        for filtro in (None, Igual("estado", "pendiente")):
+            with self.subTest(filtro=filtro):
+                pagina = self.gestor.consultar(Consulta(filtro, limite=-1), "filtradas")
+                self.assertEqual(list(pagina), [])
+                self.assertEqual(pagina.total, 3)
+        self.assertEqual(len(paginar(range(5), 1, -2)), 0)
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# test_asgi.py
+# Se definen las pruebas del modo de servidor asíncrono (ASGI): las rutas de Flask y el flujo de /eventos
+import asyncio
+import importlib
+import os
+import shutil
+import tempfile
+import unittest
+
+import httpx
+from flask import Flask
+
+from api import crear_api
+from core.tarea import Tarea
+from gestor_web import GestorTareasWeb
+
+
+# Se define la función para importar asgi.py (que importa app.py y carga sus tareas) desde un directorio temporal,
+# para que la aplicación de app.py no lea ni escriba el directorio data del proyecto
+# Su gestor se cierra antes de volver al directorio anterior, porque usa la ruta relativa data/tareas.json y al terminar
+# el programa guardaría en el directorio del proyecto
+def importar_asgi(directorio):
+    anterior = os.getcwd()
+    os.makedirs(os.path.join(directorio, "data"), exist_ok=True)
+    os.chdir(directorio)
+    try:
+        modulo = importlib.import_module("asgi")
+        modulo.gestor.cerrar()
+        return modulo
+    finally:
+        os.chdir(anterior)
+
+
+# Se definen las pruebas de la aplicación ASGI sobre una aplicación con la API y un gestor síncrono
+class PruebasASGI(unittest.IsolatedAsyncioTestCase):
+    # Se importa asgi.py una sola vez, desde un directorio temporal
+    @classmethod
+    def setUpClass(cls):
+        cls.directorio_importacion = tempfile.mkdtemp()
+        cls.asgi = importar_asgi(cls.directorio_importacion)
+
+    # Se borra el directorio temporal de la importación
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directorio_importacion, ignore_errors=True)
+
+    # Se crea la aplicación ASGI con un gestor síncrono en un directorio temporal
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.gestor = GestorTareasWeb(archivo=os.path.join(self.directorio, "tareas.json"), sincrono=True)
+        aplicacion_flask = Flask(__name__)
+        aplicacion_flask.register_blueprint(crear_api(self.gestor))
+        self.aplicacion = self.asgi.AplicacionASGI(aplicacion_flask, self.gestor)
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que las solicitudes a Flask se atienden a través de la aplicación ASGI
+    async def test_solicitudes(self):
+        transporte = httpx.ASGITransport(app=self.aplicacion)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://prueba") as cliente:
+            respuesta = await cliente.post("/api/tareas", json={"titulo": "Informe"})
+            self.assertEqual(respuesta.status_code, 201)
+            respuesta = await cliente.get("/api/tareas")
+            self.assertEqual([t["titulo"] for t in respuesta.json()["tareas"]], ["Informe"])
+            self.assertEqual((await cliente.get("/api/tareas?limite=-1")).status_code, 400)
+
+    # Se prueba que /eventos envía el estado actual, avisa cada cambio y termina al cerrar el servidor, que además
+    # detiene la vigilancia de cambios
+    async def test_eventos(self):
+        intervalo = self.asgi.INTERVALO_EVENTOS
+        self.asgi.INTERVALO_EVENTOS = 0.01
+        self.addCleanup(setattr, self.asgi, "INTERVALO_EVENTOS", intervalo)
+        enviados = asyncio.Queue()
+        desconexion = asyncio.Event()
+
+        # Se define la función receive del cliente, que solo termina cuando el cliente se desconecta
+        async def recibir():
+            await desconexion.wait()
+            return {"type": "http.disconnect"}
+
+        # Se define la función para obtener el siguiente cuerpo enviado por /eventos
+        async def siguiente_cuerpo():
+            while True:
+                mensaje = await asyncio.wait_for(enviados.get(), 5)
+                if mensaje["type"] == "http.response.body":
+                    return mensaje
+
+        scope = {"type": "http", "method": "GET", "path": "/eventos", "headers": [], "query_string": b""}
+        flujo = asyncio.ensure_future(self.aplicacion(scope, recibir, enviados.put))
+        self.assertIn(self.gestor.etiqueta().encode("utf-8"), (await siguiente_cuerpo())["body"])
+
+        self.gestor.agregar_tarea(Tarea("Nueva", ""))
+        cuerpo = (await siguiente_cuerpo())["body"]
+        self.assertIn(b"event: cambio", cuerpo)
+        self.assertIn(self.gestor.etiqueta().encode("utf-8"), cuerpo)
+        self.assertIn(b'"tareas": 1', cuerpo)
+
+        mensajes_vida = asyncio.Queue()
+        await mensajes_vida.put({"type": "lifespan.shutdown"})
+        await asyncio.wait_for(self.aplicacion({"type": "lifespan"}, mensajes_vida.get, enviados.put), 5)
+        self.assertEqual((await siguiente_cuerpo()).get("more_body", False), False)
+        await asyncio.wait_for(flujo, 5)
+        self.assertIsNone(self.aplicacion.vigilancia)
+        self.assertTrue(self.gestor.cerrado)
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# test_binario.py
+# Se definen las pruebas de la instantánea binaria y de las tareas perezosas que se cargan de ella
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.almacenamiento import AlmacenamientoBinario
+from core.binario import SIN_LEER, InstantaneaBinaria, TareaPerezosa, escribir_instantanea_binaria, valor_leido
+from core.tarea import Tarea
+
+
+# Se define la función para crear tareas de prueba con textos con acentos, subtareas, fechas y valores repetidos
+def crear_tareas():
+    return [
+        Tarea("Estudiar álgebra", "Capítulos 1 al 5", "en progreso", "01-02-2025", fecha_vencimiento="10-02-2025",
+              prioridad="alta", subtareas=[{"nombre": "Resumen", "completada": True}, "Ejercicios"],
+              categoria="Universidad"),
+        Tarea("Preparar presentación", "", "completada", "01-02-2025", "05-02-2025", categoria="Trabajo"),
+        Tarea("Comprar materiales", "Papelería", categoria="Universidad"),
+    ]
+
+
+# Se definen las pruebas de la instantánea binaria
+class PruebasInstantaneaBinaria(unittest.TestCase):
+    # Se crea un directorio temporal con una instantánea de las tareas de prueba
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.archivo = os.path.join(self.directorio, "tareas.bin")
+        self.tareas = crear_tareas()
+        self.firma = escribir_instantanea_binaria(self.archivo, self.tareas)
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que las tareas leídas tienen los mismos datos que las guardadas, y que la firma es la del pie
+    def test_ida_y_vuelta(self):
+        instantanea = InstantaneaBinaria(self.archivo)
+        self.assertEqual(instantanea.firma, self.firma)
+        leidas = instantanea.tareas()
+        self.assertTrue(all(isinstance(t, TareaPerezosa) for t in leidas))
+        self.assertEqual([t.to_dict() for t in leidas], [t.to_dict() for t in self.tareas])
+        self.assertEqual([t.ordinal_vencimiento for t in leidas], [t.ordinal_vencimiento for t in self.tareas])
+        self.assertEqual([t.ordinal_completada for t in leidas], [t.ordinal_completada for t in self.tareas])
+
+    # Se prueba que el título, la descripción y las subtareas se leen del archivo recién cuando se usan
+    def test_lectura_perezosa(self):
+        tarea = InstantaneaBinaria(self.archivo).tareas()[0]
+        self.assertEqual(tarea.estado, "en progreso")
+        for atributo in ("titulo", "descripcion", "subtareas"):
+            self.assertIs(valor_leido(tarea, atributo), SIN_LEER)
+        self.assertEqual(tarea.titulo, "Estudiar álgebra")
+        self.assertEqual(valor_leido(tarea, "titulo"), "Estudiar álgebra")
+        self.assertIs(valor_leido(tarea, "descripcion"), SIN_LEER)
+        self.assertEqual([s.nombre for s in tarea.subtareas], ["Resumen", "Ejercicios"])
+
+    # Se prueba que un atributo cambiado antes de leerse conserva el valor nuevo
+    def test_cambio_antes_de_leer(self):
+        tarea = InstantaneaBinaria(self.archivo).tareas()[1]
+        tarea.titulo = "Otro título"
+        self.assertEqual(tarea.titulo, "Otro título")
+        self.assertEqual(tarea.to_dict()["titulo"], "Otro título")
+
+    # Se prueba que al escribir una nueva instantánea a partir de tareas perezosas se copian los textos sin leerlos,
+    # y se guardan los que se cambiaron
+    def test_reescribir_sin_leer(self):
+        leidas = InstantaneaBinaria(self.archivo).tareas()
+        leidas[2].descripcion = "Cuadernos"
+        otro = os.path.join(self.directorio, "copia.bin")
+        escribir_instantanea_binaria(otro, leidas)
+        self.assertIs(valor_leido(leidas[0], "titulo"), SIN_LEER)
+
+        esperadas = [t.to_dict() for t in self.tareas]
+        esperadas[2]["descripcion"] = "Cuadernos"
+        self.assertEqual([t.to_dict() for t in InstantaneaBinaria(otro).tareas()], esperadas)
+
+    # Se prueba que un archivo que no es una instantánea binaria se rechaza con ValueError
+    def test_archivo_invalido(self):
+        for contenido in (b"", b"[]" * 100):
+            with self.subTest(contenido=contenido[:10]):
+                with open(self.archivo, "wb") as f:
+                    f.write(contenido)
+                with self.assertRaises(ValueError):
+                    InstantaneaBinaria(self.archivo)
+
+
+# Se definen las pruebas de AlmacenamientoBinario: instantánea binaria más diario
+class PruebasAlmacenamientoBinario(unittest.TestCase):
+    # Se crea un directorio temporal para el almacenamiento
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.archivo = os.path.join(self.directorio, "tareas.bin")
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que los cambios del diario se aplican sobre las tareas perezosas de la instantánea al cargar
+    def test_cargar_con_diario(self):
+        tareas = crear_tareas()
+        AlmacenamientoBinario(self.archivo).guardar_todo(tareas)
+        almacenamiento = AlmacenamientoBinario(self.archivo)
+        almacenamiento.cargar()
+        editada = Tarea.from_dict(dict(tareas[0].to_dict(), titulo="Editada"))
+        almacenamiento.guardar_cambios({editada.id: editada, tareas[1].id: None})
+
+        cargadas = AlmacenamientoBinario(self.archivo).cargar()
+        self.assertEqual([t.titulo for t in cargadas], ["Editada", "Comprar materiales"])
+        self.assertIsInstance(cargadas[1], TareaPerezosa)
+        self.assertIs(valor_leido(cargadas[1], "descripcion"), SIN_LEER)
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
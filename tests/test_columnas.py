@@ -0,0 +1,163 @@
+# test_columnas.py
+# Se definen las pruebas de la tabla columnar, con NumPy (si está instalado) y con el módulo array
+import importlib
+import random
+import sys
+import unittest
+from unittest import mock
+
+import core.columnas
+from core.columnas import NUMPY_DISPONIBLE, TablaColumnar
+from core.consulta import Consulta, Planificador, crear_filtro
+from core.tarea import Tarea
+
+
+# Se define la función para crear tareas al azar (con una semilla fija) con valores repetidos y fechas, algunas sin fecha
+def crear_tareas(cantidad=300):
+    azar = random.Random(7)
+    tareas = []
+    for i in range(cantidad):
+        vencimiento = None if i % 5 == 0 else f"{azar.randint(1, 28)}-{azar.randint(1, 12)}-2025"
+        completada = f"{azar.randint(1, 28)}-03-2025" if i % 3 == 0 else None
+        tareas.append(Tarea(f"Tarea {i}", "", azar.choice(["pendiente", "en progreso", "completada"]),
+                            fecha_completada=completada, fecha_vencimiento=vencimiento,
+                            prioridad=azar.choice(["alta", "media", "baja"]),
+                            categoria=azar.choice(["Casa", "Trabajo", "casa", ""])))
+    return tareas
+
+
+# Se definen las pruebas de TablaColumnar; cada prueba se repite con y sin NumPy
+class PruebasTablaColumnar(unittest.TestCase):
+    # Se definen las variantes de la tabla a probar
+    def variantes(self):
+        return [True, False] if NUMPY_DISPONIBLE else [False]
+
+    # Se define el método para crear una tabla con las tareas de prueba
+    def crear_tabla(self, usar_numpy, tareas):
+        tabla = TablaColumnar(usar_numpy)
+        for tarea in tareas:
+            tabla.agregar(tarea)
+        return tabla
+
+    # Se define el método para obtener los ids de unas filas
+    def ids(self, tabla, filas):
+        return list(tabla.ids_de(filas))
+
+    # Se prueba que sin NumPy la tabla no lo usa, aunque esté instalado
+    def test_sin_numpy(self):
+        self.assertIsNone(TablaColumnar(usar_numpy=False).numpy)
+
+    # Se prueba que si NumPy no se puede importar, el módulo lo indica y la tabla usa el módulo array
+    def test_numpy_no_instalado(self):
+        try:
+            with mock.patch.dict(sys.modules, {"numpy": None}):
+                columnas = importlib.reload(core.columnas)
+                self.assertFalse(columnas.NUMPY_DISPONIBLE)
+                tabla = columnas.TablaColumnar()
+                self.assertIsNone(tabla.numpy)
+                tabla.agregar(Tarea("Uno", "", categoria="Casa"))
+                self.assertEqual(tabla.filtrar(categoria="casa"), [0])
+        finally:
+            importlib.reload(core.columnas)
+
+    # Se prueba que filtrar da las mismas tareas (en orden de inserción) que revisar cada tarea
+    def test_filtrar(self):
+        tareas = crear_tareas()
+        casos = [
+            {"estado": "pendiente"},
+            {"categoria": "CASA"},
+            {"prioridad": "alta", "categoria": "trabajo"},
+            {"fecha_minima": 739300},
+            {"fecha_maxima": 739400},
+            {"estado": "completada", "fecha_minima": 739300, "fecha_maxima": 739400},
+            {"estado": "no existe"},
+        ]
+        for usar_numpy in self.variantes():
+            tabla = self.crear_tabla(usar_numpy, tareas)
+            for caso in casos:
+                with self.subTest(numpy=usar_numpy, caso=caso):
+                    esperadas = [t.id for t in tareas if self.cumple(t, **caso)]
+                    self.assertEqual(self.ids(tabla, tabla.filtrar(**caso)), esperadas)
+
+    # Se define el método que revisa una tarea con los mismos criterios de filtrar (como RangoFechas, una tarea sin fecha
+    # no cumple ningún rango de fechas acotado)
+    def cumple(self, tarea, estado=None, prioridad=None, categoria=None, fecha_minima=None, fecha_maxima=None):
+        for valor, buscado in ((tarea.estado, estado), (tarea.prioridad, prioridad), (tarea.categoria, categoria)):
+            if buscado is not None and (valor or "").lower() != buscado.lower():
+                return False
+        if tarea.ordinal_vencimiento is None:
+            return fecha_minima is None and fecha_maxima is None
+        vencimiento = tarea.ordinal_vencimiento
+        return (fecha_minima is None or vencimiento >= fecha_minima) and (fecha_maxima is None or vencimiento <= fecha_maxima)
+
+    # Se prueba que ordenar es estable y ordena por fecha (sin fecha al final), estado y prioridad
+    def test_ordenar(self):
+        tareas = crear_tareas()
+        rangos = {"alta": 1, "media": 2, "baja": 3}
+        claves = {
+            "fecha": lambda t: float("inf") if t.ordinal_vencimiento is None else t.ordinal_vencimiento,
+            "estado": lambda t: t.estado,
+            "prioridad": lambda t: rangos[t.prioridad],
+        }
+        for usar_numpy in self.variantes():
+            tabla = self.crear_tabla(usar_numpy, tareas)
+            for por, clave in claves.items():
+                with self.subTest(numpy=usar_numpy, por=por):
+                    filas = tabla.filtrar(categoria="casa")
+                    esperadas = [t.id for t in sorted((t for t in tareas if t.categoria.lower() == "casa"), key=clave)]
+                    self.assertEqual(self.ids(tabla, tabla.ordenar(filas, por)), esperadas)
+
+    # Se prueba que una tarea actualizada conserva su fila y que las quitadas dejan de aparecer, también después de compactar
+    def test_actualizar_quitar_y_compactar(self):
+        tareas = crear_tareas(40)
+        for usar_numpy in self.variantes():
+            with self.subTest(numpy=usar_numpy), mock.patch("core.columnas.MINIMO_LIBRES", 4):
+                tabla = self.crear_tabla(usar_numpy, tareas)
+                tareas[1].estado = "archivada"
+                tabla.agregar(tareas[1])
+                self.assertEqual(self.ids(tabla, tabla.filtrar(estado="archivada")), [tareas[1].id])
+
+                quitadas = {t.id for t in tareas[2:30]}
+                for tarea_id in quitadas:
+                    tabla.quitar(tarea_id)
+                self.assertLess(len(tabla.ids), len(tareas))
+                self.assertEqual(len(tabla), len(tareas) - len(quitadas))
+                restantes = [t.id for t in tareas if t.id not in quitadas]
+                self.assertEqual(self.ids(tabla, tabla.filtrar()), restantes)
+                tareas[1].estado = "pendiente"
+
+    # Se prueba completadas_entre y filas_por_estado contra el recorrido de las tareas
+    def test_completadas_y_estados(self):
+        tareas = crear_tareas()
+        desde, hasta = Tarea("", "", fecha_completada="5-03-2025").ordinal_completada, \
+            Tarea("", "", fecha_completada="20-03-2025").ordinal_completada
+        for usar_numpy in self.variantes():
+            with self.subTest(numpy=usar_numpy):
+                tabla = self.crear_tabla(usar_numpy, tareas)
+                esperadas = [t.id for t in tareas if t.ordinal_completada and desde <= t.ordinal_completada <= hasta]
+                self.assertEqual(self.ids(tabla, tabla.completadas_entre(desde, hasta)), esperadas)
+                grupos = {estado: self.ids(tabla, filas) for estado, filas in tabla.filas_por_estado().items()}
+                for estado in ("pendiente", "en progreso", "completada"):
+                    self.assertEqual(grupos[estado], [t.id for t in tareas if t.estado == estado])
+
+    # Se prueba que el planificador da los mismos resultados con la tabla (con y sin NumPy) que sin ella
+    def test_planificador(self):
+        tareas = crear_tareas()
+        por_id = {t.id: t for t in tareas}
+        consultas = [
+            Consulta(crear_filtro(estado="pendiente", categoria="casa"), ["fecha"], 5, 20),
+            Consulta(crear_filtro(prioridad="baja", fecha_minima=739300), ["prioridad"]),
+            Consulta(crear_filtro(fecha_maxima=739400), ["estado"], 0, 10),
+        ]
+        for usar_numpy in self.variantes():
+            tabla = self.crear_tabla(usar_numpy, tareas)
+            for consulta in consultas:
+                with self.subTest(numpy=usar_numpy, filtro=consulta.filtro):
+                    esperadas = Planificador(por_id).ejecutar(consulta)
+                    con_tabla = Planificador(por_id, tabla=tabla)
+                    self.assertEqual([t.id for t in con_tabla.ejecutar(consulta)], [t.id for t in esperadas])
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+# test_gestor_web.py
+# Se definen las pruebas de GestorTareasWeb: guardado en segundo plano, lotes de operaciones y consultas
+import gc
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import weakref
+
+from core.almacenamiento import AlmacenamientoJSON
+from core.consulta import Consulta, Contiene, O, RangoFechas, crear_filtro
+from core.validacion import fecha_a_ordinal
+from core.tarea import Tarea
+from gestor_web import GestorTareasWeb
+
+
+# Se define un almacenamiento JSON que falla las primeras veces que se intenta guardar (por ejemplo, un disco lleno)
+class AlmacenamientoQueFalla(AlmacenamientoJSON):
+    # Se define el constructor con la cantidad de fallas a simular
+    def __init__(self, archivo, fallas):
+        super().__init__(archivo)
+        self.fallas = fallas
+
+    # Se define el método bloquear, que falla mientras queden fallas por simular
+    def bloquear(self):
+        if self.fallas:
+            self.fallas -= 1
+            raise OSError("disco lleno")
+        return super().bloquear()
+
+
+# Se define la función para esperar hasta que se cumpla una condición (o se agote el tiempo)
+def esperar(condicion, segundos=10):
+    limite = time.monotonic() + segundos
+    while not condicion():
+        if time.monotonic() > limite:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+# Se definen las pruebas del guardado en segundo plano
+class PruebasGuardado(unittest.TestCase):
+    # Se crea un directorio temporal para los archivos de cada prueba
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.archivo = os.path.join(self.directorio, "tareas.json")
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se define la función para leer las tareas guardadas con un gestor nuevo
+    def titulos_guardados(self):
+        gestor = GestorTareasWeb(archivo=self.archivo, sincrono=True)
+        gestor.cargar_desde_archivo()
+        return [t.titulo for t in gestor.lista_tareas]
+
+    # Se prueba que un guardado que falla no detiene el hilo de guardado ni pierde los cambios
+    def test_reintenta_despues_de_un_error(self):
+        gestor = GestorTareasWeb(almacenamiento=AlmacenamientoQueFalla(self.archivo, fallas=2), max_latencia=0.01)
+        gestor.agregar_tarea(Tarea("primera", ""))
+        self.assertTrue(esperar(lambda: self.titulos_guardados() == ["primera"]))
+        gestor.agregar_tarea(Tarea("segunda", ""))
+        self.assertTrue(esperar(lambda: self.titulos_guardados() == ["primera", "segunda"]))
+        gestor.cerrar()
+
+    # Se prueba que cerrar guarda los cambios pendientes, detiene el hilo y deja liberar el gestor
+    def test_cerrar(self):
+        gestor = GestorTareasWeb(archivo=self.archivo, max_latencia=60)
+        gestor.agregar_tarea(Tarea("pendiente", ""))
+        hilo = gestor.hilo_guardado
+        gestor.cerrar()
+        self.assertFalse(hilo.is_alive())
+        self.assertEqual(self.titulos_guardados(), ["pendiente"])
+
+        # Después de cerrar, los cambios se guardan en el momento
+        gestor.agregar_tarea(Tarea("despues", ""))
+        self.assertEqual(self.titulos_guardados(), ["pendiente", "despues"])
+
+        referencia = weakref.ref(gestor)
+        del gestor
+        gc.collect()
+        self.assertIsNone(referencia())
+
+
+# Se definen las pruebas de aplicar_lote
+class PruebasLote(unittest.TestCase):
+    # Se crea un directorio temporal para los archivos de cada prueba
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que actualizar una tarea creada en el mismo lote no cambia su lugar en el orden de inserción
+    # (con la misma fecha de vencimiento, el orden de inserción decide el empate)
+    def test_crear_crear_actualizar_conserva_el_orden(self):
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                archivo = os.path.join(self.directorio, f"tareas_{columnar}.json")
+                gestor = GestorTareasWeb(archivo=archivo, sincrono=True, columnar=columnar)
+                a = Tarea("A", "", fecha_vencimiento="01-01-2030")
+                b = Tarea("B", "", fecha_vencimiento="01-01-2030")
+                gestor.aplicar_lote([
+                    {"op": "crear", "tarea": a},
+                    {"op": "crear", "tarea": b},
+                    {"op": "actualizar", "id": b.id, "cambios": {"estado": "en progreso"}},
+                ])
+                self.assertEqual([t.titulo for t in gestor.lista_tareas], ["A", "B"])
+                pagina = gestor.consultar(Consulta(ordenar_por="fecha"))
+                self.assertEqual([t.titulo for t in pagina], ["A", "B"])
+
+
+# Se definen las pruebas de las consultas por rango de fechas
+class PruebasRangoFechas(unittest.TestCase):
+    # Se crea un directorio temporal para los archivos de cada prueba
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se define la función para crear un gestor con tareas con y sin fecha de vencimiento
+    def crear_gestor(self, columnar):
+        gestor = GestorTareasWeb(archivo=os.path.join(self.directorio, f"tareas_{columnar}.json"), sincrono=True,
+                                 columnar=columnar)
+        for titulo, fecha in (("Sin fecha", None), ("Antes", "01-01-2030"), ("Despues", "01-06-2030"),
+                              ("Otra sin fecha", None)):
+            gestor.agregar_tarea(Tarea(titulo, "", fecha_vencimiento=fecha))
+        return gestor
+
+    # Se prueba que con solo la fecha desde no se incluyen las tareas sin fecha, por cualquier camino de la consulta
+    # (índice de fechas, recorrido con el predicado o tabla columnar)
+    def test_solo_fecha_desde(self):
+        desde = fecha_a_ordinal("01-02-2030")
+        consultas = {
+            "indice": Consulta(RangoFechas(desde), "fecha"),
+            "recorrido": Consulta(O(RangoFechas(desde), Contiene("titulo", "ninguna"))),
+            "columnas": Consulta(crear_filtro(fecha_minima=desde), limite=10),
+        }
+        for columnar in (False, True):
+            gestor = self.crear_gestor(columnar)
+            for nombre, consulta in consultas.items():
+                with self.subTest(columnar=columnar, consulta=nombre):
+                    pagina = gestor.consultar(consulta)
+                    self.assertEqual([t.titulo for t in pagina], ["Despues"])
+                    self.assertEqual(pagina.total, 1)
+            with self.subTest(columnar=columnar, consulta="buscar_tareas_avanzada"):
+                pagina = gestor.buscar_tareas_avanzada(fecha_minima="01-01-2030")
+                self.assertEqual([t.titulo for t in pagina], ["Antes", "Despues"])
+
+    # Se prueba que sin límites y con solo la fecha hasta se conserva el comportamiento anterior
+    def test_sin_fecha_desde(self):
+        for columnar in (False, True):
+            gestor = self.crear_gestor(columnar)
+            with self.subTest(columnar=columnar):
+                pagina = gestor.consultar(Consulta(RangoFechas(hasta=fecha_a_ordinal("01-03-2030")), "fecha"))
+                self.assertEqual([t.titulo for t in pagina], ["Antes"])
+                pagina = gestor.consultar(Consulta(ordenar_por="fecha"))
+                self.assertEqual([t.titulo for t in pagina], ["Antes", "Despues", "Sin fecha", "Otra sin fecha"])
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+# test_intercambio.py
+# Se definen las pruebas de la exportación e importación de tareas en JSON, NDJSON y CSV
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.intercambio import exportar, importar, importar_csv
+from core.tarea import Tarea
+from gestor_web import GestorTareasWeb
+
+
+# Se define la función para crear tareas con cero, una y varias subtareas, y textos con comas, comillas y saltos de línea
+def crear_tareas():
+    return [
+        Tarea("Sin subtareas", "Texto, con \"comillas\"\ny dos líneas", fecha_vencimiento="10-02-2025"),
+        Tarea("Una subtarea", "", "completada", "01-02-2025", "05-02-2025", subtareas=[{"nombre": "Única", "completada": True}],
+              categoria="Trabajo"),
+        Tarea("Varias subtareas", "Descripción", "en progreso", prioridad="alta", categoria="Universidad",
+              subtareas=[{"nombre": "Leer, resumir", "completada": True}, "Ejercicios", {"nombre": "", "completada": False},
+                         {"nombre": "Repasar \"todo\"", "completada": False}]),
+    ]
+
+
+# Se define la función para exportar tareas a texto e importarlas de nuevo con el mismo formato
+def ida_y_vuelta(tareas, formato, subtareas="anidadas"):
+    texto = "".join(exportar(tareas, formato, subtareas))
+    if formato == "json":
+        return list(importar(io.BytesIO(texto.encode("utf-8")), formato))
+    return list(importar(io.StringIO(texto, newline=""), formato))
+
+
+# Se definen las pruebas de ida y vuelta en cada formato
+class PruebasIntercambio(unittest.TestCase):
+    # Se prueba que en cada formato (y en CSV, con subtareas anidadas o planas) se recuperan las mismas tareas,
+    # con el mismo orden de subtareas
+    def test_ida_y_vuelta(self):
+        tareas = crear_tareas()
+        esperadas = [t.to_dict() for t in tareas]
+        esperadas[2]["subtareas"] = [s for s in esperadas[2]["subtareas"] if s["nombre"]]
+        casos = [("json", "anidadas"), ("ndjson", "anidadas"), ("csv", "anidadas"), ("csv", "planas")]
+        for formato, subtareas in casos:
+            with self.subTest(formato=formato, subtareas=subtareas):
+                importadas = [t.to_dict() for t in ida_y_vuelta(tareas, formato, subtareas)]
+                if subtareas == "anidadas":
+                    self.assertEqual(importadas, [t.to_dict() for t in tareas])
+                else:
+                    # En modo planas una subtarea sin nombre no se distingue de una fila sin subtareas
+                    self.assertEqual(importadas, esperadas)
+
+    # Se prueba que en modo planas cada tarea ocupa una fila por subtarea (o una sola fila si no tiene)
+    def test_planas_una_fila_por_subtarea(self):
+        texto = "".join(exportar(crear_tareas(), "csv", "planas"))
+        filas = list(importar_csv(io.StringIO(texto, newline="")))
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(texto.count("Varias subtareas"), 4)
+        self.assertEqual(texto.splitlines()[0].split(",")[-2:], ["subtarea", "subtarea_completada"])
+
+    # Se prueba que las filas planas sin id son tareas distintas y que se aceptan otras formas de marcar completada
+    def test_planas_sin_id(self):
+        texto = ("titulo,descripcion,subtarea,subtarea_completada\r\n"
+                 "Uno,,Primera,sí\r\n"
+                 "Uno,,Segunda,true\r\n"
+                 "Dos,,,\r\n")
+        tareas = list(importar_csv(io.StringIO(texto, newline="")))
+        self.assertEqual([t.titulo for t in tareas], ["Uno", "Uno", "Dos"])
+        self.assertEqual([[(s.nombre, s.completada) for s in t.subtareas] for t in tareas],
+                         [[("Primera", True)], [("Segunda", True)], []])
+        self.assertNotEqual(tareas[0].id, tareas[1].id)
+
+    # Se prueba que un CSV sin la columna titulo o con subtareas anidadas inválidas se rechaza
+    def test_csv_invalido(self):
+        for texto in ("nombre,descripcion\r\nUno,\r\n", "titulo,subtareas\r\nUno,[no es json\r\n"):
+            with self.subTest(texto=texto):
+                with self.assertRaises(ValueError):
+                    list(importar_csv(io.StringIO(texto, newline="")))
+
+
+# Se definen las pruebas de exportar e importar archivos desde el gestor
+class PruebasArchivos(unittest.TestCase):
+    # Se crea un gestor síncrono con las tareas de prueba en un directorio temporal
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.gestor = GestorTareasWeb(archivo=os.path.join(self.directorio, "tareas.json"), sincrono=True)
+        for tarea in crear_tareas()[:2]:
+            self.gestor.agregar_tarea(tarea)
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que un CSV con subtareas planas exportado por el gestor se vuelve a cargar igual
+    def test_csv_planas(self):
+        archivo = os.path.join(self.directorio, "copia.csv")
+        self.gestor.guardar_en_archivo(archivo, subtareas="planas")
+        otro = GestorTareasWeb(archivo=os.path.join(self.directorio, "otro.json"), sincrono=True)
+        otro.cargar_desde_archivo(archivo)
+        self.assertEqual([t.to_dict() for t in otro.lista_tareas], [t.to_dict() for t in self.gestor.lista_tareas])
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+# test_metricas.py
+# Se definen las pruebas de las métricas y de su publicación en /metrics en el formato de texto de Prometheus
+import contextlib
+import importlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from core.consulta import Consulta, crear_filtro
+from core.metricas import Metricas, metricas
+from core.tarea import Tarea
+from gestor_web import GestorTareasWeb
+
+
+# Se definen las pruebas del formato de texto de las métricas
+class PruebasFormato(unittest.TestCase):
+    # Se crean métricas con dos cubetas
+    def setUp(self):
+        self.metricas = Metricas(cubetas=(0.1, 1.0))
+
+    # Se prueba que los contadores se suman por etiquetas (sin importar su orden) y se publican con su ayuda y su tipo
+    def test_contadores(self):
+        self.metricas.describir("prueba_total", "counter", "Contador de prueba")
+        self.metricas.sumar("prueba_total", ruta="a", codigo=200)
+        self.metricas.sumar("prueba_total", 2, codigo=200, ruta="a")
+        self.metricas.sumar("prueba_total", ruta="b\"c", codigo=404)
+        self.assertEqual(self.metricas.valor("prueba_total", ruta="a", codigo=200), 3)
+        self.assertEqual(self.metricas.texto().splitlines(), [
+            "# HELP prueba_total Contador de prueba",
+            "# TYPE prueba_total counter",
+            'prueba_total{codigo="200",ruta="a"} 3',
+            'prueba_total{codigo="404",ruta="b\\"c"} 1',
+        ])
+
+    # Se prueba que los histogramas publican cubetas acumuladas (con +Inf), la suma y la cantidad
+    def test_histogramas(self):
+        self.metricas.describir("prueba_segundos", "histogram", "Duración de prueba")
+        for valor in (0.05, 0.1, 0.5, 3.0):
+            self.metricas.observar("prueba_segundos", valor, ruta="a")
+        self.assertEqual(self.metricas.texto().splitlines()[2:], [
+            'prueba_segundos_bucket{ruta="a",le="0.1"} 2',
+            'prueba_segundos_bucket{ruta="a",le="1.0"} 3',
+            'prueba_segundos_bucket{ruta="a",le="+Inf"} 4',
+            'prueba_segundos_sum{ruta="a"} 3.65',
+            'prueba_segundos_count{ruta="a"} 4',
+        ])
+
+    # Se prueba que los medidores se calculan al exportar y que uno que falla no impide publicar los demás
+    def test_medidores(self):
+        tareas = []
+        self.metricas.medidor("prueba_tareas", "Tareas de prueba", lambda: len(tareas))
+        self.metricas.medidor("prueba_falla", "Medidor que falla", lambda: 1 / 0)
+        tareas.append(1)
+        with contextlib.redirect_stdout(io.StringIO()) as salida:
+            texto = self.metricas.texto()
+        self.assertIn("# TYPE prueba_tareas gauge\nprueba_tareas 1\n", texto)
+        self.assertNotIn("\nprueba_falla ", texto)
+        self.assertIn("prueba_falla", salida.getvalue())
+
+
+# Se definen las pruebas de las métricas que registra el gestor
+class PruebasMetricasGestor(unittest.TestCase):
+    # Se crea un gestor síncrono en un directorio temporal
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.gestor = GestorTareasWeb(archivo=os.path.join(self.directorio, "tareas.json"), sincrono=True)
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se prueba que se cuentan los cambios guardados y las tareas examinadas y devueltas por cada tipo de consulta
+    def test_guardado_y_consultas(self):
+        guardados = metricas.valor("todolist_guardado_cambios_total")
+        consultas = metricas.valor("todolist_consultas_total", consulta="prueba")
+        devueltas = metricas.valor("todolist_consulta_devueltas_total", consulta="prueba")
+        for i in range(3):
+            self.gestor.agregar_tarea(Tarea(f"Tarea {i}", "", estado=("pendiente", "completada")[i % 2]))
+        self.gestor.consultar(Consulta(crear_filtro(estado="completada")), "prueba")
+        self.assertEqual(metricas.valor("todolist_guardado_cambios_total"), guardados + 3)
+        self.assertEqual(metricas.valor("todolist_consultas_total", consulta="prueba"), consultas + 1)
+        self.assertEqual(metricas.valor("todolist_consulta_devueltas_total", consulta="prueba"), devueltas + 1)
+
+
+# Se definen las pruebas de la ruta /metrics de app.py
+# app.py usa la ruta relativa data/tareas.json, así que se importa y se atiende cada solicitud desde un directorio
+# temporal, para no leer ni escribir el directorio data del proyecto
+class PruebasRutaMetrics(unittest.TestCase):
+    # Se importa app.py desde un directorio temporal y se cierra su gestor (para que no guarde al terminar el programa)
+    @classmethod
+    def setUpClass(cls):
+        cls.directorio = tempfile.mkdtemp()
+        os.makedirs(os.path.join(cls.directorio, "data"))
+        with cls.en_directorio():
+            cls.app = importlib.import_module("app")
+            if not cls.app.gestor.cerrado:
+                cls.app.gestor.cerrar()
+
+    # Se borra el directorio temporal
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directorio, ignore_errors=True)
+
+    # Se define el contexto para trabajar en el directorio temporal y volver al anterior al terminar
+    @classmethod
+    @contextlib.contextmanager
+    def en_directorio(cls):
+        anterior = os.getcwd()
+        os.chdir(cls.directorio)
+        try:
+            yield
+        finally:
+            os.chdir(anterior)
+
+    # Se prueba que /metrics publica en formato de Prometheus las solicitudes atendidas, su duración y las tareas
+    def test_metrics(self):
+        cliente = self.app.app.test_client()
+        with self.en_directorio():
+            cliente.get("/metrics")
+            respuesta = cliente.get("/metrics")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.mimetype, "text/plain")
+        self.assertEqual(respuesta.mimetype_params.get("version"), "0.0.4")
+        texto = respuesta.get_data(as_text=True)
+        self.assertIn("# TYPE todolist_solicitudes_total counter\n", texto)
+        self.assertRegex(texto, r'todolist_solicitudes_total\{codigo="200",ruta="ver_metricas"\} [1-9]')
+        self.assertIn("# TYPE todolist_solicitud_segundos histogram\n", texto)
+        self.assertRegex(texto, r'todolist_solicitud_segundos_bucket\{metodo="GET",ruta="ver_metricas",le="\+Inf"\} [1-9]')
+        self.assertIn(f"\ntodolist_tareas {len(self.app.gestor.tareas)}\n", texto)
+        for linea in texto.splitlines():
+            self.assertRegex(linea, r'^(# (HELP|TYPE) \w+ .*|\w+(\{.*\})? \S+)$')
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
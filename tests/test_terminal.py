@@ -0,0 +1,71 @@
+# test_terminal.py
+# Se definen las pruebas del gestor de tareas de la terminal y su índice de títulos
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from core.tarea import Tarea
+from terminal.gestor import GestorTareas
+
+
+# Se definen las pruebas del índice de títulos (título sin distinguir mayúsculas -> tareas en orden de inserción)
+class PruebasIndiceTitulos(unittest.TestCase):
+    # Se crea un gestor con tres tareas (dos con el mismo título) en un directorio temporal
+    def setUp(self):
+        self.directorio = tempfile.mkdtemp()
+        self.archivo = os.path.join(self.directorio, "tareas.json")
+        self.gestor = GestorTareas(self.archivo)
+        self.primera = Tarea("Informe", "Primera")
+        self.segunda = Tarea("INFORME", "Segunda")
+        self.calle = Tarea("Straße", "")
+        for tarea in (self.primera, self.segunda, self.calle):
+            self.gestor.agregar_tarea(tarea)
+
+    # Se borra el directorio temporal
+    def tearDown(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+    # Se define el método para ejecutar un método del gestor con respuestas para input y sin mostrar sus mensajes
+    def ejecutar(self, metodo, *args, respuestas=()):
+        with mock.patch("builtins.input", side_effect=list(respuestas)), contextlib.redirect_stdout(io.StringIO()):
+            return metodo(*args)
+
+    # Se prueba que se busca sin distinguir mayúsculas (con casefold) y que con títulos repetidos se obtiene el primero
+    def test_buscar(self):
+        self.assertIs(self.gestor.buscar_por_titulo("informe"), self.primera)
+        self.assertIs(self.gestor.buscar_por_titulo("STRASSE"), self.calle)
+        self.assertIsNone(self.gestor.buscar_por_titulo("Otra"))
+
+    # Se prueba que al editar el título el índice deja de tener el anterior y tiene el nuevo
+    def test_editar_titulo(self):
+        self.ejecutar(self.gestor.editar_tarea, "informe", respuestas=["Resumen", "", "", ""])
+        self.assertIs(self.gestor.buscar_por_titulo("resumen"), self.primera)
+        self.assertIs(self.gestor.buscar_por_titulo("informe"), self.segunda)
+
+    # Se prueba que al eliminar una tarea se quita del índice y se encuentra la siguiente con el mismo título
+    def test_eliminar(self):
+        self.ejecutar(self.gestor.eliminar_tarea, respuestas=["1", "s"])
+        self.assertIs(self.gestor.buscar_por_titulo("informe"), self.segunda)
+        self.ejecutar(self.gestor.eliminar_tarea, respuestas=["1", "s"])
+        self.assertIsNone(self.gestor.buscar_por_titulo("informe"))
+        self.assertEqual(list(self.gestor.indice_titulos), ["strasse"])
+
+    # Se prueba que al cargar (y al refrescar los cambios de otro proceso) se reconstruye el índice
+    def test_cargar_y_refrescar(self):
+        otro = GestorTareas(self.archivo)
+        self.ejecutar(otro.cargar_desde_archivo)
+        self.assertEqual(otro.buscar_por_titulo("informe").id, self.primera.id)
+
+        self.ejecutar(self.gestor.editar_tarea, "straße", respuestas=["Calle", "", "", ""])
+        self.ejecutar(otro.refrescar)
+        self.assertIsNone(otro.buscar_por_titulo("straße"))
+        self.assertEqual(otro.buscar_por_titulo("calle").id, self.calle.id)
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+# test_validacion.py
+# Se definen las pruebas de la validación y conversión de fechas
+import unittest
+
+from core.validacion import fecha_a_ordinal, validar_fecha
+
+
+# Se definen las pruebas del formato 'dd-mm-aaaa'
+class PruebasFecha(unittest.TestCase):
+    # Se prueba que se aceptan fechas con día y mes de uno o dos dígitos y que ambas formas dan el mismo ordinal
+    def test_fechas_validas(self):
+        self.assertTrue(validar_fecha("1-2-2025"))
+        self.assertTrue(validar_fecha("01-02-2025"))
+        self.assertTrue(validar_fecha(""))
+        self.assertEqual(fecha_a_ordinal("1-2-2025"), fecha_a_ordinal("01-02-2025"))
+
+    # Se prueba que se rechazan las fechas que int() aceptaría pero no tienen el formato esperado
+    def test_fechas_mal_formadas(self):
+        for fecha in ["01-02-25", "+1-2-2025", "1_0-02-2025", "01-02-202", "01-02-20250", " 1-2-2025x", "31-02-2025"]:
+            with self.subTest(fecha=fecha):
+                self.assertFalse(validar_fecha(fecha))
+                self.assertIsNone(fecha_a_ordinal(fecha))
+
+
+# Se ejecutan las pruebas
+if __name__ == "__main__":
+    unittest.main()